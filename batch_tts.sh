@@ -59,6 +59,7 @@ show_help() {
     echo "  aggressive   - 激进模式: 每批5-8个问题，间隔2-8分钟   (小文件快速处理)"
     echo "  test         - 测试模式: 每批1个问题，间隔0.5-1分钟  (调试用)"
     echo "  custom       - 自定义模式: 需要额外参数 <批次大小> <间隔时间>"
+    echo "  adaptive     - 自适应模式: 不分批，按延迟和限流信号自动调整并发数和请求速率"
     echo ""
     echo "示例:"
     echo "  $0 conservative large_questions.md output        # 大文件安全处理"
@@ -66,6 +67,7 @@ show_help() {
     echo "  $0 aggressive small_questions.md output         # 快速处理"
     echo "  $0 test single_question.md test_output          # 测试单个问题"
     echo "  $0 custom questions.md output 2-4 8-12          # 自定义: 2-4个问题/批，8-12分钟间隔"
+    echo "  $0 adaptive questions.md output                 # 自适应: 工作点保存在 aimd_state.json，下次从这里开始"
     echo ""
     echo "注意事项:"
     echo "  - 保守模式适合100+问题的大文件，可以有效避免API限制"
@@ -74,45 +76,15 @@ show_help() {
     echo "  - 进度文件 batch_progress.json 记录处理状态"
 }
 
-# 获取预估时间
+# 获取预估时间：调用 Python 流水线的 --plan 模式，解析真实问题块并按当前批次策略估算（不执行合成）
 estimate_time() {
-    local mode=$1
-    local input_file=$2
+    local input_file=$1
+    local output_dir=$2
+    local batch_size=$3
+    local interval=$4
     
-    # 简单估算问题数量（每个---大概对应一个问题）
-    local question_count=$(grep -c "^---" "$input_file" 2>/dev/null || echo "未知")
-    
-    if [ "$question_count" != "未知" ]; then
-        case $mode in
-            "conservative")
-                local avg_batch=2.5
-                local avg_interval=15
-                ;;
-            "balanced")
-                local avg_batch=4
-                local avg_interval=10
-                ;;
-            "aggressive")
-                local avg_batch=6.5
-                local avg_interval=5
-                ;;
-            "test")
-                local avg_batch=1
-                local avg_interval=0.75
-                ;;
-            *)
-                local avg_batch=4
-                local avg_interval=10
-                ;;
-        esac
-        
-        local batches=$(echo "scale=0; ($question_count + $avg_batch - 1) / $avg_batch" | bc -l 2>/dev/null || echo "1")
-        local total_minutes=$(echo "scale=1; $batches * $avg_interval" | bc -l 2>/dev/null || echo "未知")
-        
-        echo "预估: $question_count 个问题, $batches 个批次, 约 ${total_minutes} 分钟"
-    else
-        echo "无法估算处理时间（文件格式检测失败）"
-    fi
+    python3 question_to_speech_batch_safe.py "$input_file" "$output_dir" "$batch_size" "$interval" --plan \
+        || print_warning "无法估算处理时间（--plan 执行失败）"
 }
 
 # 主函数
@@ -170,6 +142,17 @@ main() {
             interval=$5
             print_info "使用自定义模式: 每批${batch_size}个问题，间隔${interval}分钟"
             ;;
+        "adaptive")
+            print_info "使用自适应模式: 并发数和请求速率根据延迟和限流信号自动调整"
+            print_success "开始自适应处理..."
+            python3 -m tts questions "$input_file" "$output_dir" --batch --adaptive || {
+                print_error "批量处理失败，请检查日志文件"
+                exit 1
+            }
+            print_success "批量处理完成!"
+            print_info "日志文件: $output_dir/batch_processing.log"
+            exit 0
+            ;;
         *)
             print_error "未知模式: $mode"
             show_help
@@ -178,7 +161,8 @@ main() {
     esac
     
     # 显示预估信息
-    print_info "$(estimate_time $mode $input_file)"
+    print_info "处理计划:"
+    estimate_time "$input_file" "$output_dir" "$batch_size" "$interval"
     
     # 询问确认
     echo ""
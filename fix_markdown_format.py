@@ -1,60 +1,24 @@
 #!/usr/bin/env python3
 """
 修复Markdown格式问题的脚本
-主要解决缺少 ## 前缀的答案和解析部分
+主要解决缺少 ## 前缀的答案和解析部分（也可以使用 python3 -m tts normalize）
 """
 
-import re
 import os
 import sys
-from pathlib import Path
+
+from tts.normalize import normalize_file
 
 def fix_markdown_format(input_file: str, output_file: str = None):
     """
-    修复Markdown文件的格式问题
+    修复Markdown文件的格式问题（流式处理，先写临时文件再替换；实现位于 tts.normalize，
+    同时会把数字 id 换成确定性的 UUID）
     
     Args:
         input_file: 输入文件路径
         output_file: 输出文件路径，如果为None则覆盖原文件
     """
-    if output_file is None:
-        output_file = input_file
-    
-    print(f"Reading file: {input_file}")
-    
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original_content = content
-    fixes_count = 0
-    
-    # 修复缺少 ## 前缀的 ✅ 精简答案 部分
-    # 查找行首的 **✅ 精简答案：** 前面没有 ## 的情况
-    pattern1 = r'^(\*\*✅ 精简答案：\*\*)'
-    matches1 = re.findall(pattern1, content, flags=re.MULTILINE)
-    content = re.sub(pattern1, r'## \1', content, flags=re.MULTILINE)
-    fixes_count += len(matches1)
-    
-    # 修复缺少 ## 前缀的 📘 详细解析 部分  
-    # 查找行首的 **📘 详细解析：** 前面没有 ## 的情况
-    pattern2 = r'^(\*\*📘 详细解析：\*\*)'
-    matches2 = re.findall(pattern2, content, flags=re.MULTILINE)
-    content = re.sub(pattern2, r'## \1', content, flags=re.MULTILINE)
-    fixes_count += len(matches2)
-    
-    # 显示修复的详情
-    if fixes_count > 0:
-        print(f"✓ Fixed {len(matches1)} instances of missing ## before **✅ 精简答案：**")
-        print(f"✓ Fixed {len(matches2)} instances of missing ## before **📘 详细解析：**")
-        print(f"Total fixes applied: {fixes_count}")
-    else:
-        print("No formatting issues found")
-    
-    print(f"Writing fixed content to: {output_file}")
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    
+    normalize_file(input_file, output_file)
     print("✓ Markdown format fixed successfully!")
 
 def main():
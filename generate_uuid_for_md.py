@@ -1,29 +1,36 @@
-import re
-import uuid
-import os
-
-# 读取文件内容
-file_path = '/Users/xiongweiliu/workspaces/text-to-speech/vue_questions-md-format copy.md'
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
+#!/usr/bin/env python3
+"""
+为问题库中的问题分配 UUID
+数字或缺失的 id 替换为确定性的 UUID（uuid5），已是 UUID 的 id 保持不变，重复运行结果相同。
+（实现位于 tts.normalize，同时修复缺少 ## 的标题；也可以使用 python3 -m tts normalize）
+"""
 
-# 定义正则表达式来匹配id行
-id_pattern = r'id: (\d+)'
-
-# 替换所有id为UUID
-def replace_id(match):
-    # 生成新的UUID
-    new_uuid = str(uuid.uuid4())
-    print(f'替换id: {match.group(1)} -> {new_uuid}')
-    return f'id: {new_uuid}'
+import os
+import sys
+from pathlib import Path
 
-# 执行替换
-new_content = re.sub(id_pattern, replace_id, content)
+from tts.normalize import normalize_file
 
-# 保存修改后的内容到新文件
-output_file_path = '/Users/xiongweiliu/workspaces/text-to-speech/vue_questions-md-format_uuid.md'
-with open(output_file_path, 'w', encoding='utf-8') as f:
-    f.write(new_content)
+def main():
+    """主函数"""
+    if len(sys.argv) < 2:
+        print("使用方法:")
+        print("  python3 generate_uuid_for_md.py <input_file> [output_file]")
+        print("示例:")
+        print("  python3 generate_uuid_for_md.py vue_questions-md-format.md")
+        print("  （默认输出到 <输入文件名>_uuid.md）")
+        sys.exit(1)
+    
+    input_file = sys.argv[1]
+    if not os.path.exists(input_file):
+        print(f"✗ 错误: 输入文件 '{input_file}' 不存在")
+        sys.exit(1)
+    
+    input_path = Path(input_file)
+    output_file = sys.argv[2] if len(sys.argv) > 2 else str(input_path.with_name(f"{input_path.stem}_uuid.md"))
+    # 以输入文件名作为 id 范围，输出文件名不影响生成的 id
+    normalize_file(input_file, output_file, scope=input_path.stem)
+    print(f'\n替换完成！已生成新文件：{output_file}')
 
-print(f'\n替换完成！已生成新文件：{output_file_path}')
-print(f'总共替换了 {len(re.findall(id_pattern, content))} 个ID')
\ No newline at end of file
+if __name__ == "__main__":
+    main()
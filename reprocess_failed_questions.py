@@ -6,9 +6,8 @@
 
 import asyncio
 import json
-import os
 from pathlib import Path
-from question_to_speech import MarkdownQuestionParser
+from tts.questions import MarkdownQuestionParser
 
 async def reprocess_failed_questions():
     """重新处理失败的问题"""
@@ -40,40 +39,7 @@ async def reprocess_failed_questions():
         content = f.read()
     
     # 使用和批处理脚本相同的分割逻辑
-    import re
-    
-    # 寻找所有frontmatter块的位置
-    frontmatter_starts = []
-    lines = content.split('\n')
-    
-    for i, line in enumerate(lines):
-        if line.strip() == '---':
-            if i == 0:
-                frontmatter_starts.append(i)
-            else:
-                # 检查后面的几行是否包含 YAML 字段
-                found_yaml_field = False
-                for check_line in range(i + 1, min(i + 5, len(lines))):
-                    if any(keyword in lines[check_line] for keyword in ['id:', 'type:', 'difficulty:', 'tags:']):
-                        found_yaml_field = True
-                        break
-                if found_yaml_field:
-                    frontmatter_starts.append(i)
-    
-    question_blocks = []
-    
-    # 根据frontmatter位置分割内容
-    for i, start_line in enumerate(frontmatter_starts):
-        if i + 1 < len(frontmatter_starts):
-            end_line = frontmatter_starts[i + 1]
-        else:
-            end_line = len(lines)
-        
-        block_lines = lines[start_line:end_line]
-        block_content = '\n'.join(block_lines).strip()
-        
-        if block_content and '题目' in block_content:
-            question_blocks.append(block_content)
+    question_blocks = parser.split_question_blocks(content)
     
     print(f"找到 {len(question_blocks)} 个问题块")
     
@@ -0,0 +1,5 @@
+"""
+Markdown 问答库文字转语音工具包
+
+命令行入口: python3 -m tts <子命令>（见 tts.cli）
+"""
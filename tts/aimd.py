@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+合成并发与请求速率控制
+  StaticLimiter  固定并发数（配置中的 concurrency）
+  AIMDController 加性增、乘性减：根据滚动 p95 延迟和错误/限流信号自动调整并发数和请求速率，
+                 学到的工作点保存在状态文件中，下次运行从这里开始
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_ADAPTIVE: Dict[str, Any] = {
+    'min_concurrency': 1,
+    'max_concurrency': 8,
+    'initial_concurrency': 1,  # 没有状态文件时的起点
+    'min_rate': 0.05,  # 每秒请求数下限
+    'max_rate': 4.0,  # 每秒请求数上限
+    'initial_rate': 0.5,
+    'rate_step': 0.25,  # 每个健康窗口增加的每秒请求数
+    'decrease_factor': 0.7,  # 拥塞时的乘性减少系数
+    'latency_tolerance': 2.0,  # 窗口 p95 超过基线 p95 的倍数即视为拥塞
+    'latency_floor': 0.5,  # p95 低于该值（秒）时不视为拥塞，避免极短请求的抖动触发降速
+    'window': 5,  # 每完成多少次请求评估一次
+    'state_file': 'aimd_state.json'
+}
+
+# 这些 HTTP 状态码表示被限流或服务过载
+THROTTLE_STATUS = (429, 503)
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """判断异常是否是限流/封禁信号（edge-tts 的握手失败会带 status，或在消息中出现状态码）"""
+    if getattr(error, 'status', None) in THROTTLE_STATUS:
+        return True
+    message = str(error)
+    return any(str(code) in message for code in THROTTLE_STATUS) or 'Too Many Requests' in message
+
+
+def percentile(values, fraction: float) -> float:
+    """最近邻法求分位数"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class StaticLimiter:
+    """固定并发上限"""
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = max(1, int(concurrency))
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self.semaphore:
+            yield
+
+    def describe(self) -> str:
+        return f"固定并发 {self.concurrency}"
+
+
+class AIMDController:
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        AIMD 并发/速率控制器
+
+        每完成 window 次请求评估一次：窗口 p95 延迟不超过 基线 × latency_tolerance 时
+        并发数 +1、速率 +rate_step；出现限流错误或 p95 超标时两者都乘以 decrease_factor。
+        基线 p95 取历次健康窗口中最小的 p95，随状态一起保存。
+
+        Args:
+            config: 配置中的 adaptive 字段，缺省项使用 DEFAULT_ADAPTIVE
+        """
+        self.config = {**DEFAULT_ADAPTIVE, **(config or {})}
+        self.state_file = Path(self.config['state_file']) if self.config.get('state_file') else None
+        self.concurrency = float(self.config['initial_concurrency'])
+        self.rate = float(self.config['initial_rate'])
+        self.baseline_p95: Optional[float] = None
+        self.load_state()
+
+        self.latencies = deque(maxlen=max(1, int(self.config['window'])) * 2)
+        self.samples_since_adjust = 0
+        self.in_flight = 0
+        self.next_start = 0.0  # 下一个请求最早的开始时间（monotonic）
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+        self.completed = 0
+        self.throttled = 0
+        self.failed = 0
+
+    # ---------- 状态持久化 ----------
+
+    def load_state(self):
+        """读取上次运行学到的工作点"""
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.concurrency = float(state.get('concurrency', self.concurrency))
+            self.rate = float(state.get('rate', self.rate))
+            self.baseline_p95 = state.get('baseline_p95')
+            self.clamp()
+            print(f"🎛️  从 {self.state_file} 恢复工作点: {self.describe()}")
+        except Exception as e:
+            print(f"⚠️  读取自适应状态失败，使用初始值: {e}")
+
+    def save_state(self):
+        if not self.state_file:
+            return
+        state = {
+            'concurrency': round(self.concurrency, 3),
+            'rate': round(self.rate, 4),
+            'baseline_p95': self.baseline_p95,
+            'updated_at': datetime.now().isoformat()
+        }
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            tmp_file.replace(self.state_file)
+        except Exception as e:
+            print(f"⚠️  保存自适应状态失败: {e}")
+
+    # ---------- 控制 ----------
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self.concurrency))
+
+    def clamp(self):
+        self.concurrency = min(max(self.concurrency, self.config['min_concurrency']), self.config['max_concurrency'])
+        self.rate = min(max(self.rate, self.config['min_rate']), self.config['max_rate'])
+
+    def describe(self) -> str:
+        baseline = f", 基线 p95 {self.baseline_p95:.2f}s" if self.baseline_p95 else ""
+        return f"并发 {self.limit}, 速率 {self.rate:.2f} 次/秒{baseline}"
+
+    def increase(self):
+        self.concurrency += 1
+        self.rate += self.config['rate_step']
+        self.clamp()
+
+    def decrease(self, reason: str):
+        now = time.monotonic()
+        # 同一波拥塞只减一次：上次减少后至少经过一个 p95 延迟
+        if now - self.last_decrease < (self.baseline_p95 or 1.0):
+            return
+        self.last_decrease = now
+        self.concurrency *= self.config['decrease_factor']
+        self.rate *= self.config['decrease_factor']
+        self.clamp()
+        self.samples_since_adjust = 0
+        print(f"🔻 {reason}，降低到 {self.describe()}")
+        self.save_state()
+
+    def observe(self, latency: float, error: Optional[BaseException] = None):
+        """记录一次请求的结果并在需要时调整"""
+        if error is not None:
+            if is_throttle_error(error):
+                self.throttled += 1
+                self.decrease(f"被限流 ({error})")
+            else:
+                self.failed += 1
+            return
+
+        self.completed += 1
+        self.latencies.append(latency)
+        self.samples_since_adjust += 1
+        if self.samples_since_adjust < self.config['window']:
+            return
+
+        self.samples_since_adjust = 0
+        p95 = percentile(list(self.latencies)[-int(self.config['window']):], 0.95)
+        if self.baseline_p95 is not None and p95 > max(self.baseline_p95 * self.config['latency_tolerance'],
+                                                        self.config['latency_floor']):
+            self.decrease(f"p95 延迟 {p95:.2f}s 超过基线 {self.baseline_p95:.2f}s 的 {self.config['latency_tolerance']} 倍")
+            return
+
+        self.baseline_p95 = p95 if self.baseline_p95 is None else min(self.baseline_p95, p95)
+        self.increase()
+        print(f"🔺 p95 {p95:.2f}s 正常，提高到 {self.describe()}")
+        self.save_state()
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            # 按当前速率排队：相邻两次请求开始时间至少间隔 1/rate 秒
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + 1.0 / self.rate
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except asyncio.CancelledError:
+                # 排队期间被取消（例如对冲请求的另一路先完成）：归还名额，否则 in_flight 不会再减少
+                await self.release()
+                raise
+
+    async def release(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """占用一个并发名额，退出时按耗时和异常更新工作点"""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.observe(time.monotonic() - started, e)
+            raise
+        else:
+            self.observe(time.monotonic() - started)
+        finally:
+            await self.release()
+
+    def summary(self) -> str:
+        return (f"成功 {self.completed} 次, 限流 {self.throttled} 次, 其他错误 {self.failed} 次; "
+                f"最终工作点: {self.describe()}")
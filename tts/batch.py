@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+安全批量处理 - 避免edge-tts API频率限制
+支持随机间隔和小批量处理，防止IP被封禁
+"""
+
+import copy
+import json
+import time
+import math
+import random
+import asyncio
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from .engine import SpeechEngine
+from .offload import BackgroundWriter
+from .questions import MarkdownQuestionParser
+
+# --plan 估算参数（没有历史吞吐数据时使用的默认值）
+DEFAULT_REQUEST_OVERHEAD = 2.5  # 每次请求的固定耗时（秒）：获取语音列表 + 建立连接
+DEFAULT_SECONDS_PER_CHAR = 0.02  # 每个字符的合成耗时（秒）
+DEFAULT_AUDIO_SECONDS_PER_CHAR = 0.25  # 每个字符对应的音频时长（秒），中文约每分钟240字
+AUDIO_BITRATE = 48000  # edge-tts 默认输出 audio-24khz-48kbitrate-mono-mp3
+QUESTION_GAP_SECONDS = 2.0  # 批次内问题之间的平均间隔（random.uniform(1, 3)）
+HISTORY_LIMIT = 1000  # 历史吞吐文件最多保留的请求记录数
+
+class SafeBatchProcessor:
+    def __init__(self, input_file: str, output_dir: str, 
+                 batch_size_range: tuple = (3, 5),
+                 interval_range: tuple = (5, 15),
+                 engine: SpeechEngine = None,
+                 start_from: int = 1,
+                 combined: bool = False,
+                 skip_lines: Optional[set] = None):
+        """
+        安全批量处理器
+        
+        Args:
+            input_file: 输入markdown文件路径
+            output_dir: 输出目录路径
+            batch_size_range: 每批处理的问题数量范围 (最小, 最大)
+            interval_range: 批次间隔时间范围 (最小分钟, 最大分钟)
+            engine: 合成引擎，所有问题共用（语音只查找一次）
+            start_from: 没有进度文件时从第几个问题开始
+            combined: 每个问题只发一次合成请求（见 MarkdownQuestionParser.generate_combined_audio）
+            skip_lines: 要排除的问题块的起始行号（合成前校验未通过的块）
+        """
+        self.input_file = input_file
+        self.output_dir = Path(output_dir)
+        self.batch_size_range = batch_size_range
+        self.interval_range = interval_range
+        self.start_from = max(1, start_from)
+        
+        # 状态文件，用于记录处理进度
+        self.progress_file = self.output_dir / "batch_progress.json"
+        
+        # 日志文件
+        self.log_file = self.output_dir / "batch_processing.log"
+        self.log_writer = None  # 第一次写日志时创建，由后台线程追加写入
+        
+        # 历史吞吐文件，记录每次TTS请求的字符数和耗时，供 --plan 估算
+        self.history_file = self.output_dir / "synthesis_history.json"
+        
+        # 创建输出目录
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 所有问题共用一个解析器和引擎
+        self.parser = MarkdownQuestionParser(self.input_file, str(self.output_dir), engine=engine,
+                                             combined=combined, skip_lines=skip_lines)
+        self.history_flushed = 0  # parser.synthesis_stats 中已写入历史文件的条数
+        self.skipped_questions = set()  # 校验未通过、不合成的问题编号（仍占用编号，进度照常推进）
+        
+    def log(self, message: str):
+        """记录日志"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_message = f"[{timestamp}] {message}"
+        
+        # 输出到控制台
+        print(log_message)
+        
+        # 写入日志文件：放进后台写入线程的队列，不在事件循环中打开/写文件
+        if self.log_writer is None:
+            self.log_writer = BackgroundWriter(self.log_file)
+        self.log_writer.write(log_message + '\n')
+    
+    def load_progress(self) -> Dict[str, Any]:
+        """加载处理进度"""
+        if self.progress_file.exists():
+            try:
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.log(f"加载进度文件失败: {e}")
+        
+        return {
+            'processed_questions': self.start_from - 1,
+            'total_questions': 0,
+            'failed_questions': [],
+            'completed_batches': 0,
+            'start_time': None,
+            'last_batch_time': None
+        }
+    
+    def save_progress(self, progress: Dict[str, Any]):
+        """保存处理进度"""
+        try:
+            with open(self.progress_file, 'w', encoding='utf-8') as f:
+                json.dump(progress, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.log(f"保存进度文件失败: {e}")
+    
+    async def get_question_blocks(self) -> List[str]:
+        """获取所有问题块"""
+        # 读取文件内容
+        with open(self.input_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # 使用与 questions 子命令相同的解析逻辑和编号
+        numbered = self.parser.numbered_question_blocks(content)
+        self.skipped_questions = {num for num, line, _ in numbered if line in self.parser.skip_lines}
+        return [block for _, _, block in numbered]
+    
+    def load_history(self) -> List[Dict[str, Any]]:
+        """加载历史吞吐记录"""
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('samples', [])
+            except Exception as e:
+                self.log(f"加载吞吐历史失败: {e}")
+        return []
+    
+    def record_history(self, samples: List[Dict[str, Any]]):
+        """追加本次合成的吞吐记录"""
+        if not samples:
+            return
+        history = (self.load_history() + samples)[-HISTORY_LIMIT:]
+        try:
+            with open(self.history_file, 'w', encoding='utf-8') as f:
+                json.dump({'samples': history}, f, ensure_ascii=False)
+        except Exception as e:
+            self.log(f"保存吞吐历史失败: {e}")
+    
+    def estimate_throughput(self, samples: List[Dict[str, Any]]) -> Dict[str, float]:
+        """根据历史记录拟合 每次请求耗时 = 固定开销 + 字符数 × 单字耗时"""
+        overhead = DEFAULT_REQUEST_OVERHEAD
+        per_char = DEFAULT_SECONDS_PER_CHAR
+        audio_per_char = DEFAULT_AUDIO_SECONDS_PER_CHAR
+        
+        if samples:
+            n = len(samples)
+            mean_chars = sum(x['chars'] for x in samples) / n
+            mean_seconds = sum(x['seconds'] for x in samples) / n
+            var_chars = sum((x['chars'] - mean_chars) ** 2 for x in samples)
+            if n >= 2 and var_chars > 0:
+                # 最小二乘拟合，截距和斜率都不允许为负
+                cov = sum((x['chars'] - mean_chars) * (x['seconds'] - mean_seconds) for x in samples)
+                per_char = max(cov / var_chars, 0.0)
+                overhead = max(mean_seconds - per_char * mean_chars, 0.0)
+            else:
+                per_char = 0.0
+                overhead = mean_seconds
+            
+            total_chars = sum(x['chars'] for x in samples)
+            total_bytes = sum(x.get('bytes', 0) for x in samples)
+            if total_chars and total_bytes:
+                audio_per_char = total_bytes * 8 / AUDIO_BITRATE / total_chars
+        
+        return {
+            'samples': len(samples),
+            'request_overhead': overhead,
+            'seconds_per_char': per_char,
+            'audio_seconds_per_char': audio_per_char
+        }
+    
+    async def plan(self) -> Dict[str, Any]:
+        """只解析、不合成：统计每段的精确字符数并预估请求数、音频时长和总耗时"""
+        question_blocks = await self.get_question_blocks()
+        parser = self.parser
+        
+        # 从上次停止的地方开始估算
+        progress = self.load_progress()
+        start_index = min(progress['processed_questions'], len(question_blocks))
+        remaining_blocks = question_blocks[start_index:]
+        
+        sections = {
+            'question': {'requests': 0, 'chars': 0, 'max_chars': 0},
+            'simple_answer': {'requests': 0, 'chars': 0, 'max_chars': 0},
+            'detailed_analysis': {'requests': 0, 'chars': 0, 'max_chars': 0}
+        }
+        invalid_blocks = 0
+        combined_requests = 0  # 合并模式下每个有内容的问题只发一次请求
+        for block in remaining_blocks:
+            question_data = parser.parse_question_block(block)
+            if not question_data:
+                invalid_blocks += 1
+                continue
+            if any(parser.prepare_tts_text(question_data[key]) for key in sections):
+                combined_requests += 1
+            for key, stats in sections.items():
+                chars = len(parser.prepare_tts_text(question_data[key]))
+                if chars == 0:
+                    continue  # generate_audio 会跳过空文本，不产生请求
+                stats['requests'] += 1
+                stats['chars'] += chars
+                stats['max_chars'] = max(stats['max_chars'], chars)
+        
+        questions = len(remaining_blocks)
+        requests = combined_requests if parser.combined else sum(x['requests'] for x in sections.values())
+        chars = sum(x['chars'] for x in sections.values())
+        throughput = self.estimate_throughput(self.load_history())
+        
+        # 按当前的批次策略估算等待时间
+        avg_batch_size = (self.batch_size_range[0] + self.batch_size_range[1]) / 2
+        avg_interval = (self.interval_range[0] + self.interval_range[1]) / 2 * 60
+        batches = math.ceil(questions / avg_batch_size) if questions else 0
+        synthesis_seconds = requests * throughput['request_overhead'] + chars * throughput['seconds_per_char']
+        gap_seconds = max(questions - batches, 0) * QUESTION_GAP_SECONDS
+        wait_seconds = max(batches - 1, 0) * avg_interval
+        total_seconds = synthesis_seconds + gap_seconds + wait_seconds
+        audio_minutes = chars * throughput['audio_seconds_per_char'] / 60
+        
+        labels = {'question': '问题', 'simple_answer': '简答', 'detailed_analysis': '解析'}
+        print(f"\n{'='*50}")
+        print("📋 处理计划（不执行合成）")
+        print(f"   输入文件: {self.input_file}")
+        print(f"   待处理问题: {questions} 个 (已完成 {start_index} 个, 解析失败 {invalid_blocks} 个)")
+        for key, stats in sections.items():
+            print(f"   {labels[key]}: {stats['requests']} 次请求, {stats['chars']} 字符, 最长 {stats['max_chars']} 字符")
+        print(f"   TTS请求总数: {requests}{' (合并模式，每个问题一次请求)' if parser.combined else ''}, 字符总数: {chars}")
+        print(f"   预计音频时长: {audio_minutes:.1f} 分钟")
+        if throughput['samples']:
+            print(f"   吞吐数据: 基于 {throughput['samples']} 次历史请求 "
+                  f"(每次 {throughput['request_overhead']:.2f} 秒 + 每字 {throughput['seconds_per_char'] * 1000:.1f} 毫秒)")
+        else:
+            print("   吞吐数据: 无历史记录，使用默认值")
+        print(f"   批次策略: 每批 {self.batch_size_range[0]}-{self.batch_size_range[1]} 个问题, "
+              f"间隔 {self.interval_range[0]}-{self.interval_range[1]} 分钟 -> 约 {batches} 个批次")
+        print(f"   预计耗时: 合成 {synthesis_seconds/60:.1f} 分钟 + 问题间隔 {gap_seconds/60:.1f} 分钟 "
+              f"+ 批次等待 {wait_seconds/60:.1f} 分钟 = {total_seconds/3600:.2f} 小时")
+        print(f"   预计完成时间: {datetime.fromtimestamp(time.time() + total_seconds).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"{'='*50}")
+        
+        return {
+            'questions': questions,
+            'invalid_blocks': invalid_blocks,
+            'sections': sections,
+            'requests': requests,
+            'chars': chars,
+            'batches': batches,
+            'audio_minutes': audio_minutes,
+            'wall_clock_seconds': total_seconds,
+            'throughput': throughput
+        }
+    
+    async def process_single_question(self, question_block: str, question_num: int) -> bool:
+        """处理单个问题"""
+        if question_num in self.skipped_questions:
+            self.log(f"⚠️  跳过问题 {question_num}（校验未通过）")
+            return True
+        try:
+            parser = self.parser
+            
+            # 解析问题块
+            question_data = parser.parse_question_block(question_block)
+            if not question_data:
+                self.log(f"✗ 问题 {question_num} 解析失败")
+                return False
+            
+            # 创建问题目录和音频文件
+            await parser.create_question_directory(question_data, question_num)
+            # 并发处理时多个问题共用解析器，只写入上次之后新增的记录
+            new_samples = parser.synthesis_stats[self.history_flushed:]
+            self.history_flushed = len(parser.synthesis_stats)
+            await parser.engine.offload.io(self.record_history, new_samples)
+            
+            question_id = question_data['metadata'].get('id', f'q{question_num:04d}')
+            id_prefix = str(question_id)[:8] if question_id else f'q{question_num:04d}'
+            self.log(f"✓ 问题 {question_num} 处理完成 (ID: {id_prefix}, 目录: q{question_num:04d}_{id_prefix})")
+            return True
+            
+        except Exception as e:
+            self.log(f"✗ 问题 {question_num} 处理出错: {e}")
+            return False
+    
+    async def process_batch(self, question_blocks: List[str], start_index: int, batch_size: int) -> int:
+        """处理一批问题"""
+        success_count = 0
+        
+        for i in range(batch_size):
+            if start_index + i >= len(question_blocks):
+                break
+            
+            question_num = start_index + i + 1
+            block = question_blocks[start_index + i]
+            
+            if await self.process_single_question(block, question_num):
+                success_count += 1
+            
+            # 问题之间小间隔（1-3秒）
+            if i < batch_size - 1:
+                await asyncio.sleep(random.uniform(1, 3))
+        
+        return success_count
+    
+    def calculate_next_interval(self) -> int:
+        """计算下次处理的间隔时间（秒）"""
+        interval_minutes = random.uniform(self.interval_range[0], self.interval_range[1])
+        return int(interval_minutes * 60)
+    
+    def calculate_batch_size(self) -> int:
+        """计算本批次处理的问题数量"""
+        return random.randint(self.batch_size_range[0], self.batch_size_range[1])
+    
+    async def run_adaptive(self):
+        """
+        自适应处理：不再分批等待，所有剩余问题交给引擎的 AIMD 控制器调度，
+        并发数和请求速率根据延迟和限流信号自动调整
+        """
+        engine = self.parser.engine
+        self.log("=" * 60)
+        self.log("开始自适应批量处理")
+        self.log(f"输入文件: {self.input_file}")
+        self.log(f"输出目录: {self.output_dir}")
+        self.log(f"起始工作点: {engine.limiter.describe()}")
+        self.log("=" * 60)
+        
+        question_blocks = await self.get_question_blocks()
+        total_questions = len(question_blocks)
+        if total_questions == 0:
+            self.log("未找到任何问题块，退出处理")
+            return
+        
+        progress = self.load_progress()
+        progress['total_questions'] = total_questions
+        if progress['start_time'] is None:
+            progress['start_time'] = datetime.now().isoformat()
+        self.log(f"总共发现 {total_questions} 个问题，已处理 {progress['processed_questions']} 个")
+        
+        # 问题完成顺序不固定：processed_questions 只推进到连续完成的位置，中断后从这里继续
+        finished = set()
+        parallel = asyncio.Semaphore(engine.max_parallel)
+        
+        async def process(index: int):
+            async with parallel:
+                ok = await self.process_single_question(question_blocks[index], index + 1)
+            finished.add(index)
+            if not ok:
+                progress['failed_questions'].append(index + 1)
+            while progress['processed_questions'] in finished:
+                progress['processed_questions'] += 1
+            progress['last_batch_time'] = datetime.now().isoformat()
+            # 写入时 progress 可能被其他问题修改，交给 I/O 线程的是一份快照
+            await engine.offload.io(self.save_progress, copy.deepcopy(progress))
+        
+        await asyncio.gather(*(process(i) for i in range(progress['processed_questions'], total_questions)))
+        
+        total_time = (datetime.now() - datetime.fromisoformat(progress['start_time'])).total_seconds()
+        self.log("\n" + "=" * 60)
+        self.log("自适应批量处理完成!")
+        self.log(f"总共处理: {progress['processed_questions']}/{total_questions} 个问题")
+        self.log(f"总耗时: {total_time/60:.1f} 分钟")
+        self.log(f"请求统计: {engine.limiter.summary()}")
+        if engine.host_bucket:
+            self.log(engine.host_bucket.summary())
+        self.log(engine.loop_lag.summary())
+        self.log(f"失败问题数: {len(progress['failed_questions'])}")
+        if progress['failed_questions']:
+            self.log(f"失败问题编号: {sorted(progress['failed_questions'])}")
+        self.log("=" * 60)
+    
+    async def run(self):
+        """运行批量处理"""
+        if self.parser.engine.config.get('adaptive', {}).get('enabled'):
+            await self.run_adaptive()
+            return
+        
+        self.log("=" * 60)
+        self.log("开始安全批量处理")
+        self.log(f"输入文件: {self.input_file}")
+        self.log(f"输出目录: {self.output_dir}")
+        self.log(f"批次大小范围: {self.batch_size_range}")
+        self.log(f"间隔时间范围: {self.interval_range[0]}-{self.interval_range[1]} 分钟")
+        self.log("=" * 60)
+        
+        # 获取所有问题块
+        question_blocks = await self.get_question_blocks()
+        total_questions = len(question_blocks)
+        
+        if total_questions == 0:
+            self.log("未找到任何问题块，退出处理")
+            return
+        
+        # 加载进度
+        progress = self.load_progress()
+        progress['total_questions'] = total_questions
+        
+        if progress['start_time'] is None:
+            progress['start_time'] = datetime.now().isoformat()
+        
+        self.log(f"总共发现 {total_questions} 个问题")
+        self.log(f"已处理 {progress['processed_questions']} 个问题")
+        
+        # 从上次停止的地方继续
+        current_index = progress['processed_questions']
+        
+        while current_index < total_questions:
+            # 计算本批次大小
+            batch_size = self.calculate_batch_size()
+            remaining = total_questions - current_index
+            actual_batch_size = min(batch_size, remaining)
+            
+            self.log(f"\n--- 批次 {progress['completed_batches'] + 1} ---")
+            self.log(f"处理问题 {current_index + 1}-{current_index + actual_batch_size} / {total_questions}")
+            
+            # 处理当前批次
+            success_count = await self.process_batch(question_blocks, current_index, actual_batch_size)
+            
+            # 更新进度
+            current_index += actual_batch_size
+            progress['processed_questions'] = current_index
+            progress['completed_batches'] += 1
+            progress['last_batch_time'] = datetime.now().isoformat()
+            
+            if success_count < actual_batch_size:
+                failed_count = actual_batch_size - success_count
+                progress['failed_questions'].extend(range(current_index - failed_count + 1, current_index + 1))
+            
+            await self.parser.engine.offload.io(self.save_progress, progress)
+            
+            self.log(f"批次完成: {success_count}/{actual_batch_size} 成功")
+            
+            # 如果还有剩余问题，等待间隔时间
+            if current_index < total_questions:
+                interval_seconds = self.calculate_next_interval()
+                interval_minutes = interval_seconds / 60
+                
+                self.log(f"等待 {interval_minutes:.1f} 分钟后处理下一批次...")
+                self.log(f"预计完成时间: {datetime.fromtimestamp(time.time() + interval_seconds * (total_questions - current_index) / actual_batch_size).strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                # 分段显示倒计时
+                for remaining_time in range(interval_seconds, 0, -60):
+                    minutes_left = remaining_time // 60
+                    if minutes_left > 0:
+                        self.log(f"剩余等待时间: {minutes_left} 分钟")
+                    await asyncio.sleep(min(60, remaining_time))
+        
+        # 处理完成
+        total_time = (datetime.now() - datetime.fromisoformat(progress['start_time'])).total_seconds()
+        self.log("\n" + "=" * 60)
+        self.log("批量处理完成!")
+        self.log(f"总共处理: {progress['processed_questions']}/{total_questions} 个问题")
+        self.log(f"总耗时: {total_time/3600:.1f} 小时")
+        self.log(self.parser.engine.loop_lag.summary())
+        self.log(f"失败问题数: {len(progress['failed_questions'])}")
+        if progress['failed_questions']:
+            self.log(f"失败问题编号: {progress['failed_questions']}")
+        self.log("=" * 60)
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+基准测试
+  startup  - 各子命令的启动耗时（python -X importtime），并检查解析/列表类命令没有加载重型依赖
+  markdown - Markdown 清理方式对比：原正则替换、原 markdown -> HTML -> 剥标签、单次扫描提取器
+  adaptive - 离线后端模拟有容量上限和限流的服务，对比固定并发与 AIMD 自适应并发的吞吐
+  schedule - 离线后端按字数模拟耗时，对比各调度策略的总完成时间和短音频的可用时间
+  hedge    - 离线后端模拟偶发卡顿，对比不对冲 / 对冲时每个文件耗时的 p50 和 p99
+  validate - 在合成的大题库上对比单进程 / 进程池校验的耗时
+  transcode - 各输出格式每分钟音频的字节数，单进程 / 进程池的转码速度
+  bundle   - 按问题 id + 段落随机读取：逐个打开小文件 / 音频包（mmap）
+  lexicon  - 发音词表从 12 个到数千个术语：逐条正则替换 / 编译成一个前缀树正则一遍扫描
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .markdown_text import markdown_to_text
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS_FILE = "vue/vue_questions-md-format_uuid.md"
+# 解析/列表类命令不应加载的模块
+HEAVY_MODULES = ('edge_tts', 'aiohttp', 'markdown', 'bs4', 'numpy', 'pydub')
+STARTUP_BUDGET_MS = 100
+
+
+def legacy_regex_clean(text: str) -> str:
+    """question_to_speech.py 原来的 clean_markdown_text（保留原实现用于对比）"""
+    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
+    text = re.sub(r'\*([^*]+)\*', r'\1', text)
+    text = re.sub(r'__([^_]+)__', r'\1', text)
+    text = re.sub(r'_([^_]+)_', r'\1', text)
+    text = re.sub(r'\[([^\]]+)\]\$\$[^)]+\$\$', r'\1', text)
+    text = re.sub(r'!\[([^\]]*)\]\$\$[^)]+\$\$', '', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+
+def legacy_html_clean(content: str) -> str:
+    """md_to_speech.py 原来的 clean_markdown_and_insert_pause（保留原实现用于对比）"""
+    import markdown
+    content = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
+    html = markdown.markdown(content)
+    html = re.sub(r"</(p|h[1-6]|li|ul|ol|blockquote|pre)>", r"</\1>\n", html, flags=re.I)
+    text = re.sub(r"<[^>]+>", " ", html)
+    text = re.sub(r"\n\s*\n+", "\n", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return text.strip()
+
+
+def load_corpus(corpus_dir: str) -> List[str]:
+    """读取语料目录下的所有 Markdown 文件，并按分割线拆成段落（与各脚本的输入粒度一致）"""
+    sections = []
+    for path in sorted(Path(corpus_dir).glob("*.md")):
+        content = path.read_text(encoding='utf-8')
+        sections.extend(s for s in re.split(r'^\s*-{3,}\s*$', content, flags=re.MULTILINE) if s.strip())
+    return sections
+
+
+def bench(name: str, func: Callable[[str], str], sections: List[str], rounds: int):
+    """运行 rounds 轮并打印每轮耗时和吞吐"""
+    total_chars = sum(len(s) for s in sections)
+    output_chars = sum(len(func(s)) for s in sections)  # 预热，同时统计输出长度
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for section in sections:
+            func(section)
+    elapsed = time.perf_counter() - started
+    per_round_ms = elapsed / rounds * 1000
+    throughput = total_chars * rounds / elapsed / 1e6
+    print(f"   {name:<13} {per_round_ms:8.2f} ms/轮  {throughput:6.2f} M字符/秒  输出 {output_chars} 字符")
+
+
+def run_markdown_bench(corpus_dir: str = "vue", rounds: int = 50) -> bool:
+    """对比三种 Markdown 清理方式的耗时"""
+    sections = load_corpus(corpus_dir)
+    if not sections:
+        print(f"❌ 目录 '{corpus_dir}' 中没有 Markdown 内容")
+        return False
+
+    print(f"📚 语料: {corpus_dir}/ 共 {len(sections)} 段, {sum(len(s) for s in sections)} 字符, {rounds} 轮")
+    bench("regex", legacy_regex_clean, sections, rounds)
+    try:
+        bench("html", legacy_html_clean, sections, rounds)
+    except ImportError:
+        print("   html          跳过（未安装 markdown: pip install markdown）")
+    bench("token-stream", markdown_to_text, sections, rounds)
+    return True
+
+
+def startup_commands(corpus_file: str, scratch_dir: str) -> Dict[str, List[str]]:
+    """需要快速启动的子命令（都不涉及合成）"""
+    return {
+        'help': ['--help'],
+        'check': ['check', corpus_file],
+        'inventory': ['inventory', scratch_dir],
+        'dry-run': ['questions', corpus_file, str(Path(scratch_dir) / 'out'), '--dry-run'],
+    }
+
+
+def imported_modules(argv: List[str]) -> Tuple[float, Set[str]]:
+    """用 -X importtime 运行一次命令，返回 (顶层导入总耗时毫秒, 导入的顶层包名)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'tts', *argv],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        # 格式: "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # 表头
+        modules.add(name.strip().split('.')[0])
+        if not name[1:].startswith(' '):  # 没有缩进的是顶层导入
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def measure_startup(argv: List[str], runs: int) -> List[float]:
+    """运行 runs 次命令，返回每次的墙钟耗时（毫秒）"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'tts', *argv], cwd=REPO_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_startup_bench(runs: int = 5, budget_ms: float = STARTUP_BUDGET_MS,
+                      corpus_file: str = DEFAULT_CORPUS_FILE) -> bool:
+    """测量解析/列表类子命令的启动耗时，超出预算或加载了重型依赖时返回 False"""
+    ok = True
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        print(f"⏱️  启动耗时（{runs} 次取中位数，预算 {budget_ms:.0f} ms）")
+        for name, argv in startup_commands(corpus_file, scratch_dir).items():
+            timings = measure_startup(argv, runs)
+            import_ms, modules = imported_modules(argv)
+            heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+            median = statistics.median(timings)
+            passed = median <= budget_ms and not heavy
+            ok = ok and passed
+            status = "✅" if passed else "❌"
+            print(f"   {status} {name:<10} 中位数 {median:6.1f} ms  最快 {min(timings):6.1f} ms  "
+                  f"导入 {import_ms:6.1f} ms  重型依赖: {', '.join(heavy) or '无'}")
+    return ok
+
+
+# adaptive 基准使用的模拟服务：同时处理 4 个请求，每秒超过 3 个请求返回 429
+SIMULATED_SERVICE = {'latency': 0.2, 'seconds_per_char': 0.0005, 'capacity': 4, 'throttle_rate': 3}
+RETRY_DELAY = 1.0
+
+
+async def simulate_run(config: dict, texts: List[str], output_dir: str) -> Dict[str, Any]:
+    """用离线后端合成所有文本，被限流的请求等待 1 秒后重试，返回 耗时、限流次数和结束时的工作点"""
+    import asyncio
+    from .engine import SpeechEngine
+
+    engine = SpeechEngine(config)
+    parallel = asyncio.Semaphore(engine.max_parallel)
+    throttled = 0
+
+    async def synthesize(index: int, text: str):
+        nonlocal throttled
+        async with parallel:
+            while True:
+                try:
+                    await engine.synthesize(text, Path(output_dir) / f"{index:04d}.mp3")
+                    return
+                except Exception:
+                    throttled += 1
+                    await asyncio.sleep(RETRY_DELAY)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(synthesize(i, text) for i, text in enumerate(texts)))
+    return {
+        'seconds': time.perf_counter() - started,
+        'throttled': throttled,
+        'limiter': engine.limiter.describe()
+    }
+
+
+def run_adaptive_bench(requests: int = 120, runs: int = 2) -> bool:
+    """固定并发 1 / 固定并发 8 / AIMD 自适应（连续运行 runs 次，第二次从保存的工作点开始）"""
+    import asyncio
+    from .config import DEFAULT_CONFIG, mode_config
+
+    texts = [f"第{i}段测试文本，" + "内容" * (20 + i % 80) for i in range(requests)]
+    print(f"🎛️  模拟服务: 容量 {SIMULATED_SERVICE['capacity']} 个并发, "
+          f"超过 {SIMULATED_SERVICE['throttle_rate']} 次/秒返回 429; 共 {requests} 次请求")
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        base = mode_config(DEFAULT_CONFIG, 'bench', {'backend': 'offline', 'offline': SIMULATED_SERVICE})
+        cases = [
+            ('固定并发 1', {'concurrency': 1}),
+            ('固定并发 8', {'concurrency': 8}),
+        ] + [(f'AIMD 第{i}次', {'adaptive': {'enabled': True,
+                                             'state_file': str(Path(scratch_dir) / 'aimd.json')}})
+             for i in range(1, runs + 1)]
+        results = []
+        for name, overrides in cases:
+            results.append((name, asyncio.run(simulate_run(mode_config(base, 'bench', overrides), texts, scratch_dir))))
+
+        print(f"\n{'='*50}")
+        for name, result in results:
+            throughput = len(texts) / result['seconds']
+            print(f"   {name:<8} 耗时 {result['seconds']:6.1f} s  吞吐 {throughput:5.2f} 次/秒  "
+                  f"429 {result['throttled']:4d} 次  结束时: {result['limiter']}")
+    return True
+
+
+# schedule 基准：每次请求 0.05 秒 + 每字 2 毫秒
+SCHEDULE_SERVICE = {'latency': 0.05, 'seconds_per_char': 0.002}
+
+
+def run_schedule_bench(corpus_file: str = DEFAULT_CORPUS_FILE, workers: int = 4) -> bool:
+    """对比 fifo / lpt / priority(section) 三种策略：总完成时间、问题和简答全部可用的时间"""
+    import asyncio
+    from .config import DEFAULT_CONFIG, mode_config
+    from .engine import SpeechEngine
+    from .questions import MarkdownQuestionParser
+    from .scheduler import parse_priorities
+
+    policies = [('fifo', None), ('lpt', None), ('priority', parse_priorities(['section']))]
+    results = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        config = mode_config(DEFAULT_CONFIG, 'bench', {'backend': 'offline', 'offline': SCHEDULE_SERVICE,
+                                                         'concurrency': workers})
+        for policy, priorities in policies:
+            parser = MarkdownQuestionParser(str(REPO_ROOT / corpus_file), str(Path(scratch_dir) / policy),
+                                            verbose=False, engine=SpeechEngine(config),
+                                            policy=policy, priorities=priorities)
+            jobs = parser.build_jobs(parser.load_questions())
+            finished = asyncio.run(parser.synthesize_jobs(jobs))
+            short = [seconds for job, seconds in finished if job['key'] in ('audio_question', 'audio_simple')]
+            results.append((policy, max(seconds for _, seconds in finished), max(short),
+                            statistics.mean(seconds for _, seconds in finished)))
+
+        total_chars = sum(job['chars'] for job in jobs)
+        ideal = (len(jobs) * SCHEDULE_SERVICE['latency'] + total_chars * SCHEDULE_SERVICE['seconds_per_char']) / workers
+        longest = max(SCHEDULE_SERVICE['latency'] + job['chars'] * SCHEDULE_SERVICE['seconds_per_char'] for job in jobs)
+
+    print(f"\n{'='*50}")
+    print(f"🗓️  调度策略对比: {len(jobs)} 个任务, {workers} 个并发, 理论下限 {max(ideal, longest):.2f} s")
+    for policy, makespan, short_ready, mean_done in results:
+        print(f"   {policy:<9} 总完成 {makespan:6.2f} s  问题/简答全部可用 {short_ready:6.2f} s  平均完成 {mean_done:6.2f} s")
+    return True
+
+
+# hedge 基准：每次请求 0.2 秒 + 每字 1 毫秒，3% 的请求额外卡住 5 秒
+HEDGE_SERVICE = {'latency': 0.2, 'seconds_per_char': 0.001, 'stall_probability': 0.03, 'stall_seconds': 5.0,
+                 'seed': 7}
+
+
+async def hedge_run(config: dict, texts: List[str], output_dir: str) -> Dict[str, Any]:
+    """用离线后端合成所有文本，返回每个文件的耗时和对冲统计"""
+    import asyncio
+    from .engine import SpeechEngine
+
+    engine = SpeechEngine(config)
+    parallel = asyncio.Semaphore(engine.max_parallel)
+    latencies = []
+
+    async def synthesize(index: int, text: str):
+        async with parallel:
+            started = time.perf_counter()
+            await engine.synthesize(text, Path(output_dir) / f"{index:04d}.mp3")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(synthesize(i, text) for i, text in enumerate(texts)))
+    return {'seconds': time.perf_counter() - started, 'latencies': latencies, 'hedger': engine.hedger}
+
+
+def run_hedge_bench(requests: int = 200, workers: int = 4) -> bool:
+    """对比不对冲 / 对冲：每个文件耗时的 p50、p99 和总请求数"""
+    import asyncio
+    from .aimd import percentile
+    from .config import DEFAULT_CONFIG, mode_config
+
+    texts = [f"第{i}段测试文本，" + "内容" * (20 + i % 80) for i in range(requests)]
+    print(f"🪃 模拟服务: 每次 {HEDGE_SERVICE['latency']} 秒 + 每字 {HEDGE_SERVICE['seconds_per_char'] * 1000:.0f} 毫秒, "
+          f"{HEDGE_SERVICE['stall_probability']:.0%} 的请求卡住 {HEDGE_SERVICE['stall_seconds']} 秒; "
+          f"共 {requests} 个文件, {workers} 个并发")
+    results = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        for name, hedge in (('不对冲', False), ('对冲', True)):
+            config = mode_config(DEFAULT_CONFIG, 'bench', {'backend': 'offline', 'offline': HEDGE_SERVICE,
+                                                             'concurrency': workers, 'hedge': {'enabled': hedge}})
+            results.append((name, asyncio.run(hedge_run(config, texts, scratch_dir))))
+
+    print(f"\n{'='*50}")
+    for name, result in results:
+        latencies = result['latencies']
+        hedger = result['hedger']
+        print(f"   {name:<4} p50 {percentile(latencies, 0.5):5.2f} s  p99 {percentile(latencies, 0.99):5.2f} s  "
+              f"最大 {max(latencies):5.2f} s  总耗时 {result['seconds']:6.1f} s  "
+              f"请求数 {hedger.requests + hedger.hedged}（对冲 {hedger.hedged}，对冲先完成 {hedger.hedge_wins}）")
+    return True
+
+
+def synthetic_corpus(path: str, questions: int, broken_every: int = 100) -> int:
+    """用示例题库的问题块生成 questions 个问题的合成题库（每 broken_every 个问题破坏一个标题），返回写入的问题数"""
+    import uuid
+    from .questions import MarkdownQuestionParser
+
+    with open(REPO_ROOT / DEFAULT_CORPUS_FILE, 'r', encoding='utf-8') as f:
+        templates = MarkdownQuestionParser("", "", verbose=False).split_question_blocks(f.read())
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(questions):
+            block = re.sub(r'^id: .*$', f"id: {uuid.uuid5(uuid.NAMESPACE_OID, str(i))}",
+                           templates[i % len(templates)], count=1, flags=re.MULTILINE)
+            if broken_every and i % broken_every == broken_every - 1:
+                block = block.replace('## **✅ 精简答案：**', '**✅ 精简答案：**', 1)
+            f.write(block + '\n\n')
+    return questions
+
+
+def run_validate_bench(questions: int = 10000, workers: Optional[int] = None) -> bool:
+    """在合成题库上对比单进程 / 进程池校验的耗时"""
+    from .validate import validate_files
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        corpus = str(Path(scratch_dir) / 'synthetic.md')
+        synthetic_corpus(corpus, questions)
+        results = [('单进程', validate_files([corpus], workers=1)),
+                   ('进程池', validate_files([corpus], workers=workers))]
+
+    print(f"🔎 校验基准: {questions} 个问题（每 100 个破坏一个标题）")
+    for name, report in results:
+        invalid = sum(1 for result in report['results'] if result['errors'])
+        print(f"   {name} {report['workers']:>2} 个进程  用时 {report['seconds']:6.2f} s  "
+              f"{report['blocks'] / report['seconds']:8.0f} 块/秒  发现错误 {invalid} 个")
+    return True
+
+
+def speech_like_clips(directory: Path, count: int, seconds: float) -> List[Path]:
+    """用 ffmpeg 生成类似语音的测试音频（限带粉红噪声按音节节奏调幅，夹杂停顿），格式与合成结果相同"""
+    from .mp3 import BITRATE, SAMPLE_RATE
+
+    clips = []
+    for i in range(count):
+        clip = directory / f"clip_{i:03d}.mp3"
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i',
+                        f"anoisesrc=d={seconds}:c=pink:r={SAMPLE_RATE}:seed={i + 1}",
+                        '-af', f"lowpass=f=4000,volume='0.3*max(0,sin(2*PI*{3 + i % 3}*t))*gt(sin(2*PI*0.4*t),-0.6)':eval=frame",
+                        '-ac', '1', '-b:a', f'{BITRATE // 1000}k', str(clip)], check=True)
+        clips.append(clip)
+    return clips
+
+
+def run_transcode_bench(workers: Optional[int] = None, clips: int = 16, seconds: float = 30.0) -> bool:
+    """对比各格式每分钟音频的字节数，以及单进程 / 进程池的转码速度（音频秒数 / 墙钟秒数）"""
+    import os
+    import shutil
+    from .mp3 import FRAME_SECONDS, frame_index
+    from .transcode import CODECS, transcode_paths
+
+    if not shutil.which('ffmpeg'):
+        print("✗ 需要系统中的 ffmpeg")
+        return False
+    workers = workers or os.cpu_count() or 1
+    variants = [('opus', '16k'), ('opus', '24k'), ('aac', '32k')]
+    rows = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        sources = speech_like_clips(Path(scratch_dir), clips, seconds)
+        audio_seconds = sum(len(frame_index(p.read_bytes())) * FRAME_SECONDS for p in sources)
+        minutes = audio_seconds / 60
+        rows.append(('mp3 48k（原始）', sum(p.stat().st_size for p in sources) / minutes, None, None))
+        print(f"🔄 转码基准: {clips} 个 {seconds:.0f} 秒的测试音频（共 {minutes:.1f} 分钟）")
+        for codec, bitrate in variants:
+            options = {'formats': [codec], 'bitrates': {codec: bitrate}}
+            speeds = []
+            for pool_size in (1, workers):
+                started = time.perf_counter()
+                results = transcode_paths([scratch_dir], options, workers=pool_size, force=True)
+                speeds.append(audio_seconds / (time.perf_counter() - started))
+            size = sum(r['size'] for r in results if 'error' not in r)
+            rows.append((f"{codec} {bitrate}", size / minutes, speeds[0], speeds[1]))
+            for source in sources:
+                source.with_suffix(CODECS[codec]['extension']).unlink(missing_ok=True)
+
+    print(f"\n{'='*50}")
+    for name, bytes_per_minute, single, pooled in rows:
+        line = f"   {name:<16} 每分钟音频 {bytes_per_minute / 1024:7.1f} KB"
+        if single is not None:
+            line += f"  单进程 {single:6.0f} 倍实时  {workers} 个进程 {pooled:6.0f} 倍实时（每核 {pooled / workers:.0f}）"
+        print(line)
+    return True
+
+
+def run_bundle_bench(questions: int = 2000, lookups: int = 20000) -> bool:
+    """对比按问题 id + 段落随机读取：逐个打开小文件 / 音频包（mmap + 内存索引）"""
+    import json
+    import random
+    from .bundle import BundleReader, build_bundle
+
+    sections = ('audio_simple', 'audio_question', 'audio_analysis')
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        source = Path(scratch_dir) / 'bank'
+        paths = {}
+        for i in range(questions):
+            question_dir = source / f"q{i + 1:04d}_{i:08x}"
+            question_dir.mkdir(parents=True)
+            files = {key: f"{question_dir.name}_{key}.mp3" for key in sections}
+            for key, name in files.items():
+                (question_dir / name).write_bytes(rng.randbytes(rng.randint(8, 64) * 1024))
+                paths[(str(i), key)] = question_dir / name
+            files['meta'] = f"{question_dir.name}_meta.json"
+            (question_dir / files['meta']).write_text(json.dumps({'id': str(i), 'files': files}), encoding='utf-8')
+
+        bundle_path = str(Path(scratch_dir) / 'bank.ttsb')
+        build_bundle(bundle_path, [str(source)])
+        keys = [(str(rng.randrange(questions)), rng.choice(sections)) for _ in range(lookups)]
+
+        started = time.perf_counter()
+        total = 0
+        for key in keys:
+            with open(paths[key], 'rb') as f:
+                total += len(f.read())
+        file_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with BundleReader(bundle_path) as reader:
+            open_seconds = time.perf_counter() - started
+            for question_id, section in keys:
+                with reader.get(question_id, section) as view:
+                    total += view.nbytes
+        bundle_seconds = time.perf_counter() - started
+
+    print(f"📦 随机读取 {lookups} 次（{questions} 个问题 × {len(sections)} 段）")
+    print(f"   逐个打开文件  {file_seconds / lookups * 1e6:7.1f} µs/次")
+    print(f"   音频包        {bundle_seconds / lookups * 1e6:7.1f} µs/次（打开并读取索引 {open_seconds * 1000:.1f} ms，零拷贝）")
+    return True
+
+
+def synthetic_terms(count: int, seed: int = 0) -> Dict[str, str]:
+    """count 个驼峰命名的术语（useXxxYyy 形式），朗读形式为拆开的单词"""
+    import random
+    rng = random.Random(seed)
+    syllables = ['ref', 'state', 'effect', 'memo', 'grid', 'flex', 'node', 'query', 'store', 'route', 'slot', 'prop']
+    terms = {}
+    while len(terms) < count:
+        parts = [rng.choice(syllables).capitalize() for _ in range(rng.randint(1, 3))]
+        term = rng.choice(['use', 'on', 'get', 'set']) + ''.join(parts) + str(rng.randrange(100))
+        terms[term] = ' '.join([term[:3]] + parts)
+    return terms
+
+
+def run_lexicon_bench(corpus_dir: str = "vue", rounds: int = 5) -> bool:
+    """
+    对比逐条替换（每个术语一次 re.sub，和原来的生命周期名处理方式相同）与编译后的词表，
+    术语数从内置的 12 个增加到数千个；语料中混入部分术语，两种方式的输出必须一致
+    """
+    from .lexicon import BUILTIN_LEXICONS, Lexicon
+
+    sections = load_corpus(str(REPO_ROOT / corpus_dir))
+    builtin = BUILTIN_LEXICONS['zh']['terms']
+    print(f"📖 语料: {corpus_dir}/ 共 {len(sections)} 段, {sum(len(s) for s in sections)} 字符, {rounds} 轮")
+    ok = True
+    for count in (len(builtin), 1000, 5000):
+        terms = dict(builtin)
+        terms.update(synthetic_terms(count - len(builtin)))
+        extra = list(terms)[len(builtin)::97]
+        texts = [f"{section} {' '.join(extra[i % max(1, len(extra)):][:3])}" for i, section in enumerate(sections)]
+
+        compiled = [re.compile(rf'(?<![A-Za-z0-9]){re.escape(term)}(?![A-Za-z0-9])') for term in terms]
+
+        def per_term(text: str) -> str:
+            for term, pattern in zip(terms, compiled):
+                text = pattern.sub(terms[term], text)
+            return text
+
+        started = time.perf_counter()
+        lexicon = Lexicon(terms, {}, pauses=False)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        timings = {}
+        for name, func in (('逐条替换', per_term), ('词表', lexicon.apply)):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                outputs = [func(text) for text in texts]
+            timings[name] = ((time.perf_counter() - started) / rounds * 1000, outputs)
+        same = timings['逐条替换'][1] == timings['词表'][1]
+        ok = ok and same
+        print(f"   {len(terms):>5} 个术语  逐条替换 {timings['逐条替换'][0]:8.2f} ms/轮  "
+              f"词表 {timings['词表'][0]:6.2f} ms/轮（编译 {compile_ms:.0f} ms）  输出{'一致' if same else '不一致'}")
+    return ok
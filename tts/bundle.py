@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+题库音频包：把一个题库的所有音频和 meta.json 打包成一个文件
+  同步或提供数千个小 MP3 需要数千次打开文件和 inode 查找；打包后整个题库是一个文件，
+  读取端 mmap 整个文件，按 (问题 id, 段落) 在内存索引中 O(1) 查到位置，返回零拷贝的 memoryview。
+
+文件格式（只追加）：
+  [头部 8 字节 MAGIC] [数据块 ...] [索引 JSON] [尾部: 索引偏移 8 字节 | 索引长度 8 字节 | INDEX_MAGIC 8 字节]
+  索引: {"version": 1, "questions": {问题 id: {段落: [偏移, 长度, sha256]}}}
+  再次写入时只在文件末尾追加新的数据块、新的索引和尾部，已有字节从不修改：
+  正在读取的进程不受影响，rsync 等增量同步只传输新增部分；内容相同（sha256 相同）的数据块不会重复写入。
+  读取端总是使用最后一个尾部指向的索引。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .layout import iter_question_dirs
+
+MAGIC = b'TTSBNDL1'
+INDEX_MAGIC = b'TTSIDX01'
+FOOTER = struct.Struct('<QQ8s')
+INDEX_VERSION = 1
+META_SECTION = 'meta'
+
+
+class BundleError(Exception):
+    """不是有效的音频包，或内容校验失败"""
+
+
+def _read_index(data) -> Tuple[Dict[str, Any], int]:
+    """从 data（bytes / mmap）末尾读取索引，返回 (索引, 索引起始偏移)"""
+    if len(data) < len(MAGIC) + FOOTER.size or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise BundleError("不是音频包文件（文件头不正确）")
+    offset, length, magic = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    if magic != INDEX_MAGIC or offset + length > len(data) - FOOTER.size:
+        raise BundleError("音频包尾部损坏（可能写入时中断）")
+    index = json.loads(bytes(data[offset:offset + length]).decode('utf-8'))
+    if index.get('version') != INDEX_VERSION:
+        raise BundleError(f"不支持的音频包版本: {index.get('version')}")
+    return index, offset
+
+
+def question_sections(question_dir: Path) -> Optional[Tuple[str, Dict[str, Path]]]:
+    """
+    问题目录中要打包的文件
+
+    Returns:
+        (问题 id, {段落: 文件路径})；段落为 meta.json 中 files 的键（audio_simple 等）和 'meta'；
+        没有 meta.json 时返回 None
+    """
+    metas = list(question_dir.glob('*_meta.json'))
+    if len(metas) != 1:
+        return None
+    with open(metas[0], 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    sections = {META_SECTION: metas[0]}
+    for key, name in meta.get('files', {}).items():
+        # files 中的 formats / hls 等是字典，只打包直接列出的音频
+        if key != META_SECTION and isinstance(name, str) and (question_dir / name).exists():
+            sections[key] = question_dir / name
+    return str(meta.get('id') or question_dir.name), sections
+
+
+class BundleWriter:
+    def __init__(self, path: str):
+        """
+        打开（或创建）音频包，之后的 add 都追加在文件末尾，commit 时写入新的索引
+
+        同一时间只能有一个写入者；读取者可以同时读取（看到的是上一次 commit 的内容）
+        """
+        self.path = Path(path)
+        self.questions: Dict[str, Dict[str, list]] = {}
+        self.hashes: Dict[str, Tuple[int, int]] = {}  # sha256 -> (偏移, 长度)，相同内容只写一次
+        self.added = 0
+        self.reused = 0
+
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                index, _ = _read_index(data)
+            self.questions = index['questions']
+            for sections in self.questions.values():
+                for offset, length, digest in sections.values():
+                    self.hashes[digest] = (offset, length)
+            self.file = open(self.path, 'r+b')
+            self.committed = self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(self.path, 'wb')
+            self.file.write(MAGIC)
+            self.committed = 0
+
+    def add(self, question_id: str, section: str, data: bytes):
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self.hashes:
+            offset, length = self.hashes[digest]
+            self.reused += 1
+        else:
+            offset, length = self.file.tell(), len(data)
+            self.file.write(data)
+            self.hashes[digest] = (offset, length)
+            self.added += 1
+        self.questions.setdefault(question_id, {})[section] = [offset, length, digest]
+
+    def add_question_dir(self, question_dir: Path) -> bool:
+        """打包一个问题目录（音频 + meta.json）；替换该问题之前的所有段落"""
+        found = question_sections(question_dir)
+        if found is None:
+            return False
+        question_id, sections = found
+        self.questions.pop(question_id, None)
+        for section, path in sections.items():
+            self.add(question_id, section, path.read_bytes())
+        return True
+
+    def commit(self):
+        """追加索引和尾部，并 fsync；之后新打开的读取者可以看到本次写入的内容"""
+        index = json.dumps({'version': INDEX_VERSION, 'questions': self.questions},
+                           ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        offset = self.file.tell()
+        self.file.write(index)
+        self.file.write(FOOTER.pack(offset, len(index), INDEX_MAGIC))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            # 出错时丢弃本次追加的内容，文件回到上一次 commit 的状态
+            self.file.truncate(self.committed)
+        self.close()
+        if exc_type is not None and self.committed == 0:
+            self.path.unlink()
+
+
+class BundleReader:
+    def __init__(self, path: str):
+        """
+        mmap 打开音频包，索引在打开时读入内存，之后每次查找都是 O(1) 的字典访问
+
+        get 返回的 memoryview 直接指向映射的内存（零拷贝）；close 之前需要先释放（view.release()）所有仍在使用的 memoryview
+        """
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise BundleError(f"{path} 是空文件")
+        try:
+            self.index, _ = _read_index(self.data)
+        except (ValueError, BundleError):
+            self.data.close()
+            self.file.close()
+            raise
+        self.questions: Dict[str, Dict[str, list]] = self.index['questions']
+        self.view = memoryview(self.data)
+
+    def get(self, question_id: str, section: str) -> memoryview:
+        """按问题 id 和段落（audio_simple / audio_question / audio_analysis / meta）返回内容，不存在时抛出 KeyError"""
+        offset, length, _ = self.questions[question_id][section]
+        return self.view[offset:offset + length]
+
+    def meta(self, question_id: str) -> Dict[str, Any]:
+        with self.get(question_id, META_SECTION) as view:
+            return json.loads(bytes(view).decode('utf-8'))
+
+    def sections(self, question_id: str) -> List[str]:
+        return list(self.questions[question_id])
+
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self.questions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.questions)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def verify(self) -> List[Tuple[str, str]]:
+        """重新计算每个数据块的 sha256，返回校验失败的 (问题 id, 段落)"""
+        bad = []
+        for question_id, sections in self.questions.items():
+            for section, (offset, length, digest) in sections.items():
+                if hashlib.sha256(self.view[offset:offset + length]).hexdigest() != digest:
+                    bad.append((question_id, section))
+        return bad
+
+    def close(self):
+        self.view.release()
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def build_bundle(bundle_path: str, source_dirs: List[str]) -> Dict[str, int]:
+    """把源目录下所有问题目录（flat / sharded 布局，含 meta.json）打包（追加）到 bundle_path"""
+    questions = 0
+    with BundleWriter(bundle_path) as writer:
+        for source_dir in source_dirs:
+            for question_dir in iter_question_dirs(Path(source_dir)):
+                if writer.add_question_dir(question_dir):
+                    questions += 1
+    stats = {'questions': questions, 'added': writer.added, 'reused': writer.reused,
+             'total': len(writer.questions), 'size': Path(bundle_path).stat().st_size}
+    print(f"📦 {bundle_path}: 打包 {questions} 个问题，新写入 {stats['added']} 个数据块，"
+          f"复用 {stats['reused']} 个（内容相同）；共 {stats['total']} 个问题，{stats['size'] / 1024 / 1024:.1f} MB")
+    return stats
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+问题目录的复制与清点
+把所有问题目录下的音频 / meta.json 汇总到统一目录，并列出汇总目录中的文件
+源目录为 sharded 布局（见 tts.layout）时，汇总目录保留同样的分片子目录，避免单个目录中有数十万个文件；
+各问题目录由线程池并行复制，输出按问题编号顺序打印
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import List, Tuple
+
+from .layout import iter_files, iter_question_dirs
+
+
+def _target_dir(target_path: Path, source_path: Path, question_dir: Path) -> Path:
+    """问题目录对应的汇总目录：sharded 布局时为同名的分片子目录"""
+    if question_dir.parent == source_path:
+        return target_path
+    shard_dir = target_path / question_dir.parent.name
+    shard_dir.mkdir(exist_ok=True)
+    return shard_dir
+
+
+def copy_audio_files(source_dir: str, target_audio_dir: str = None, workers: int = 8):
+    """
+    复制所有问题目录下的音频文件到统一目录
+    
+    Args:
+        source_dir: 源目录路径 (例如: output/vue)
+        target_audio_dir: 目标音频目录 (如果不指定，默认为output/audios)
+        workers: 并行复制的线程数
+    """
+    source_path = Path(source_dir)
+    
+    # 检查源目录是否存在
+    if not source_path.exists():
+        print(f"❌ 错误: 源目录 '{source_dir}' 不存在")
+        return False
+    
+    # 设置目标目录
+    if target_audio_dir is None:
+        target_path = Path("output/audios")
+    else:
+        target_path = Path(target_audio_dir)
+    
+    # 创建目标目录
+    target_path.mkdir(parents=True, exist_ok=True)
+    print(f"📁 目标目录: {target_path}")
+    
+    # 查找所有问题目录（格式：q{编号}_{id}，flat / sharded 布局均可）
+    question_dirs = iter_question_dirs(source_path, workers)
+    
+    if not question_dirs:
+        print("⚠️  未找到符合格式的问题目录 (格式: q{编号}_{id})")
+        return False
+    
+    print(f"🔍 找到 {len(question_dirs)} 个问题目录")
+    
+    def copy_dir(question_dir: Path) -> Tuple[List[str], int, int]:
+        """复制一个问题目录中的音频，返回 (输出行, 复制数, 跳过数)"""
+        lines = [f"\n📂 处理目录: {question_dir.name}"]
+        copied = skipped = 0
+        
+        # 查找目录中的所有音频文件
+        audio_files = list(question_dir.glob("*.mp3"))
+        
+        if not audio_files:
+            lines.append("   ⚠️  未找到音频文件")
+            return lines, copied, skipped
+        
+        target_dir = _target_dir(target_path, source_path, question_dir)
+        # 复制每个音频文件
+        for audio_file in audio_files:
+            target_file = target_dir / audio_file.name
+            
+            try:
+                # 检查目标文件是否已存在
+                if target_file.exists():
+                    lines.append(f"   ⏭️  跳过 {audio_file.name} (已存在)")
+                    skipped += 1
+                else:
+                    # 复制文件
+                    shutil.copy2(audio_file, target_file)
+                    lines.append(f"   ✅ 复制 {audio_file.name}")
+                    copied += 1
+            except Exception as e:
+                lines.append(f"   ❌ 复制失败 {audio_file.name}: {e}")
+        return lines, copied, skipped
+    
+    # 统计信息
+    total_copied = 0
+    total_skipped = 0
+    
+    # 并行处理各问题目录，按顺序输出
+    from concurrent.futures import ThreadPoolExecutor  # 用到时才导入，不拖慢 CLI 启动
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for lines, copied, skipped in pool.map(copy_dir, question_dirs):
+            print('\n'.join(lines))
+            total_copied += copied
+            total_skipped += skipped
+    
+    # 输出统计结果
+    print(f"\n{'='*50}")
+    print("📊 复制完成统计:")
+    print(f"   ✅ 成功复制: {total_copied} 个文件")
+    print(f"   ⏭️  跳过文件: {total_skipped} 个文件")
+    print(f"   📁 目标目录: {target_path}")
+    print(f"{'='*50}")
+    
+    return True
+
+def list_audio_files(audios_dir: str):
+    """列出audios目录中的所有音频文件"""
+    audios_path = Path(audios_dir)
+    
+    if not audios_path.exists():
+        print(f"❌ 目录 '{audios_dir}' 不存在")
+        return
+    
+    audio_files = iter_files(audios_path, "*.mp3")  # 含分片子目录
+    
+    if not audio_files:
+        print(f"📁 目录 '{audios_dir}' 中没有音频文件")
+        return
+    
+    print(f"🎵 {audios_dir} 中的音频文件:")
+    print("-" * 50)
+    
+    # 按类型分组显示
+    simple_files = [f for f in audio_files if "audio_simple" in f.name]
+    question_files = [f for f in audio_files if "audio_question" in f.name]
+    analysis_files = [f for f in audio_files if "audio_analysis" in f.name]
+    
+    for category, files, emoji in [
+        ("简答音频", simple_files, "💡"),
+        ("问题音频", question_files, "❓"),
+        ("解析音频", analysis_files, "📖")
+    ]:
+        if files:
+            print(f"\n{emoji} {category} ({len(files)} 个):")
+            for audio_file in files:
+                file_size = audio_file.stat().st_size / 1024  # KB
+                print(f"   - {audio_file.name} ({file_size:.1f} KB)")
+    
+    print(f"\n📊 总计: {len(audio_files)} 个音频文件")
+
+def copy_meta_files(source_dir: str, target_meta_dir: str = None, workers: int = 8):
+    """
+    复制所有问题目录下的meta.json文件到统一目录
+    
+    Args:
+        source_dir: 源目录路径 (例如: output/vue)
+        target_meta_dir: 目标meta目录 (如果不指定，默认为output/meta)
+        workers: 并行复制的线程数
+    """
+    source_path = Path(source_dir)
+    
+    # 检查源目录是否存在
+    if not source_path.exists():
+        print(f"❌ 错误: 源目录 '{source_dir}' 不存在")
+        return False
+    
+    # 设置目标目录
+    if target_meta_dir is None:
+        # 默认放在output/meta目录
+        output_base = source_path.parent if source_path.parent.name == "output" else source_path.parent
+        target_path = output_base / "meta"
+    else:
+        target_path = Path(target_meta_dir)
+    
+    # 创建目标目录
+    target_path.mkdir(parents=True, exist_ok=True)
+    print(f"📁 目标目录: {target_path}")
+    
+    # 查找所有问题目录（格式：q{编号}_{id}，flat / sharded 布局均可）
+    question_dirs = iter_question_dirs(source_path, workers)
+    
+    if not question_dirs:
+        print("⚠️  未找到符合格式的问题目录 (格式: q{编号}_{id})")
+        return False
+    
+    print(f"🔍 找到 {len(question_dirs)} 个问题目录")
+    
+    def copy_dir(question_dir: Path) -> Tuple[List[str], int, int, int]:
+        """复制一个问题目录中的 meta.json，返回 (输出行, 复制数, 跳过数, 失败数)"""
+        lines = [f"\n📂 处理目录: {question_dir.name}"]
+        copied = skipped = failed = 0
+        
+        # 查找目录中的meta.json文件
+        # 从目录名提取ID和问题编号 (格式: q{编号}_{id})
+        dir_parts = question_dir.name.split('_', 1)
+        if len(dir_parts) == 2:
+            question_num = dir_parts[0]  # q0001
+            id_prefix = dir_parts[1]     # id前8位
+            expected_meta_name = f"{question_num}_{id_prefix}_meta.json"
+            meta_files = [f for f in question_dir.glob("*_meta.json") if f.name == expected_meta_name]
+            
+            # 如果没找到新格式，尝试旧格式兼容
+            if not meta_files:
+                meta_files = list(question_dir.glob("*_meta.json"))
+        else:
+            meta_files = list(question_dir.glob("*_meta.json"))
+        
+        if not meta_files:
+            lines.append("   ⚠️  未找到meta.json文件")
+            return lines, copied, skipped, 1
+        
+        target_dir = _target_dir(target_path, source_path, question_dir)
+        # 复制每个meta文件（通常只有一个）
+        for meta_file in meta_files:
+            target_file = target_dir / meta_file.name
+            
+            try:
+                # 检查目标文件是否已存在
+                if target_file.exists():
+                    lines.append(f"   ⏭️  跳过 {meta_file.name} (已存在)")
+                    skipped += 1
+                else:
+                    # 生成新的文件名（格式：q{编号}_{id}_meta.json）
+                    if len(dir_parts) == 2:
+                        new_filename = f"{dir_parts[0]}_{dir_parts[1]}_meta.json"
+                        new_target_file = target_dir / new_filename
+                    else:
+                        new_target_file = target_file
+                    
+                    # 复制文件
+                    shutil.copy2(meta_file, new_target_file)
+                    lines.append(f"   ✅ 复制 {meta_file.name} -> {new_target_file.name}")
+                    copied += 1
+                    
+                    # 验证JSON格式
+                    try:
+                        with open(new_target_file, 'r', encoding='utf-8') as f:
+                            json.load(f)
+                        lines.append("   ✓  JSON格式验证通过")
+                    except json.JSONDecodeError as e:
+                        lines.append(f"   ⚠️  JSON格式警告: {e}")
+                        
+            except Exception as e:
+                lines.append(f"   ❌ 复制失败 {meta_file.name}: {e}")
+                failed += 1
+        return lines, copied, skipped, failed
+    
+    # 统计信息
+    total_copied = 0
+    total_skipped = 0
+    total_failed = 0
+    
+    # 并行处理各问题目录，按顺序输出
+    from concurrent.futures import ThreadPoolExecutor  # 用到时才导入，不拖慢 CLI 启动
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for lines, copied, skipped, failed in pool.map(copy_dir, question_dirs):
+            print('\n'.join(lines))
+            total_copied += copied
+            total_skipped += skipped
+            total_failed += failed
+    
+    # 输出统计结果
+    print(f"\n{'='*50}")
+    print("📊 复制完成统计:")
+    print(f"   ✅ 成功复制: {total_copied} 个文件")
+    print(f"   ⏭️  跳过文件: {total_skipped} 个文件")
+    print(f"   ❌ 失败文件: {total_failed} 个文件")
+    print(f"   📁 目标目录: {target_path}")
+    print(f"{'='*50}")
+    
+    return True
+
+def list_meta_files(meta_dir: str):
+    """列出meta目录中的所有meta.json文件"""
+    meta_path = Path(meta_dir)
+    
+    if not meta_path.exists():
+        print(f"❌ 目录 '{meta_dir}' 不存在")
+        return
+    
+    meta_files = iter_files(meta_path, "*_meta.json")  # 含分片子目录
+    
+    if not meta_files:
+        print(f"📁 目录 '{meta_dir}' 中没有meta.json文件")
+        return
+    
+    print(f"📄 {meta_dir} 中的meta.json文件:")
+    print("-" * 50)
+    
+    for meta_file in meta_files:
+        file_size = meta_file.stat().st_size / 1024  # KB
+        
+        # 尝试读取meta文件信息
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta_data = json.load(f)
+            
+            question_title = meta_data.get('question', {}).get('title', 'N/A')[:50]
+            difficulty = meta_data.get('metadata', {}).get('difficulty', 'N/A')
+            question_type = meta_data.get('metadata', {}).get('type', 'N/A')
+            
+            print(f"   📄 {meta_file.name} ({file_size:.1f} KB)")
+            print(f"      题目: {question_title}...")
+            print(f"      难度: {difficulty} | 类型: {question_type}")
+            
+        except Exception as e:
+            print(f"   📄 {meta_file.name} ({file_size:.1f} KB) - 读取失败: {e}")
+    
+    print(f"\n📊 总计: {len(meta_files)} 个meta.json文件")
@@ -0,0 +1,780 @@
+#!/usr/bin/env python3
+"""
+统一命令行入口: python3 -m tts <子命令> [参数]
+
+  questions  解析问答 Markdown 并合成每个问题的音频（--dedup 去重合成，--dry-run 只输出计划，
+             --batch 小批量随机间隔处理，--plan 只估算批量处理耗时，
+             --voices / --rates / --pitches 一次生成多种语音参数的版本）
+  sections   按分割线拆分长文档，每章一个音频
+  headings   按标题拆分长文档，每节一个音频
+  whole-doc  整篇文档合成一个音频
+  normalize  补全缺少 ## 的答案/解析标题，把数字或缺失的 id 换成确定性 UUID（流式、原子写入）
+  validate   合成前校验：并行解析所有问题块，报告结构错误（附行号）、空段落和重复 id
+  postprocess 裁剪音频首尾静音、统一响度（NumPy 向量化计算，进程池并行），结果写入 meta.json
+  transcode  把 MP3 转码为 Opus / AAC（进程池并行），编码器、码率和大小写入 meta.json
+  hls        把长音频切分为 HLS 分段 + 播放列表（帧边界、不重新编码），写入 meta.json
+  bundle     把题库的音频和 meta.json 打包成一个只追加的文件（读取端 mmap + O(1) 索引）
+  index      为输出目录建立（增量更新）标签 / 难度 / 类型 / 全文倒排索引，并按条件查询问题
+  layout     把已有的输出目录转换为 flat / sharded 目录布局（一次性迁移）
+  check      只解析、不合成，检查所有问题块能否被正确解析
+  voices     列出可用的中文语音
+  copy       把问题目录下的音频 / meta.json 汇总到统一目录
+  inventory  列出汇总目录中的音频 / meta.json
+  enqueue    把问题加入共享任务库（SQLite），供多台机器上的 worker 分担
+  worker     从共享任务库领取问题并合成，租约 + 心跳，任务完成是幂等的
+  bench      基准测试（startup / markdown / adaptive / schedule / hedge / validate / transcode / bundle / lexicon）
+
+本模块只导入 argparse 和 sys；每个子命令在执行时才导入自己需要的模块，
+解析和列表类命令因此不会加载 edge_tts 等重型依赖。
+所有合成类子命令共用一份配置（tts.json，见 tts.example.json）和同一个合成引擎，
+命令行上的 --voice/--rate/--pitch 等参数覆盖配置文件。
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+
+def _check_inputs(input_files: List[str]):
+    import os
+    for input_file in input_files:
+        if not os.path.exists(input_file):
+            print(f"✗ Error: Input file '{input_file}' does not exist.")
+            sys.exit(1)
+
+
+def _engine_config(args, mode: str) -> dict:
+    """配置文件 <- modes[mode] <- 命令行参数"""
+    from .config import load_config, mode_config
+
+    overrides = {
+        'voice': args.voice,
+        'rate': args.rate,
+        'pitch': args.pitch,
+        'backend': args.backend,
+        'concurrency': args.concurrency,
+        'cache_dir': args.cache_dir,
+        'adaptive': {'enabled': True} if args.adaptive else None,
+        'request_timeout': args.timeout,
+        'hedge': {'enabled': True} if args.hedge else None,
+        'host_limit': {'enabled': True, 'rate': args.host_rate} if args.host_rate else None,
+        'postprocess': {'enabled': True} if args.postprocess else None,
+        'transcode': {'enabled': True} if args.transcode else None,
+        'hls': {'enabled': True} if args.hls else None,
+        'index': {'enabled': True} if args.index else None,
+        'layout': args.layout,
+        'matrix': _matrix_overrides(args)
+    }
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"✗ Error loading config: {e}")
+        sys.exit(1)
+    return mode_config(config, mode, overrides)
+
+
+def _make_engine(args, mode: str):
+    """按 配置文件 <- modes[mode] <- 命令行参数 创建合成引擎"""
+    from .engine import SpeechEngine
+    return SpeechEngine(_engine_config(args, mode))
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    """逗号分隔的命令行参数 -> 列表"""
+    return [item.strip() for item in value.split(',') if item.strip()] if value else None
+
+
+def _matrix_overrides(args) -> Optional[dict]:
+    """questions 的 --voices / --rates / --pitches，未指定的一项取配置文件中的 matrix"""
+    values = {key: _split(getattr(args, key, None)) for key in ('voices', 'rates', 'pitches')}
+    return {key: value for key, value in values.items() if value} or None
+
+
+def _postprocess(engine, paths: List[str]):
+    """
+    合成完成后的音频处理，依次为：
+    postprocess（--postprocess）裁剪静音、统一响度；transcode（--transcode）转码；hls（--hls）长音频切分为 HLS 分段；
+    index（--index）更新输出目录的倒排索引
+    """
+    options = engine.config.get('postprocess', {})
+    if options.get('enabled'):
+        from .loudness import postprocess_paths
+        postprocess_paths(paths, options)
+    options = engine.config.get('transcode', {})
+    if options.get('enabled'):
+        from .transcode import transcode_paths
+        transcode_paths(paths, options)
+    options = engine.config.get('hls', {})
+    if options.get('enabled'):
+        from .hls import segment_paths
+        segment_paths(paths, options)
+    if engine.config.get('index', {}).get('enabled'):
+        from .search import update_index
+        update_index(paths)
+
+
+def _parse_range(value: str, cast=int) -> tuple:
+    """把 "3-5" 解析为 (3, 5)，单个数字表示上下限相同"""
+    parts = value.split('-')
+    return cast(parts[0]), cast(parts[-1])
+
+
+def _make_parsers(input_files: List[str], output_dir: str, verbose: bool = True,
+                  skip: Optional[Dict[str, set]] = None, **options) -> list:
+    """
+    每个输入文件一个解析器（共用同一个引擎）；多个输入文件时分别输出到 output_dir/<文件名> 子目录
+    skip: {输入文件: 要排除的问题块起始行号}（_preflight 的返回值）
+    options 原样传给 MarkdownQuestionParser（engine / combined / policy / priorities）
+    """
+    from pathlib import Path
+    from .questions import MarkdownQuestionParser
+
+    skip = skip or {}
+    if len(input_files) == 1:
+        return [MarkdownQuestionParser(input_files[0], output_dir, verbose=verbose,
+                                       skip_lines=skip.get(input_files[0]), **options)]
+    return [MarkdownQuestionParser(f, str(Path(output_dir) / Path(f).stem), verbose=verbose,
+                                   skip_lines=skip.get(f), **options)
+            for f in input_files]
+
+
+def _combined(args, engine) -> bool:
+    """--combined 或配置中的 combine_sections"""
+    return bool(args.combined or (engine and engine.config.get('combine_sections')))
+
+
+def _run_batches(args, engine, skip: Optional[Dict[str, set]] = None) -> int:
+    """小批量随机间隔处理（--batch / --plan），每个输入文件依次处理；skip 见 _make_parsers"""
+    import asyncio
+    from pathlib import Path
+    from .batch import SafeBatchProcessor
+
+    batch_config = engine.config.get('batch', {})
+    try:
+        batch_size_range = _parse_range(args.batch_size) if args.batch_size \
+            else tuple(batch_config.get('batch_size_range', (3, 5)))
+        interval_range = _parse_range(args.interval, float) if args.interval \
+            else tuple(batch_config.get('interval_range', (5, 15)))
+    except ValueError as e:
+        print(f"✗ Error: invalid range: {e}")
+        return 1
+
+    async def run_all():
+        for input_file in args.inputs:
+            output_dir = args.output_dir if len(args.inputs) == 1 else str(Path(args.output_dir) / Path(input_file).stem)
+            processor = SafeBatchProcessor(input_file, output_dir, batch_size_range, interval_range,
+                                           engine=engine, start_from=args.start_from,
+                                           combined=_combined(args, engine),
+                                           skip_lines=(skip or {}).get(input_file))
+            if args.plan:
+                await processor.plan()
+            else:
+                await processor.run()
+
+    asyncio.run(run_all())
+    return 0
+
+
+def _preflight(args) -> Optional[Dict[str, set]]:
+    """
+    合成前校验所有问题块
+    返回: {输入文件: 无效问题块的起始行号}，合成时排除这些块；--validate abort 时有错误返回 None（不开始合成）
+    """
+    if args.validate == 'off':
+        return {}
+    from .validate import invalid_blocks, print_report, validate_files
+
+    report = validate_files(args.inputs)
+    invalid = print_report(report, show_warnings=False)
+    if invalid and args.validate == 'abort':
+        print("✗ 存在无效的问题块，未开始合成（修复后重试，或使用 --validate skip 跳过无效问题块）")
+        return None
+    if invalid:
+        print(f"⚠️  跳过 {invalid} 个无效问题块继续合成")
+    return invalid_blocks(report)
+
+
+def cmd_questions(args) -> int:
+    _check_inputs(args.inputs)
+    if (args.batch or args.plan) and _matrix_overrides(args):
+        print("✗ Error: --voices / --rates / --pitches 不能与 --batch / --plan 同时使用")
+        return 1
+    skip = {} if args.dry_run else _preflight(args)
+    if skip is None:
+        return 1
+    if args.watch:
+        skip = {}  # 监视期间文件会被修改，校验时的行号不再可靠；解析失败的块由 IncrementalSynchronizer 处理
+    if args.batch or args.plan:
+        return _run_batches(args, _make_engine(args, 'questions'), skip)
+
+    from .scheduler import parse_priorities
+    try:
+        priorities = parse_priorities(args.priority)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    # --dry-run 只解析，不创建引擎（目录布局由解析器从引擎配置中读取，dry-run 时取 --layout）
+    engine = None if args.dry_run else _make_engine(args, 'questions')
+    policy = args.schedule or ('priority' if priorities else 'fifo')
+    parsers = _make_parsers(args.inputs, args.output_dir, verbose=not (args.dry_run or args.watch), skip=skip,
+                            engine=engine, combined=_combined(args, engine), policy=policy, priorities=priorities,
+                            layout=args.layout if args.dry_run else None)
+
+    # 渲染矩阵（--voices / --rates / --pitches 或配置中的 matrix）；dry-run 时不创建引擎，只读取配置
+    config = engine.config if engine else _engine_config(args, 'questions')
+    from .matrix import matrix_enabled
+    if matrix_enabled(config.get('matrix')):
+        return _run_matrix(args, engine, parsers, config)
+
+    if args.watch:
+        import asyncio
+        from .watch import watch
+        try:
+            asyncio.run(watch(parsers, polling=args.poll))
+        except KeyboardInterrupt:
+            print("\n👋 已停止监视")
+        return 0
+
+    if args.dedup or args.dry_run:
+        from .planner import DedupSynthesisPlanner
+        planner = DedupSynthesisPlanner(parsers).build()
+        planner.print_report()
+        if args.dry_run:
+            return 0
+        import asyncio
+        asyncio.run(planner.run())
+        _postprocess(engine, [str(parser.output_dir) for parser in parsers])
+        return 0
+
+    import asyncio
+
+    async def generate_all():
+        for parser in parsers:
+            await parser.parse_and_generate()
+
+    asyncio.run(generate_all())
+    _postprocess(engine, [str(parser.output_dir) for parser in parsers])
+    return 0
+
+
+def _run_matrix(args, engine, parsers: list, config: dict) -> int:
+    """渲染矩阵：每个输入文件解析一次，所有变体的任务进入同一个队列（dry-run 时只输出计划）"""
+    if args.dedup or args.watch:
+        print("✗ Error: 渲染矩阵（--voices / --rates / --pitches）不能与 --dedup / --watch 同时使用")
+        return 1
+    from .matrix import MatrixRenderer, expand_variants
+
+    renderer = MatrixRenderer(parsers, engine, expand_variants(config['matrix'], config)).build()
+    renderer.print_report()
+    if args.dry_run:
+        return 0
+    import asyncio
+    asyncio.run(renderer.run())
+    _postprocess(engine, renderer.output_dirs)
+    return 0
+
+
+def _open_store(args):
+    from .jobstore import SqliteJobStore
+    return SqliteJobStore(args.store, lease_seconds=args.lease, max_attempts=args.max_attempts)
+
+
+def cmd_enqueue(args) -> int:
+    from .jobstore import enqueue_questions, print_counts
+
+    _check_inputs(args.inputs)
+    store = _open_store(args)
+    added = enqueue_questions(store, _make_parsers(args.inputs, args.output_dir, verbose=False, layout=args.layout))
+    print(f"📥 新加入 {added} 个任务")
+    print_counts(store)
+    return 0
+
+
+def cmd_worker(args) -> int:
+    from .jobstore import QueueWorker, print_counts
+
+    store = _open_store(args)
+    if args.retry_failed:
+        print(f"🔁 {store.reset_failed()} 个失败任务已放回队列")
+    if args.status:
+        print_counts(store)
+        return 0
+
+    import asyncio
+    engine = _make_engine(args, 'questions')
+    worker = QueueWorker(store, engine, combined=_combined(args, engine), parallel=args.jobs)
+    stats = asyncio.run(worker.run())
+    print_counts(store)
+    return 0 if stats['failed'] == 0 else 1
+
+
+def cmd_normalize(args) -> int:
+    from .normalize import normalize_file
+
+    _check_inputs([args.input])
+    normalize_file(args.input, args.output, scope=args.scope)
+    return 0
+
+
+def cmd_sections(args) -> int:
+    import asyncio
+    from .sections import run_split, split_by_separators
+
+    _check_inputs([args.input])
+    engine = _make_engine(args, 'sections')
+    with open(args.input, 'r', encoding='utf-8') as f:
+        sections = split_by_separators(f.read())
+    ok = asyncio.run(run_split(engine, args.input, args.output_dir, sections, "{title}"))
+    _postprocess(engine, [args.output_dir])
+    return 0 if ok else 1
+
+
+def cmd_headings(args) -> int:
+    import asyncio
+    from .sections import DEFAULT_OUTLINE, build_outline, coalesce_outline, parse_levels, run_split
+
+    _check_inputs([args.input])
+    try:
+        levels = parse_levels(args.levels)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+    engine = _make_engine(args, 'headings')
+    options = {**DEFAULT_OUTLINE, **(engine.config.get('outline') or {})}
+    min_chars = options['min_chars'] if args.min_chars is None else args.min_chars
+    max_chars = options['max_chars'] if args.max_chars is None else args.max_chars
+    with open(args.input, 'r', encoding='utf-8') as f:
+        nodes = build_outline(f.read(), levels, args.default_title)
+    outline = coalesce_outline(nodes, min_chars, max_chars)
+    print(f"🧭 {sum(1 for node in nodes if node['body'])} 个有正文的标题 -> {len(outline)} 个章节"
+          f"（少于 {min_chars} 字的小节合并，超过 {max_chars} 字的切分）")
+    sections = [(section['title'], section['body']) for section in outline]
+    ok = asyncio.run(run_split(engine, args.input, args.output_dir, sections, "section_{idx:02d}_{title}", outline))
+    _postprocess(engine, [args.output_dir])
+    return 0 if ok else 1
+
+
+def cmd_whole_doc(args) -> int:
+    import asyncio
+    from .sections import run_whole_doc
+
+    _check_inputs([args.input])
+    engine = _make_engine(args, 'whole-doc')
+    ok = asyncio.run(run_whole_doc(engine, args.input, args.output_file))
+    _postprocess(engine, [args.output_file])
+    return 0 if ok else 1
+
+
+def cmd_check(args) -> int:
+    """只解析：报告每个文件的问题块数量和解析失败的块"""
+    from .questions import MarkdownQuestionParser
+
+    _check_inputs(args.inputs)
+    total = 0
+    failed = 0
+    for input_file in args.inputs:
+        parser = MarkdownQuestionParser(input_file, "", verbose=args.verbose)
+        with open(input_file, 'r', encoding='utf-8') as f:
+            blocks = parser.split_question_blocks(f.read())
+
+        for index, block in enumerate(blocks, 1):
+            if args.ids and not any(question_id in block for question_id in args.ids):
+                continue
+            total += 1
+            question_data = parser.parse_question_block(block)
+            block_id = question_data['metadata'].get('id', '') if question_data else ''
+            if not question_data:
+                failed += 1
+                print(f"✗ {input_file} 问题块 {index} 解析失败: {block[:60]!r}")
+            elif args.ids:
+                print(f"✓ {input_file} 问题 {index} (ID: {str(block_id)[:8]})")
+                print(f"    Question: {question_data['question'][:50]}...")
+                print(f"    Answer: {question_data['simple_answer'][:50]}...")
+                print(f"    Analysis: {question_data['detailed_analysis'][:50]}...")
+
+    print(f"\n📊 检查完成: {total - failed}/{total} 个问题块解析成功")
+    return 1 if failed else 0
+
+
+def cmd_validate(args) -> int:
+    from .validate import print_report, validate_files
+
+    _check_inputs(args.inputs)
+    invalid = print_report(validate_files(args.inputs, workers=args.workers), show_warnings=not args.quiet)
+    return 1 if invalid else 0
+
+
+def cmd_postprocess(args) -> int:
+    from .config import load_config
+    from .loudness import postprocess_paths
+
+    try:
+        options = load_config(args.config).get('postprocess', {})
+    except (OSError, ValueError) as e:
+        print(f"✗ Error loading config: {e}")
+        return 1
+    overrides = {'target_lufs': args.target_lufs, 'silence_threshold': args.threshold,
+                 'normalize': False if args.no_normalize else None}
+    options = {**options, **{k: v for k, v in overrides.items() if v is not None}}
+    results = postprocess_paths(args.paths, options, workers=args.workers, analyze_only=args.analyze, force=args.force)
+    return 1 if any('error' in result for result in results) else 0
+
+
+def cmd_transcode(args) -> int:
+    from .config import load_config
+    from .transcode import transcode_paths
+
+    try:
+        options = load_config(args.config).get('transcode', {})
+    except (OSError, ValueError) as e:
+        print(f"✗ Error loading config: {e}")
+        return 1
+    if args.format:
+        options = {**options, 'formats': args.format}
+    if args.bitrate:
+        options = {**options, 'bitrates': {codec: args.bitrate for codec in options.get('formats', ['opus'])}}
+    try:
+        results = transcode_paths(args.paths, options, workers=args.workers, force=args.force)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+    return 1 if any('error' in result for result in results) else 0
+
+
+def cmd_hls(args) -> int:
+    from .config import load_config
+    from .hls import segment_paths
+
+    try:
+        options = load_config(args.config).get('hls', {})
+    except (OSError, ValueError) as e:
+        print(f"✗ Error loading config: {e}")
+        return 1
+    overrides = {'segment_seconds': args.segment_seconds, 'min_duration': args.min_duration}
+    segment_paths(args.paths, {**options, **{k: v for k, v in overrides.items() if v is not None}}, force=args.force)
+    return 0
+
+
+def cmd_bundle(args) -> int:
+    import os
+    from .bundle import BundleError, BundleReader, build_bundle
+
+    if args.sources:
+        for source in args.sources:
+            if not os.path.isdir(source):
+                print(f"✗ Error: Source directory '{source}' does not exist.")
+                return 1
+        build_bundle(args.bundle, args.sources)
+    elif not (args.list or args.verify):
+        print("✗ Error: 需要指定要打包的源目录，或使用 --list / --verify")
+        return 1
+
+    if args.list or args.verify:
+        try:
+            reader = BundleReader(args.bundle)
+        except (OSError, BundleError) as e:
+            print(f"✗ Error: {e}")
+            return 1
+        with reader:
+            if args.list:
+                for question_id in reader:
+                    sizes = ', '.join(f"{section} {reader.questions[question_id][section][1] / 1024:.0f} KB"
+                                      for section in reader.sections(question_id))
+                    print(f"   {question_id}: {sizes}")
+                print(f"📦 {len(reader)} 个问题")
+            if args.verify:
+                bad = reader.verify()
+                for question_id, section in bad:
+                    print(f"✗ {question_id} {section}: sha256 不一致")
+                print(f"🔐 校验完成: {len(bad)} 个数据块损坏")
+                return 1 if bad else 0
+    return 0
+
+
+def cmd_index(args) -> int:
+    from .search import update_index
+
+    indexes = update_index(args.output_dirs)
+    if not indexes:
+        print("✗ Error: 没有可索引的输出目录")
+        return 1
+    if not (args.tag or args.difficulty or args.type or args.text):
+        return 0
+    for index in indexes:
+        found = index.query(tags=args.tag, difficulty=args.difficulty, types=args.type, text=args.text)
+        print(f"\n📋 {index.output_dir}: {len(found)} 个问题")
+        for question_id in sorted(found, key=lambda qid: index.docs[qid]['num'])[:args.limit]:
+            doc = index.docs[question_id]
+            print(f"   {doc['dir']}  [{doc['difficulty']}/{doc['type']}] {doc['title']}")
+    return 0
+
+
+def cmd_layout(args) -> int:
+    from pathlib import Path
+    from .layout import migrate
+
+    if not Path(args.output_dir).is_dir():
+        print(f"✗ Error: 输出目录 '{args.output_dir}' 不存在")
+        return 1
+    migrate(args.output_dir, args.to, width=args.shard_width, dry_run=args.dry_run)
+    return 0
+
+
+def cmd_voices(args) -> int:
+    import asyncio
+    from .questions import MarkdownQuestionParser
+
+    engine = _make_engine(args, 'voices')
+    voices = asyncio.run(MarkdownQuestionParser("", "", engine=engine).list_available_voices())
+    return 0 if voices else 1
+
+
+def cmd_copy(args) -> int:
+    from .catalog import copy_audio_files, copy_meta_files
+
+    ok = True
+    if args.kind in ('audios', 'all'):
+        ok = copy_audio_files(args.source_dir, args.audio_dir) and ok
+    if args.kind in ('metas', 'all'):
+        ok = copy_meta_files(args.source_dir, args.meta_dir) and ok
+    return 0 if ok else 1
+
+
+def cmd_inventory(args) -> int:
+    from .catalog import list_audio_files, list_meta_files
+
+    if args.kind in ('audios', 'all'):
+        list_audio_files(args.directory)
+    if args.kind in ('metas', 'all'):
+        list_meta_files(args.directory)
+    return 0
+
+
+def cmd_bench(args) -> int:
+    from . import bench
+
+    if args.name == 'startup':
+        ok = bench.run_startup_bench(runs=args.runs, budget_ms=args.budget_ms)
+    elif args.name == 'adaptive':
+        ok = bench.run_adaptive_bench(requests=args.requests)
+    elif args.name == 'schedule':
+        ok = bench.run_schedule_bench(workers=args.workers or 4)
+    elif args.name == 'hedge':
+        ok = bench.run_hedge_bench(requests=args.requests, workers=args.workers or 4)
+    elif args.name == 'validate':
+        ok = bench.run_validate_bench(questions=args.questions, workers=args.workers)
+    elif args.name == 'transcode':
+        ok = bench.run_transcode_bench(workers=args.workers)
+    elif args.name == 'bundle':
+        ok = bench.run_bundle_bench()
+    elif args.name == 'lexicon':
+        ok = bench.run_lexicon_bench(args.corpus)
+    else:
+        ok = bench.run_markdown_bench(args.corpus, args.rounds)
+    return 0 if ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python3 -m tts", description="Markdown 问答库文字转语音工具")
+    commands = parser.add_subparsers(dest="command", metavar="<command>")
+    commands.required = True
+
+    # 合成类子命令共用的引擎参数，未指定的取配置文件中的值
+    engine_options = argparse.ArgumentParser(add_help=False)
+    engine_group = engine_options.add_argument_group("引擎参数（覆盖配置文件）")
+    engine_group.add_argument("--config", help="配置文件路径（默认 ./tts.json）")
+    engine_group.add_argument("--voice", help="语音名称，例如 zh-CN-XiaoxiaoNeural")
+    engine_group.add_argument("--rate", help="语速，例如 --rate=+10%% 或 --rate=-5%%")
+    engine_group.add_argument("--pitch", help="音调，例如 --pitch=+2Hz")
+    engine_group.add_argument("--backend", choices=("edge", "offline"), help="合成后端（offline 不联网，生成静音音频）")
+    engine_group.add_argument("--concurrency", type=int, help="同时进行的合成请求数")
+    engine_group.add_argument("--cache-dir", help="合成结果缓存目录")
+    engine_group.add_argument("--adaptive", action="store_true",
+                              help="按延迟和限流信号自动调整并发数和请求速率（AIMD），工作点保存在 aimd_state.json")
+    engine_group.add_argument("--timeout", type=float, help="单次合成请求的截止时间（秒），默认 120")
+    engine_group.add_argument("--hedge", action="store_true",
+                              help="请求耗时超过近期 p95 时发出对冲请求，取先完成的结果（对冲请求数不超过 5%%）")
+    engine_group.add_argument("--host-rate", type=float, metavar="RATE",
+                              help="整机共享的请求速率上限（次/秒）：同一台机器上所有 tts 进程的请求加起来不超过该值")
+    engine_group.add_argument("--postprocess", action="store_true",
+                              help="合成完成后裁剪首尾静音并统一响度（需要 numpy 和 ffmpeg）")
+    engine_group.add_argument("--transcode", action="store_true",
+                              help="合成完成后另存为配置 transcode.formats 中的格式（默认 Opus 24 kbps，需要 ffmpeg）")
+    engine_group.add_argument("--hls", action="store_true", help="合成完成后把长音频切分为 HLS 分段和播放列表")
+    engine_group.add_argument("--index", action="store_true",
+                              help="合成完成后更新输出目录的标签 / 难度 / 类型 / 全文倒排索引（catalog_index.json）")
+    engine_group.add_argument("--layout", choices=("flat", "sharded"),
+                              help="问题目录布局：flat 直接放在输出目录下（默认），sharded 按 id 前缀分到子目录（大题库）")
+
+    questions = commands.add_parser("questions", parents=[engine_options], help="解析问答 Markdown 并合成音频")
+    questions.add_argument("inputs", nargs="+", help="输入的 Markdown 文件（可多个）")
+    questions.add_argument("output_dir", help="输出目录")
+    questions.add_argument("--dedup", action="store_true", help="相同文本只合成一次，再复制到各个问题目录")
+    questions.add_argument("--dry-run", action="store_true", help="只输出去重合成计划，不合成")
+    questions.add_argument("--combined", action="store_true",
+                           help="每个问题只发一次合成请求，再按词边界切分成三段音频（--dedup 时不生效）")
+    questions.add_argument("--schedule", choices=("fifo", "lpt", "priority"),
+                           help="合成任务调度策略：fifo 文件顺序（默认）、lpt 最长任务优先、priority 按 --priority 排序")
+    questions.add_argument("--priority", action="append", metavar="RULE",
+                           help="优先级规则，可重复：section[:question,simple,analysis]、"
+                                "difficulty[:easy,medium,hard]、tag:标签1,标签2")
+    questions.add_argument("--validate", choices=("skip", "abort", "off"), default="skip",
+                           help="合成前校验所有问题块：skip 报告错误并跳过无效问题块（默认），abort 有错误时不开始合成")
+    questions.add_argument("--watch", action="store_true",
+                           help="监视输入文件，保存后只重新合成新增/改动的段落，并删除已删除问题的输出")
+    questions.add_argument("--poll", action="store_true", help="监视模式: 不使用 inotify，按修改时间轮询")
+    questions.add_argument("--batch", action="store_true", help="小批量处理，批次之间随机等待，可断点续传")
+    questions.add_argument("--plan", action="store_true", help="只估算批量处理的请求数、音频时长和耗时")
+    questions.add_argument("--voices", help="渲染矩阵: 逗号分隔的多个语音，每种组合输出到 <输出目录>/<变体名>")
+    questions.add_argument("--rates", help="渲染矩阵: 逗号分隔的多个语速，例如 --rates=+0%%,+20%%")
+    questions.add_argument("--pitches", help="渲染矩阵: 逗号分隔的多个音调，例如 --pitches=+0Hz,+2Hz")
+    questions.add_argument("--batch-size", help="批量模式: 每批问题数量范围，例如 3-5")
+    questions.add_argument("--interval", help="批量模式: 批次间隔范围（分钟，可为小数），例如 5-15")
+    questions.add_argument("--start-from", type=int, default=1, help="批量模式: 没有进度文件时从第几个问题开始")
+    questions.set_defaults(func=cmd_questions)
+
+    store_options = argparse.ArgumentParser(add_help=False)
+    store_group = store_options.add_argument_group("任务库")
+    store_group.add_argument("--store", default="tts_jobs.db",
+                             help="SQLite 任务库路径，多台机器共用时放在共享文件系统上（默认 tts_jobs.db）")
+    store_group.add_argument("--lease", type=float, default=120.0, help="租约秒数，超时未续租的任务会被其他 worker 接手")
+    store_group.add_argument("--max-attempts", type=int, default=3, help="每个任务最多尝试次数")
+
+    enqueue = commands.add_parser("enqueue", parents=[store_options], help="把问题作为任务加入共享任务库")
+    enqueue.add_argument("inputs", nargs="+", help="输入的 Markdown 文件（可多个，各 worker 需能以相同路径访问）")
+    enqueue.add_argument("output_dir", help="输出目录")
+    enqueue.add_argument("--layout", choices=("flat", "sharded"), help="问题目录布局（默认取 worker 的配置）")
+    enqueue.set_defaults(func=cmd_enqueue)
+
+    worker = commands.add_parser("worker", parents=[engine_options, store_options],
+                                 help="从共享任务库领取问题并合成（可在多台机器上同时运行）")
+    worker.add_argument("--combined", action="store_true", help="每个问题只发一次合成请求")
+    worker.add_argument("--jobs", type=int, help="同时持有的任务数（默认等于引擎并发数）")
+    worker.add_argument("--status", action="store_true", help="只显示任务库状态")
+    worker.add_argument("--retry-failed", action="store_true", help="把失败的任务放回队列")
+    worker.set_defaults(func=cmd_worker)
+
+    sections = commands.add_parser("sections", parents=[engine_options], help="按分割线拆分长文档，每章一个音频")
+    sections.add_argument("input", help="输入的 Markdown 文件")
+    sections.add_argument("output_dir", help="输出目录")
+    sections.set_defaults(func=cmd_sections)
+
+    headings = commands.add_parser("headings", parents=[engine_options], help="按标题拆分长文档，每节一个音频")
+    headings.add_argument("input", help="输入的 Markdown 文件")
+    headings.add_argument("output_dir", help="输出目录")
+    headings.add_argument("--levels", default="1-6", help="参与拆分的标题级别，例如 2 或 1-6（默认 1-6）")
+    headings.add_argument("--default-title", default="正文", help="第一个标题之前内容的标题（默认 正文）")
+    headings.add_argument("--min-chars", type=int,
+                          help="朗读文本少于该字数的小节并入上级或相邻的同级小节（默认 200，0 表示不合并）")
+    headings.add_argument("--max-chars", type=int, help="合并后每个章节的字数上限，更长的小节在段落之间切分（默认 5000，0 表示不限）")
+    headings.set_defaults(func=cmd_headings)
+
+    whole_doc = commands.add_parser("whole-doc", parents=[engine_options], help="整篇文档合成一个音频")
+    whole_doc.add_argument("input", help="输入的 Markdown 文件")
+    whole_doc.add_argument("output_file", nargs="?", default="output.mp3", help="输出音频（默认 output.mp3）")
+    whole_doc.set_defaults(func=cmd_whole_doc)
+
+    normalize = commands.add_parser("normalize", help="规范化问题库：补全标题前缀，分配确定性 UUID（流式处理）")
+    normalize.add_argument("input", help="输入的 Markdown 文件")
+    normalize.add_argument("output", nargs="?", help="输出文件（默认覆盖输入文件）")
+    normalize.add_argument("--scope", help="生成 id 的范围，默认为输入文件名（不含扩展名）")
+    normalize.set_defaults(func=cmd_normalize)
+
+    check = commands.add_parser("check", help="只解析、不合成，检查问题块")
+    check.add_argument("inputs", nargs="+", help="输入的 Markdown 文件（可多个）")
+    check.add_argument("--ids", nargs="+", help="只检查包含这些ID的问题块")
+    check.add_argument("--verbose", action="store_true", help="打印逐块的解析调试信息")
+    check.set_defaults(func=cmd_check)
+
+    validate = commands.add_parser("validate", help="并行校验所有问题块：结构错误（附行号）、空段落、重复 id")
+    validate.add_argument("inputs", nargs="+", help="输入的 Markdown 文件（可多个）")
+    validate.add_argument("--workers", type=int, help="进程数（默认 CPU 核数，问题块较少时不启用进程池）")
+    validate.add_argument("--quiet", action="store_true", help="只显示错误，不显示警告")
+    validate.set_defaults(func=cmd_validate)
+
+    postprocess = commands.add_parser("postprocess", help="裁剪音频首尾静音、统一响度，结果记录到 meta.json（进程池并行）")
+    postprocess.add_argument("paths", nargs="+", help="音频目录（递归查找 MP3）或 MP3 文件")
+    postprocess.add_argument("--config", help="配置文件路径（默认 ./tts.json，读取其中的 postprocess 字段）")
+    postprocess.add_argument("--workers", type=int, help="进程数（默认 CPU 核数）")
+    postprocess.add_argument("--target-lufs", type=float, help="目标响度（默认 -16 LUFS）")
+    postprocess.add_argument("--threshold", type=float, help="静音阈值（dBFS，默认 -50）")
+    postprocess.add_argument("--no-normalize", action="store_true", help="只裁剪静音，不调整增益")
+    postprocess.add_argument("--analyze", action="store_true", help="只测量并记录响度，不修改音频")
+    postprocess.add_argument("--force", action="store_true", help="已处理过的音频也重新处理")
+    postprocess.set_defaults(func=cmd_postprocess)
+
+    transcode = commands.add_parser("transcode", help="把 MP3 转码为 Opus / AAC，编码器、码率和大小记录到 meta.json（进程池并行）")
+    transcode.add_argument("paths", nargs="+", help="音频目录（递归查找 MP3）或 MP3 文件")
+    transcode.add_argument("--config", help="配置文件路径（默认 ./tts.json，读取其中的 transcode 字段）")
+    transcode.add_argument("--format", action="append", choices=("opus", "aac"),
+                           help="输出格式，可重复（默认取配置，配置缺省为 opus）")
+    transcode.add_argument("--bitrate", help="码率，例如 16k（默认 opus 24k、aac 32k）")
+    transcode.add_argument("--workers", type=int, help="进程数（默认 CPU 核数）")
+    transcode.add_argument("--force", action="store_true", help="已有最新的转码结果时也重新转码")
+    transcode.set_defaults(func=cmd_transcode)
+
+    hls = commands.add_parser("hls", help="把长音频在帧边界上切分为 HLS 分段 + 播放列表（不重新编码），记录到 meta.json")
+    hls.add_argument("paths", nargs="+", help="音频目录（递归查找 MP3）或 MP3 文件")
+    hls.add_argument("--config", help="配置文件路径（默认 ./tts.json，读取其中的 hls 字段）")
+    hls.add_argument("--segment-seconds", type=float, help="每段时长（秒，默认 6）")
+    hls.add_argument("--min-duration", type=float, help="只切分不短于该时长的音频（秒，默认 60）")
+    hls.add_argument("--force", action="store_true", help="已有最新的播放列表时也重新切分")
+    hls.set_defaults(func=cmd_hls)
+
+    bundle = commands.add_parser("bundle", help="把题库的音频和 meta.json 打包（追加）成一个文件，带偏移/长度/哈希索引")
+    bundle.add_argument("bundle", help="音频包文件（不存在时创建，存在时追加）")
+    bundle.add_argument("sources", nargs="*", help="问题目录所在的源目录 (例如: output/vue)")
+    bundle.add_argument("--list", action="store_true", help="列出音频包中的问题和段落")
+    bundle.add_argument("--verify", action="store_true", help="校验所有数据块的 sha256")
+    bundle.set_defaults(func=cmd_bundle)
+
+    index = commands.add_parser("index", help="建立（增量更新）输出目录的倒排索引，并按标签 / 难度 / 类型 / 文本查询问题")
+    index.add_argument("output_dirs", nargs="+", help="问题目录所在的输出目录 (例如: output/vue)")
+    index.add_argument("--tag", action="append", help="标签，可重复（同时包含所有标签）")
+    index.add_argument("--difficulty", action="append", help="难度，可重复（任一）")
+    index.add_argument("--type", action="append", help="类型，可重复（任一）")
+    index.add_argument("--text", help="问题文本中包含的词（中文按两字、英文按单词匹配，所有词都要出现）")
+    index.add_argument("--limit", type=int, default=50, help="每个目录最多显示的问题数（默认 50）")
+    index.set_defaults(func=cmd_index)
+
+    layout = commands.add_parser("layout", help="把已有的输出目录转换为另一种目录布局（重命名，不复制文件）")
+    layout.add_argument("output_dir", help="问题目录所在的输出目录 (例如: output/vue)")
+    layout.add_argument("--to", choices=("flat", "sharded"), required=True, help="目标布局")
+    layout.add_argument("--shard-width", type=int, default=2, help="sharded: 分片目录名的十六进制位数（默认 2，256 个分片）")
+    layout.add_argument("--dry-run", action="store_true", help="只显示需要移动的目录")
+    layout.set_defaults(func=cmd_layout)
+
+    voices = commands.add_parser("voices", parents=[engine_options], help="列出可用的中文语音")
+    voices.set_defaults(func=cmd_voices)
+
+    copy = commands.add_parser("copy", help="把问题目录下的音频 / meta.json 汇总到统一目录")
+    copy.add_argument("source_dir", help="问题目录所在的源目录 (例如: output/vue)")
+    copy.add_argument("--kind", choices=("audios", "metas", "all"), default="all")
+    copy.add_argument("--audio-dir", help="音频目标目录（默认 output/audios）")
+    copy.add_argument("--meta-dir", help="meta目标目录（默认 源目录的上级目录/meta）")
+    copy.set_defaults(func=cmd_copy)
+
+    inventory = commands.add_parser("inventory", help="列出汇总目录中的音频 / meta.json")
+    inventory.add_argument("directory", help="汇总目录 (例如: output/audios)")
+    inventory.add_argument("--kind", choices=("audios", "metas", "all"), default="all")
+    inventory.set_defaults(func=cmd_inventory)
+
+    bench = commands.add_parser("bench", help="基准测试")
+    bench.add_argument("name", choices=("startup", "markdown", "adaptive", "schedule", "hedge", "validate", "transcode",
+                                        "bundle", "lexicon"))
+    bench.add_argument("--runs", type=int, default=5, help="startup: 每个命令运行次数")
+    bench.add_argument("--budget-ms", type=float, default=100, help="startup: 启动耗时预算（毫秒）")
+    bench.add_argument("--corpus", default="vue", help="markdown / lexicon: 语料目录")
+    bench.add_argument("--rounds", type=int, default=50, help="markdown: 运行轮数")
+    bench.add_argument("--requests", type=int, default=120, help="adaptive / hedge: 模拟请求数")
+    bench.add_argument("--workers", type=int, help="schedule / hedge: 并发数（默认 4）；validate / transcode: 进程数（默认 CPU 核数）")
+    bench.add_argument("--questions", type=int, default=10000, help="validate: 合成题库的问题数")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+共享配置
+所有子命令读取同一份配置：内置默认值 <- 配置文件 (tts.json) <- 命令行参数。
+modes 中可以按子命令覆盖语音参数，例如问题库默认使用男声。
+"""
+
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CONFIG_FILE_NAME = "tts.json"
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    'voice': 'zh-CN-XiaoxiaoNeural',  # 默认语音（女声，标准普通话）
+    'rate': '+0%',  # 语速，例如 "+10%" 或 "-5%"
+    'pitch': '+0Hz',  # 音调，例如 "+2Hz" 或 "-2Hz"
+    # 配置的语音不可用时依次尝试的备选语音
+    'preferred_voices': [
+        'zh-CN-YunyangNeural',  # 云杨（男）
+        'zh-CN-YunjianNeural',  # 云健（男）
+        'zh-CN-YunxiNeural',    # 云溪
+        'zh-CN-YunhaoNeural',   # 云浩（男）
+        'zh-CN-YunzeNeural'     # 云泽（男）
+    ],
+    'backend': 'edge',  # edge: 调用 edge-tts；offline: 不联网，生成静音音频（演练/基准测试）
+    'concurrency': 1,  # 同时进行的合成请求数
+    'cache_dir': None,  # 合成结果缓存目录，相同文本+语音参数直接复用，None 表示不缓存
+    'section_break_ms': 1000,  # 章节模式下第2章起每个文件开头的静音时长
+    'section_retries': 2,  # 章节模式下每章失败后的重试次数
+    'section_retry_delay': 2.0,  # 第一次重试前的等待秒数，之后每次翻倍
+    # 按标题拆分：朗读文本少于 min_chars 的小节并入上级或相邻的同级小节，每个章节不超过 max_chars（见 tts.sections）
+    'outline': {'min_chars': 200, 'max_chars': 5000},
+    'combine_sections': False,  # 问题库：每个问题只发一次请求，再按词边界切分成三段音频
+    # 自适应并发：启用后忽略 concurrency，按延迟和限流信号自动调整（参数见 tts.aimd.DEFAULT_ADAPTIVE）
+    'adaptive': {'enabled': False},
+    'request_timeout': 120,  # 单次合成请求的截止时间（秒），超时视为失败；0 表示不限
+    # 对冲请求：耗时超过近期 p95 时再发一个相同请求，取先完成的（参数见 tts.hedge.DEFAULT_HEDGE）
+    'hedge': {'enabled': False},
+    # 整机共享的请求速率预算：同一台机器上同时运行的所有进程共用一个令牌桶文件（参数见 tts.hostlimit.DEFAULT_HOST_LIMIT）
+    'host_limit': {'enabled': False, 'rate': 2.0, 'burst': 2},
+    # 合成后处理：裁剪首尾静音、统一响度（参数见 tts.loudness.DEFAULT_POSTPROCESS，需要 numpy 和 ffmpeg）
+    'postprocess': {'enabled': False},
+    # 合成后转码为体积更小的格式，原始 MP3 保留（参数见 tts.transcode.DEFAULT_TRANSCODE，需要 ffmpeg）
+    'transcode': {'enabled': False},
+    # 长音频切分为 HLS 分段 + 播放列表（参数见 tts.hls.DEFAULT_HLS）
+    'hls': {'enabled': False},
+    # 发音词表：术语、符号、缩写的朗读形式（参数见 tts.lexicon.DEFAULT_LEXICON_CONFIG），files 中的词表覆盖内置词条
+    'lexicon': {'builtin': True, 'files': []},
+    # 合成后更新输出目录的标签 / 难度 / 类型 / 全文倒排索引 catalog_index.json（见 tts.search）
+    'index': {'enabled': False},
+    # 问题目录布局：flat 直接放在输出目录下；sharded 按 id 前缀放到 shard_width 位十六进制的分片子目录（见 tts.layout）
+    'layout': 'flat',
+    'shard_width': 2,
+    # 渲染矩阵：questions 一次生成多种 语音 × 语速 × 音调 的版本，为空的一项取 voice / rate / pitch（见 tts.matrix）
+    'matrix': {'voices': [], 'rates': [], 'pitches': []},
+    'batch': {
+        'batch_size_range': [3, 5],  # 每批处理的问题数量范围
+        'interval_range': [5, 15]  # 批次间隔时间范围（分钟）
+    },
+    'modes': {
+        'questions': {'voice': 'zh-CN-YunyangNeural'},  # 问题库默认使用新闻播报风男声
+        # 按章节拆分的长文档各章互不依赖，默认同时合成 3 章
+        'sections': {'concurrency': 3},
+        'headings': {'concurrency': 3}
+    }
+}
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """递归合并字典，override 中的值优先"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    加载配置
+
+    Args:
+        path: 配置文件路径；为 None 时使用当前目录下的 tts.json（不存在则只用默认值）
+    """
+    config_path = Path(path) if path else Path(CONFIG_FILE_NAME)
+    if not config_path.exists():
+        if path:
+            raise FileNotFoundError(f"配置文件 '{path}' 不存在")
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return _merge(DEFAULT_CONFIG, json.load(f))
+
+
+def mode_config(config: Dict[str, Any], mode: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """返回某个子命令生效的配置：顶层配置 <- modes[mode] <- 命令行覆盖（值为 None 的忽略）"""
+    resolved = _merge(config, config.get('modes', {}).get(mode, {}))
+    resolved.pop('modes', None)
+    if overrides:
+        resolved = _merge(resolved, {k: v for k, v in overrides.items() if v is not None})
+    return resolved
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+合成引擎核心
+所有子命令共用同一个 SpeechEngine：语音查找只做一次、并发上限、结果缓存和吞吐统计都在这里，
+新增的性能特性只要加在引擎上，就对所有模式同时生效。
+"""
+
+import asyncio
+import contextlib
+import copy
+import hashlib
+import json
+import bisect
+import os
+import random
+import re
+import shutil
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import mp3
+from .aimd import AIMDController, StaticLimiter
+from .hedge import RequestHedger
+from .hostlimit import HostTokenBucket
+from .offload import LoopLagMonitor, Offloader
+
+TICKS_PER_SECOND = 10_000_000  # edge-tts 的时间单位是 100 纳秒
+SECTION_END_PUNCTUATION = '。！？'
+
+
+class EdgeBackend:
+    """edge-tts 后端（只在第一次使用时导入 edge_tts）"""
+    name = 'edge'
+
+    async def list_voices(self) -> List[Dict[str, Any]]:
+        import edge_tts
+        voices_manager = await edge_tts.VoicesManager.create()
+        return voices_manager.find()
+
+    async def synthesize(self, text: str, voice: str, rate: str, pitch: str, output_path: Path):
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+        await communicate.save(str(output_path))
+
+    async def synthesize_with_boundaries(self, text: str, voice: str, rate: str, pitch: str):
+        """
+        合成并返回 (音频数据, 词边界列表)
+        词边界为 {'text', 'offset', 'duration'}，时间单位为秒（edge-tts 原始单位是 100 纳秒）
+        """
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, boundary="WordBoundary")
+        audio = bytearray()
+        boundaries = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+            elif chunk["type"] == "WordBoundary":
+                boundaries.append({
+                    'text': chunk["text"],
+                    'offset': chunk["offset"] / TICKS_PER_SECOND,
+                    'duration': chunk["duration"] / TICKS_PER_SECOND
+                })
+        return bytes(audio), boundaries
+
+
+class ThrottledError(Exception):
+    """离线后端模拟的限流错误（与真实服务一样带 HTTP 状态码）"""
+    status = 429
+
+
+class OfflineBackend:
+    """
+    离线后端：不联网，按字数生成同格式的静音 MP3，并按字数模拟请求延迟
+    用于演练整个流水线和基准测试
+
+    capacity: 服务端能同时处理的请求数，超出后延迟按比例变长（0 表示不限）
+    throttle_rate: 每秒请求数超过该值时返回 429（0 表示不限流）
+    stall_probability / stall_seconds: 按该概率让请求额外卡住 stall_seconds 秒（模拟长尾延迟），seed 固定随机序列
+    """
+    name = 'offline'
+
+    def __init__(self, latency: float = 0.0, seconds_per_char: float = 0.0,
+                 audio_seconds_per_char: float = 0.25, capacity: int = 0, throttle_rate: float = 0.0,
+                 stall_probability: float = 0.0, stall_seconds: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+        self.audio_seconds_per_char = audio_seconds_per_char
+        self.capacity = capacity
+        self.throttle_rate = throttle_rate
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.random = random.Random(seed)
+        self.in_flight = 0
+        self.recent_starts = deque()
+
+    async def _simulate_request(self, chars: int):
+        """按字数模拟请求耗时，并模拟服务端的排队和限流"""
+        now = time.monotonic()
+        if self.throttle_rate:
+            while self.recent_starts and now - self.recent_starts[0] > 1.0:
+                self.recent_starts.popleft()
+            if len(self.recent_starts) >= self.throttle_rate:
+                raise ThrottledError("429 Too Many Requests (offline)")
+            self.recent_starts.append(now)
+
+        self.in_flight += 1
+        try:
+            delay = self.latency + chars * self.seconds_per_char
+            if self.capacity and self.in_flight > self.capacity:
+                delay *= self.in_flight / self.capacity
+            if self.stall_probability and self.random.random() < self.stall_probability:
+                delay += self.stall_seconds
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+
+    async def list_voices(self) -> List[Dict[str, Any]]:
+        from .config import DEFAULT_CONFIG
+        names = [DEFAULT_CONFIG['voice']] + DEFAULT_CONFIG['preferred_voices']
+        return [{'Name': name, 'Locale': 'zh-CN', 'Gender': 'Unknown', 'FriendlyName': name} for name in names]
+
+    async def synthesize(self, text: str, voice: str, rate: str, pitch: str, output_path: Path):
+        await self._simulate_request(len(text))
+        with open(output_path, 'wb') as f:
+            f.write(mp3.silent_frames(len(text) * self.audio_seconds_per_char))
+
+    async def synthesize_with_boundaries(self, text: str, voice: str, rate: str, pitch: str):
+        """按空白和标点切词，每个词按字数占用时长，标点处停顿 0.3 秒"""
+        await self._simulate_request(len(text))
+        boundaries = []
+        elapsed = 0.0
+        for match in re.finditer(r'[^\s，。！？；：]+|[，。！？；：]', text):
+            word = match.group()
+            if word in '，。！？；：':
+                elapsed += 0.3
+                continue
+            duration = len(word) * self.audio_seconds_per_char
+            boundaries.append({'text': word, 'offset': elapsed, 'duration': duration})
+            elapsed += duration
+        return mp3.silent_frames(elapsed), boundaries
+
+
+def join_sections(texts: List[str]) -> Tuple[str, List[int]]:
+    """
+    把多段文本拼成一次请求的文本，段与段之间保证有句末标点（让语音在段落之间自然停顿）
+
+    Returns:
+        (拼接后的文本, 每段在拼接文本中的起始位置)
+    """
+    parts = []
+    starts = []
+    position = 0
+    for text in texts:
+        if parts:
+            parts.append(' ')
+            position += 1
+        if text[-1] not in SECTION_END_PUNCTUATION:
+            text += '。'
+        starts.append(position)
+        parts.append(text)
+        position += len(text)
+    return ''.join(parts), starts
+
+
+def locate_cuts(combined: str, starts: List[int], boundaries: List[Dict[str, Any]]) -> List[float]:
+    """
+    根据词边界计算各段之间的切分时间（秒）
+
+    词边界的文本依次在拼接文本中查找，定位到所属的段；相邻两段之间的切点取
+    前一段最后一个词的结束时间和后一段第一个词的开始时间的中点，也就是段落之间的停顿中间。
+    某一段没有任何词边界时无法切分，抛出 ValueError。
+    """
+    first_offset = [None] * len(starts)
+    last_end = [None] * len(starts)
+    cursor = 0
+    for boundary in boundaries:
+        position = combined.find(boundary['text'], cursor)
+        if position < 0:
+            continue  # 服务端改写过的词（例如数字读法）找不到，跳过即可
+        cursor = position + len(boundary['text'])
+        section = bisect.bisect_right(starts, position) - 1
+        if first_offset[section] is None:
+            first_offset[section] = boundary['offset']
+        last_end[section] = boundary['offset'] + boundary['duration']
+
+    if any(offset is None for offset in first_offset):
+        missing = [i + 1 for i, offset in enumerate(first_offset) if offset is None]
+        raise ValueError(f"第 {missing} 段没有词边界，无法切分")
+    return [(last_end[i - 1] + first_offset[i]) / 2 for i in range(1, len(starts))]
+
+
+def make_backend(config: Dict[str, Any]):
+    backend = config.get('backend', 'edge')
+    if backend == 'edge':
+        return EdgeBackend()
+    if backend == 'offline':
+        return OfflineBackend(**config.get('offline', {}))
+    raise ValueError(f"未知的合成后端: {backend}")
+
+
+def _copy_to(source: str, target: Path):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, target)
+
+
+def _write_segments(paths: List[Path], segments: List[bytes]):
+    """逐个写入（先写同目录的临时文件再改名）"""
+    for path, segment in zip(paths, segments):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.part")
+        tmp_path.write_bytes(segment)
+        os.replace(tmp_path, path)
+
+
+def _prepend_silence(source: str, output_path: Path, silence_ms: int):
+    from pydub import AudioSegment  # 需要 pip install pydub 且系统可用 ffmpeg
+    audio = AudioSegment.from_file(source)
+    silence = AudioSegment.silent(duration=silence_ms)
+    (silence + audio).export(str(output_path), format="mp3")
+
+
+class SpeechEngine:
+    def __init__(self, config: Dict[str, Any], backend=None):
+        """
+        合成引擎
+
+        Args:
+            config: 某个模式生效的配置（见 tts.config.mode_config）
+            backend: 合成后端，默认按 config['backend'] 创建
+        """
+        self.config = config
+        self.voice = config['voice']
+        self.rate = config.get('rate', '+0%')
+        self.pitch = config.get('pitch', '+0Hz')
+        self.backend = backend or make_backend(config)
+        self.cache_dir = Path(config['cache_dir']) if config.get('cache_dir') else None
+        # 并发控制：固定并发数，或启用 adaptive 后由 AIMD 控制器自动调整并发数和请求速率
+        adaptive = config.get('adaptive') or {}
+        if adaptive.get('enabled'):
+            self.limiter = AIMDController(adaptive)
+        else:
+            self.limiter = StaticLimiter(config.get('concurrency', 1))
+        # 整机共享的请求速率预算：同一台机器上所有 tts 进程的请求加起来不超过 host_limit.rate（见 tts.hostlimit）
+        host_limit = config.get('host_limit') or {}
+        self.host_bucket = HostTokenBucket(host_limit) if host_limit.get('enabled') else None
+        # 每次请求的截止时间，以及超过 p95 时的对冲请求（见 tts.hedge）
+        self.hedger = RequestHedger(config.get('hedge'), timeout=config.get('request_timeout'))
+        # 文件读写和音频处理放到线程中执行，事件循环只负责网络请求；loop_lag 记录事件循环的卡顿
+        self.offload = Offloader()
+        self.loop_lag = LoopLagMonitor()
+        self.stats: List[Dict[str, Any]] = []  # 每次成功合成的记录（字符数、耗时、音频字节数）
+        self._resolved_voice: Optional[str] = None
+        self._voice_lock = asyncio.Lock()
+
+    def variant(self, voice: Optional[str] = None, rate: Optional[str] = None,
+                pitch: Optional[str] = None) -> 'SpeechEngine':
+        """
+        同一引擎换一组语音参数：共用后端、并发和限速、对冲、缓存目录、线程池和统计，
+        多个变体的请求因此受同一个并发上限约束；缓存按各自的语音参数区分
+        指定的语音不可用时不依次尝试 preferred_voices（那样几个变体可能得到同一种声音），直接退回任意 zh-CN 语音
+        """
+        clone = copy.copy(self)
+        clone.voice = voice or self.voice
+        clone.rate = rate or self.rate
+        clone.pitch = pitch or self.pitch
+        clone.config = {**self.config, 'voice': clone.voice, 'rate': clone.rate, 'pitch': clone.pitch,
+                        'preferred_voices': []}
+        clone._resolved_voice = self._resolved_voice if clone.voice == self.voice else None
+        clone._voice_lock = asyncio.Lock()
+        return clone
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """一次请求的执行名额：先取整机令牌，再占用本进程的并发名额（等待令牌的时间不计入 AIMD 的延迟统计）"""
+        if self.host_bucket:
+            await self.host_bucket.acquire()
+        async with self.limiter.slot():
+            yield
+
+    @property
+    def max_parallel(self) -> int:
+        """调用方最多需要同时准备多少个任务（自适应时取并发上限）"""
+        if isinstance(self.limiter, AIMDController):
+            return int(self.limiter.config['max_concurrency'])
+        return self.limiter.concurrency
+
+    async def resolve_voice(self) -> str:
+        """确定实际使用的语音，整个引擎生命周期内只查询一次语音列表"""
+        async with self._voice_lock:
+            if self._resolved_voice:
+                return self._resolved_voice
+
+            try:
+                all_voices = await self.backend.list_voices()
+            except Exception as e:
+                print(f"⚠️  获取语音列表失败，直接使用配置的语音 {self.voice}: {e}")
+                self._resolved_voice = self.voice
+                return self._resolved_voice
+
+            available = {v["Name"] for v in all_voices}
+            candidates = [self.voice] + [v for v in self.config.get('preferred_voices', []) if v != self.voice]
+            print("Looking for voice from preferred list...")
+            for voice in candidates:
+                if voice in available:
+                    self._resolved_voice = voice
+                    print(f"✓ Found preferred voice: {voice}")
+                    break
+                print(f"✗ Voice not available: {voice}")
+
+            # 如果没有找到首选语音，则查找任何中文(zh-CN)语音作为备选
+            if not self._resolved_voice:
+                zh_cn_voices = [v for v in all_voices if v["Locale"].startswith("zh-CN")]
+                if zh_cn_voices:
+                    self._resolved_voice = zh_cn_voices[0]["Name"]
+                    print(f"✓ Using fallback zh-CN voice: {self._resolved_voice}")
+                else:
+                    print("⚠️  No zh-CN voices found! This might cause issues.")
+                    self._resolved_voice = self.voice
+            return self._resolved_voice
+
+    def cache_path(self, text: str, voice: str) -> Optional[Path]:
+        """缓存文件路径：由语音参数和文本决定"""
+        if not self.cache_dir:
+            return None
+        key = json.dumps([voice, self.rate, self.pitch, text], ensure_ascii=False)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.mp3"
+
+    async def synthesize(self, text: str, output_path: Path, leading_silence_ms: int = 0) -> Dict[str, Any]:
+        """
+        合成一段文本到 output_path，失败时抛出异常
+
+        Args:
+            text: 已经清理好的朗读文本
+            output_path: 输出的 mp3 路径
+            leading_silence_ms: 在音频开头添加的静音时长
+        Returns:
+            本次合成的统计 {'chars', 'seconds', 'bytes', 'cached'}
+        """
+        self.loop_lag.ensure_started()
+        output_path = Path(output_path)
+        voice = await self.resolve_voice()
+        cache_path = self.cache_path(text, voice)
+        started = time.perf_counter()
+        cached = bool(cache_path and cache_path.exists())
+
+        # 先写到同目录的临时文件，完成后再改名，中断时不会留下半个音频
+        tmp_mp3 = str(output_path.with_name(f".{output_path.name}.part"))
+        try:
+            if cached:
+                await self.offload.io(shutil.copyfile, cache_path, tmp_mp3)
+            else:
+                await self._request_file(text, voice, Path(tmp_mp3))
+                if cache_path:
+                    await self.offload.io(_copy_to, tmp_mp3, cache_path)
+
+            if leading_silence_ms > 0:
+                await self._add_leading_silence(text, voice, tmp_mp3, output_path, leading_silence_ms)
+            else:
+                os.replace(tmp_mp3, output_path)
+        finally:
+            if os.path.exists(tmp_mp3):
+                os.remove(tmp_mp3)
+
+        record = {
+            'chars': len(text),
+            'seconds': round(time.perf_counter() - started, 3),
+            'bytes': output_path.stat().st_size,
+            'cached': cached
+        }
+        self.stats.append(record)
+        return record
+
+    async def _request_file(self, text: str, voice: str, path: Path):
+        """一次合成请求（带截止时间和对冲），结果写到 path；对冲请求写到另一个临时文件，胜出后再改名"""
+        async def attempt(index: int) -> Path:
+            target = path if index == 0 else path.with_name(f"{path.name}.{index}")
+            await self.backend.synthesize(text, voice, self.rate, self.pitch, target)
+            return target
+
+        try:
+            winner = await self.hedger.run(attempt, self.slot)
+            if winner != path:
+                os.replace(winner, path)
+        finally:
+            hedge_path = path.with_name(f"{path.name}.1")
+            if hedge_path.exists():
+                hedge_path.unlink()
+
+    async def synthesize_sections(self, texts: List[str], output_paths: List[Path]) -> Dict[str, Any]:
+        """
+        多段文本只发一次请求：拼接后合成，再按词边界在 MP3 帧边界上切成多个文件
+        （edge-tts 不接受自定义 SSML，无法使用 <bookmark>，词边界元数据起同样的作用）
+
+        Args:
+            texts: 已经清理好的非空朗读文本
+            output_paths: 与 texts 一一对应的输出路径
+        Returns:
+            本次合成的统计 {'chars', 'seconds', 'bytes', 'cached', 'sections'}
+        """
+        self.loop_lag.ensure_started()
+        output_paths = [Path(path) for path in output_paths]
+        voice = await self.resolve_voice()
+        cache_paths = [self.cache_path(text, voice) for text in texts]
+        started = time.perf_counter()
+        cached = all(path and path.exists() for path in cache_paths)
+
+        if cached:
+            segments = await self.offload.io(lambda: [path.read_bytes() for path in cache_paths])
+        else:
+            combined, starts = join_sections(texts)
+            audio, boundaries = await self.hedger.run(
+                lambda index: self.backend.synthesize_with_boundaries(combined, voice, self.rate, self.pitch),
+                self.slot)
+            segments = await self.offload.audio(mp3.split_at, audio, locate_cuts(combined, starts, boundaries))
+            await self.offload.io(_write_segments, [path for path in cache_paths if path],
+                                  [segment for path, segment in zip(cache_paths, segments) if path])
+
+        await self.offload.io(_write_segments, output_paths, segments)
+
+        record = {
+            'chars': sum(len(text) for text in texts),
+            'seconds': round(time.perf_counter() - started, 3),
+            'bytes': sum(len(segment) for segment in segments),
+            'cached': cached,
+            'sections': len(texts)
+        }
+        self.stats.append(record)
+        return record
+
+    async def _add_leading_silence(self, text: str, voice: str, tmp_mp3: str, output_path: Path, silence_ms: int):
+        """如果安装了 pydub + ffmpeg，则在音频开头拼接静音以模拟 <break/>"""
+        try:
+            # 解码、拼接、编码都在音频线程中进行，不阻塞其他请求
+            await self.offload.audio(_prepend_silence, tmp_mp3, output_path, silence_ms)
+        except Exception as e:
+            # pydub 或 ffmpeg 不可用时降级：在文本最前面追加省略号/逗号以产生短暂停顿（不精确）
+            print(f"⚠️ 未能添加静音（可能缺少 pydub/ffmpeg）：{e}")
+            try:
+                pseudo_pause = "…… " if silence_ms >= 800 else "，"
+                pause_mp3 = Path(f"{tmp_mp3}.pause")
+                try:
+                    await self._request_file(pseudo_pause + text, voice, pause_mp3)
+                    os.replace(pause_mp3, output_path)
+                finally:
+                    if pause_mp3.exists():
+                        pause_mp3.unlink()
+            except Exception as e2:
+                # 最后兜底：直接输出原音频
+                print(f"⚠️ 文本停顿降级也失败，将直接输出：{e2}")
+                os.replace(tmp_mp3, output_path)
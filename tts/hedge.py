@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+请求截止时间与对冲请求
+  偶尔有合成请求卡住几十秒，串行处理时每次卡顿都直接加到总耗时上。
+  RequestHedger 为每次请求设置截止时间（request_timeout），并可选地发出对冲请求：
+  请求耗时超过最近成功请求的 p95 时再发一个相同的请求，取先完成的结果，取消另一个。
+  对冲请求数不超过普通请求数的 budget 比例，总请求量仍在限流范围内；
+  对冲请求同样要经过引擎的并发/速率控制。
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .aimd import percentile
+
+DEFAULT_HEDGE: Dict[str, Any] = {
+    'enabled': False,
+    'quantile': 0.95,  # 超过最近成功请求耗时的这个分位数时发出对冲请求
+    'min_samples': 10,  # 样本数不足时不对冲
+    'window': 100,  # 统计最近多少次成功请求的耗时
+    'budget': 0.05,  # 对冲请求数最多为普通请求数的 5%
+    'min_delay': 0.5  # 对冲等待时间下限（秒），避免极短请求也被对冲
+}
+
+
+class RequestHedger:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            config: 配置中的 hedge 字段，缺省项使用 DEFAULT_HEDGE
+            timeout: 每次请求（含对冲）的截止时间（秒），None 或 0 表示不限
+        """
+        self.config = {**DEFAULT_HEDGE, **(config or {})}
+        self.enabled = bool(self.config['enabled'])
+        self.timeout = timeout or None
+        self.latencies = deque(maxlen=int(self.config['window']))
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """现在发出的请求等多久后对冲；不满足条件（未启用、样本不足、预算用完）时返回 None"""
+        if not self.enabled or len(self.latencies) < self.config['min_samples']:
+            return None
+        if self.hedged + 1 > self.config['budget'] * self.requests:
+            return None
+        return max(percentile(self.latencies, self.config['quantile']), self.config['min_delay'])
+
+    async def run(self, attempt: Callable[[int], Awaitable[Any]], slot: Callable[[], Any]) -> Any:
+        """
+        执行一次请求，必要时对冲
+
+        Args:
+            attempt: attempt(序号) 返回一次请求的协程，序号 0 为原请求、1 为对冲请求；
+                     两次请求必须互不影响（例如写到不同的临时文件）
+            slot: 返回并发名额的异步上下文管理器（引擎的 slot）
+        Returns:
+            先成功完成的请求的返回值；超过截止时间抛出 asyncio.TimeoutError
+        """
+        self.requests += 1
+        acquired: Dict[int, float] = {}  # 各请求拿到并发名额的时间：截止时间和对冲都从这里算起，排队不计入
+
+        async def guarded(index: int):
+            async with slot():
+                acquired[index] = time.monotonic()
+                return await attempt(index)
+
+        tasks = [asyncio.ensure_future(guarded(0))]
+        delay = self.hedge_delay()
+        try:
+            while True:
+                waits = []
+                if 0 in acquired:
+                    if self.timeout:
+                        waits.append(acquired[0] + self.timeout - time.monotonic())
+                    if delay is not None and len(tasks) == 1:
+                        waits.append(acquired[0] + delay - time.monotonic())
+                pending = [task for task in tasks if not task.done()]
+                # 原请求还在排队时每 0.1 秒检查一次是否已拿到名额
+                timeout = max(0.0, min(waits)) if waits else (0.1 if 0 not in acquired else None)
+                if pending:
+                    await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for index, task in enumerate(tasks):
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        self.latencies.append(time.monotonic() - acquired[index])
+                        if index > 0:
+                            self.hedge_wins += 1
+                        return task.result()
+                if all(task.done() for task in tasks):
+                    raise tasks[-1].exception()  # 全部失败（原请求失败时不对冲，失败交给调用方处理）
+
+                now = time.monotonic()
+                if 0 not in acquired:
+                    continue
+                if self.timeout and now >= acquired[0] + self.timeout:
+                    self.timeouts += 1
+                    raise asyncio.TimeoutError(f"合成请求超过 {self.timeout:.0f} 秒未完成")
+                if delay is not None and len(tasks) == 1 and now - acquired[0] >= delay:
+                    # 原请求太慢：发出对冲请求
+                    self.hedged += 1
+                    tasks.append(asyncio.ensure_future(guarded(1)))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # 等被取消的请求真正退出（释放并发名额、关闭连接）
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def summary(self) -> str:
+        return (f"请求 {self.requests} 次, 对冲 {self.hedged} 次（对冲先完成 {self.hedge_wins} 次）, "
+                f"超时 {self.timeouts} 次")
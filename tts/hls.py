@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+HLS 分段输出
+  详细解析和整篇文档的音频常有几分钟长，客户端要下载完整个 MP3 才能可靠地拖动进度。
+  这里把长音频在 MP3 帧边界上切成固定时长的分段（不重新编码），再写一个 HLS 播放列表：
+  播放器下载第一个分段即可开始播放，拖动进度只需要请求对应的一个小分段。
+    <音频名>_hls/index.m3u8
+    <音频名>_hls/segment_00000.mp3 ...
+  分段是 HLS 的 packed audio 格式：每段开头有一个 ID3 标签，记录该段第一帧的时间戳（90 kHz）。
+  播放列表写入 meta.json 的 files.hls（其他目录写入 hls.json）。
+"""
+
+import math
+import os
+import shutil
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .loudness import HLS_DIR_SUFFIX, entry_key, find_clips, load_record, record_file, save_record
+from .mp3 import frame_index, parse_frame_header
+
+DEFAULT_HLS: Dict[str, Any] = {
+    'enabled': False,
+    'segment_seconds': 6.0,  # 每段的目标时长（按帧取整）
+    'min_duration': 60.0  # 只切分不短于该时长（秒）的音频
+}
+PLAYLIST_NAME = "index.m3u8"
+RECORD_FILE_NAME = "hls.json"
+TIMESTAMP_OWNER = b'com.apple.streaming.transportStreamTimestamp\x00'
+
+
+def _syncsafe(size: int) -> bytes:
+    return bytes(((size >> shift) & 0x7F) for shift in (21, 14, 7, 0))
+
+
+def id3_timestamp(seconds: float) -> bytes:
+    """packed audio 分段开头的 ID3v2.4 标签：PRIV 帧中是 33 位、90 kHz 的时间戳"""
+    payload = TIMESTAMP_OWNER + struct.pack('>Q', round(seconds * 90000) & ((1 << 33) - 1))
+    frame = b'PRIV' + _syncsafe(len(payload)) + b'\x00\x00' + payload
+    return b'ID3\x04\x00\x00' + _syncsafe(len(frame)) + frame
+
+
+def _stream_end(data: bytes, frames: List[Tuple[int, float]]) -> Tuple[int, float]:
+    """最后一帧结束处的 (字节偏移, 时间)；之后的字节（例如 ID3v1 标签）不属于任何分段"""
+    offset, elapsed = frames[-1]
+    size, samples, sample_rate = parse_frame_header(data, offset)
+    return offset + size, elapsed + samples / sample_rate
+
+
+def split_segments(data: bytes, segment_seconds: float) -> List[Tuple[int, int, float, float]]:
+    """
+    在帧边界上按目标时长切分
+
+    Returns:
+        [(起始字节, 结束字节, 起始时间, 时长)]
+    """
+    frames = frame_index(data)
+    if not frames:
+        return []
+    end_offset, end_time = _stream_end(data, frames)
+    segments = []
+    start_offset, start_time = frames[0]
+    next_cut = segment_seconds
+    for offset, elapsed in frames[1:]:
+        if elapsed >= next_cut - 1e-6:
+            segments.append((start_offset, offset, start_time, elapsed - start_time))
+            start_offset, start_time = offset, elapsed
+            next_cut = start_time + segment_seconds
+    segments.append((start_offset, end_offset, start_time, end_time - start_time))
+    return segments
+
+
+def write_hls(clip: Path, data: bytes, segments: List[Tuple[int, int, float, float]],
+              segment_seconds: float) -> Dict[str, Any]:
+    """
+    写分段和播放列表；先写到临时目录再替换，播放中的客户端不会读到一半的分段
+
+    Returns:
+        {'playlist': 相对于 clip 所在目录的路径, 'segments', 'segment_seconds', 'duration'}
+    """
+    target_dir = clip.with_name(f"{clip.stem}{HLS_DIR_SUFFIX}")
+    tmp_dir = clip.with_name(f".{target_dir.name}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3',
+             f'#EXT-X-TARGETDURATION:{math.ceil(round(max(duration for *_, duration in segments), 3))}',
+             '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+    for index, (start, end, start_time, duration) in enumerate(segments):
+        name = f"segment_{index:05d}.mp3"
+        with open(tmp_dir / name, 'wb') as f:
+            f.write(id3_timestamp(start_time))
+            f.write(data[start:end])
+        lines += [f'#EXTINF:{duration:.3f},', name]
+    lines.append('#EXT-X-ENDLIST')
+    (tmp_dir / PLAYLIST_NAME).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    os.replace(tmp_dir, target_dir)
+    return {'playlist': f"{target_dir.name}/{PLAYLIST_NAME}", 'segments': len(segments),
+            'segment_seconds': segment_seconds, 'duration': round(sum(s[3] for s in segments), 3)}
+
+
+def segment_paths(paths: List[str], options: Optional[Dict[str, Any]] = None, force: bool = False) -> int:
+    """
+    为目录（或文件）中的长音频生成 HLS 分段，记录到 meta.json；返回本次切分的音频数
+    切分只是按字节截取，不需要进程池；播放列表比源文件新时跳过
+    """
+    options = {**DEFAULT_HLS, **(options or {})}
+    written = 0
+    skipped = 0
+    for clip in find_clips(paths):
+        playlist = clip.with_name(f"{clip.stem}{HLS_DIR_SUFFIX}") / PLAYLIST_NAME
+        if not force and playlist.exists() and playlist.stat().st_mtime >= clip.stat().st_mtime:
+            skipped += 1
+            continue
+        data = clip.read_bytes()
+        segments = split_segments(data, float(options['segment_seconds']))
+        if not segments or sum(s[3] for s in segments) < options['min_duration']:
+            continue
+
+        info = write_hls(clip, data, segments, float(options['segment_seconds']))
+        record_path = record_file(clip.parent, RECORD_FILE_NAME)
+        record = load_record(record_path)
+        files = record.setdefault('files', {})
+        files.setdefault('hls', {})[entry_key(record, clip.name)] = info
+        save_record(record_path, record)
+        written += 1
+        print(f"📼 {clip.name}: {info['segments']} 个分段（{info['duration']:.0f}s）-> {info['playlist']}")
+
+    print(f"✓ HLS: 切分 {written} 个音频，跳过 {skipped} 个（已是最新）")
+    return written
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+整机共享的请求速率预算
+  同一台机器上同时运行多个 tts 进程（几个题库的批量处理、临时的 questions 等）时，各进程只控制自己的速率，
+  加起来仍会超过服务端的限制而被限流。HostTokenBucket 把令牌桶的状态放在一个共享文件中
+  （默认在系统临时目录），用 fcntl.flock 加锁后读-改-写：每个合成请求（含对冲请求）开始前取一个令牌，
+  所有进程加起来的请求速率不超过 rate，短时突发不超过 burst 个。
+  令牌不足时预约下一个令牌（余额记为负数），在本进程内等到预约时间再开始，各进程按预约先后依次发出请求；
+  不需要守护进程，进程退出时 flock 随文件描述符自动释放，不会留下死锁。
+  桶文件只有当前用户可读写（0600），默认放在 $XDG_RUNTIME_DIR（没有时为临时目录下带 uid 的文件名），
+  其他用户无法改写余额或占住锁；因此整机预算在同一用户的进程之间共享。
+
+桶文件内容：{"tokens": 余额, "updated": 上次更新时间（time.time()）}
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_HOST_LIMIT: Dict[str, Any] = {
+    'enabled': False,
+    'rate': 2.0,  # 整机每秒请求数
+    'burst': 2,  # 桶容量：空闲一段时间后最多连续发出的请求数
+    'path': None  # 桶文件，默认见 default_bucket_path；所有进程需使用同一个文件
+}
+BUCKET_FILE_NAME = "tts_host_bucket.json"
+
+
+def default_bucket_path() -> str:
+    """当前用户专用的桶文件：$XDG_RUNTIME_DIR/tts_host_bucket.json，否则 <临时目录>/tts_host_bucket-<uid>.json"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, BUCKET_FILE_NAME)
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    name, ext = os.path.splitext(BUCKET_FILE_NAME)
+    return os.path.join(tempfile.gettempdir(), f"{name}-{user}{ext}")
+
+
+class HostTokenBucket:
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: 配置中的 host_limit 字段，缺省项使用 DEFAULT_HOST_LIMIT
+        """
+        self.config = {**DEFAULT_HOST_LIMIT, **(config or {})}
+        self.rate = max(float(self.config['rate']), 1e-3)
+        self.burst = max(float(self.config['burst']), 1.0)
+        self.path = self.config['path'] or default_bucket_path()
+        try:
+            import fcntl
+            self._fcntl = fcntl
+        except ImportError:
+            # 没有 fcntl 的平台（Windows）只能在本进程内限速
+            self._fcntl = None
+            print("⚠️  当前平台不支持 fcntl，整机限速只对本进程生效")
+        self._local = threading.Lock()
+        self._state: Dict[str, float] = {}  # 没有 fcntl 时的桶状态
+        self.acquired = 0
+        self.waited = 0.0
+
+    def _refill(self, state: Dict[str, Any], now: float) -> float:
+        tokens = float(state.get('tokens', self.burst))
+        updated = float(state.get('updated', now))
+        return min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数（同步执行，加锁时间为微秒级）"""
+        with self._local:
+            now = time.time()
+            if self._fcntl is None:
+                tokens = self._refill(self._state, now) - 1
+                self._state = {'tokens': tokens, 'updated': now}
+                return max(0.0, -tokens / self.rate)
+
+            # 0600：只有当前用户能读写；O_NOFOLLOW：不跟随临时目录中别人预先放好的符号链接
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+            try:
+                self._fcntl.flock(fd, self._fcntl.LOCK_EX)
+                tokens = self._read(fd, now)
+                tokens -= 1
+                data = json.dumps({'tokens': round(tokens, 6), 'updated': now}).encode('utf-8')
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, data)
+            finally:
+                os.close(fd)  # 关闭即释放 flock
+            return max(0.0, -tokens / self.rate)
+
+    def _read(self, fd: int, now: float) -> float:
+        """桶文件中的当前余额（已按经过的时间补充）"""
+        raw = os.read(fd, 4096)
+        try:
+            state = json.loads(raw) if raw else {}
+        except ValueError:
+            state = {}  # 文件损坏时从满桶开始
+        return self._refill(state, now)
+
+    async def acquire(self):
+        """等到拿到令牌为止；加锁读写在线程中执行，不阻塞事件循环"""
+        wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve)
+        self.acquired += 1
+        if wait > 0:
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+    def describe(self) -> str:
+        return f"整机限速 {self.rate:g} 次/秒（突发 {self.burst:g}，{self.path}）"
+
+    def summary(self) -> str:
+        return f"{self.describe()}: 取令牌 {self.acquired} 次, 共等待 {self.waited:.1f} 秒"
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+多机分布式合成：共享任务库 + 租约
+  限流按客户端 IP 计算，想更快只能把合成分散到多台机器。所有机器共用一个 SQLite 任务库
+  （放在共享文件系统上，或每台机器都能访问的路径），每个问题是一个任务：
+    - enqueue   任务 id 由输入文件、输出目录、编号和问题 id 决定，重复入队不会产生重复任务
+    - lease     worker 在事务中取走一个待处理任务（或租约已过期的任务），租约 lease_seconds 秒
+    - heartbeat 处理期间定期续租；续租失败说明租约已过期并被别人接手
+    - complete  幂等：已完成的任务再次完成不会改变结果；租约过期后原 worker 仍可完成
+    - fail      放回队列，超过 max_attempts 次后标记为失败
+  输出文件都是先写临时文件再改名，同一任务即使被两个 worker 合成，也不会出现半截文件。
+  JobStore 只依赖上面几个方法，换成其他实现（例如本地服务）时 worker 不需要修改。
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',  -- pending / leased / done / failed
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+
+def make_worker_id() -> str:
+    """主机名 + 进程号 + 随机后缀，多台机器、多个进程之间不会重复"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def job_id(input_file: str, output_dir: str, question_num: int, question_id: Optional[str]) -> str:
+    key = json.dumps([str(Path(input_file).resolve()), str(Path(output_dir).resolve()), question_num, question_id])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+class SqliteJobStore:
+    def __init__(self, path: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        SQLite 任务库
+
+        Args:
+            path: 数据库文件路径（多机时放在共享文件系统上）
+            lease_seconds: 租约时长，worker 每 lease_seconds/3 秒续租一次
+            max_attempts: 失败（或租约过期）多少次后不再重试
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None：手动控制事务，取任务时用 BEGIN IMMEDIATE 先拿写锁
+        # check_same_thread=False：QueueWorker 在自己的数据库线程中访问（同一时间只有一个线程使用连接）
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        批量入队，已存在的任务忽略
+
+        Args:
+            jobs: [{'id': 任务id, 'payload': 可 JSON 序列化的任务内容}]
+
+        Returns:
+            新加入的任务数
+        """
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.db.total_changes
+            self.db.executemany("INSERT OR IGNORE INTO jobs (id, payload, updated_at) VALUES (?, ?, ?)",
+                                [(job['id'], json.dumps(job['payload'], ensure_ascii=False), now) for job in jobs])
+            added = self.db.total_changes - before
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """取一个待处理或租约已过期的任务，没有可取的任务时返回 None"""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            # 最后一次尝试的租约已过期（例如 worker 被杀掉）：不再重试，标记为失败，否则其他 worker 会一直等它
+            self.db.execute("UPDATE jobs SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                            "error = COALESCE(error, '租约过期'), updated_at = ? "
+                            "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) AND attempts >= ?",
+                            (now, now, self.max_attempts))
+            row = self.db.execute(
+                "SELECT id, payload, attempts FROM jobs "
+                "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) AND attempts < ? "
+                "ORDER BY rowid LIMIT 1", (now, self.max_attempts)).fetchone()
+            if row is None:
+                self.db.execute("COMMIT")
+                return None
+            self.db.execute("UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                            "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                            (worker_id, now + self.lease_seconds, now, row[0]))
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return {'id': row[0], 'payload': json.loads(row[1]), 'attempt': row[2] + 1}
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """续租；返回 False 表示租约已经不属于自己"""
+        now = time.time()
+        cursor = self.db.execute("UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                                 "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                                 (now + self.lease_seconds, now, job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """标记完成（幂等）；返回 False 表示任务已被其他 worker 完成"""
+        cursor = self.db.execute("UPDATE jobs SET state = 'done', lease_owner = ?, lease_expires = NULL, "
+                                 "result = ?, error = NULL, updated_at = ? WHERE id = ? AND state != 'done'",
+                                 (worker_id, json.dumps(result, ensure_ascii=False), time.time(), job_id))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str):
+        """放回队列；重试次数用完时标记为失败。只有仍持有租约时才生效"""
+        self.db.execute("UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                        "lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+                        "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                        (self.max_attempts, error, time.time(), job_id, worker_id))
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数（租约已过期的任务算作 pending，重试次数已用完的算作 failed，与 lease 的规则一致）"""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        rows = self.db.execute(
+            "SELECT CASE WHEN (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) "
+            "THEN CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END ELSE state END, COUNT(*) "
+            "FROM jobs GROUP BY 1", (time.time(), self.max_attempts)).fetchall()
+        for state, count in rows:
+            counts[state] = count
+        return counts
+
+    def reset_failed(self) -> int:
+        """把失败的任务放回队列，重新计数"""
+        cursor = self.db.execute("UPDATE jobs SET state = 'pending', attempts = 0, error = NULL, updated_at = ? "
+                                 "WHERE state = 'failed'", (time.time(),))
+        return cursor.rowcount
+
+
+def enqueue_questions(store: SqliteJobStore, parsers: list) -> int:
+    """把各解析器的所有问题作为任务入队，返回新加入的任务数"""
+    jobs = []
+    for parser in parsers:
+        for question_data, question_num in parser.load_questions():
+            question_id = question_data['metadata'].get('id')
+            jobs.append({
+                'id': job_id(parser.input_file, str(parser.output_dir), question_num, question_id),
+                'payload': {'input_file': str(Path(parser.input_file).resolve()),
+                            'output_dir': str(Path(parser.output_dir).resolve()),
+                            'num': question_num, 'question_id': question_id, 'layout': parser.layout}
+            })
+    return store.enqueue(jobs)
+
+
+class QueueWorker:
+    def __init__(self, store: SqliteJobStore, engine, combined: bool = False, parallel: Optional[int] = None,
+                 poll_interval: float = 2.0, worker_id: Optional[str] = None):
+        """
+        从任务库领取问题并合成，直到队列中没有待处理和处理中的任务
+
+        Args:
+            store: 任务库
+            engine: 合成引擎（并发和限速由引擎控制）
+            combined: 合并模式（见 MarkdownQuestionParser）
+            parallel: 同时持有的租约数，默认等于引擎的并发上限
+            poll_interval: 其他 worker 还持有租约时，隔多久再检查一次
+        """
+        self.store = store
+        self.engine = engine
+        self.combined = combined
+        self.parallel = parallel or engine.max_parallel
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or make_worker_id()
+        # 任务库的读写在单独的线程中依次执行：等待 SQLite 锁（最长 30 秒）时不阻塞合成和续租
+        from concurrent.futures import ThreadPoolExecutor
+        self.db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts-jobstore')
+        self.parsers: Dict[tuple, Any] = {}
+        self.questions: Dict[tuple, Dict[int, Dict[str, Any]]] = {}
+        self.stats = {'done': 0, 'duplicate': 0, 'failed': 0}
+
+    def _question(self, payload: Dict[str, Any]):
+        """按任务内容找到解析器和问题（每个输入文件只解析一次）"""
+        from .questions import MarkdownQuestionParser
+
+        source = (payload['input_file'], payload['output_dir'])
+        if source not in self.parsers:
+            parser = MarkdownQuestionParser(payload['input_file'], payload['output_dir'], verbose=False,
+                                            engine=self.engine, combined=self.combined, layout=payload.get('layout'))
+            self.parsers[source] = parser
+            self.questions[source] = {num: data for data, num in parser.load_questions()}
+        question_data = self.questions[source].get(payload['num'])
+        if question_data is None or question_data['metadata'].get('id') != payload['question_id']:
+            raise ValueError(f"输入文件中找不到第 {payload['num']} 题（id {payload['question_id']}），文件可能已修改")
+        return self.parsers[source], question_data
+
+    async def _store(self, method: str, *args):
+        """在数据库线程中调用任务库的方法"""
+        import asyncio
+        import functools
+        func = functools.partial(getattr(self.store, method), *args)
+        return await asyncio.get_running_loop().run_in_executor(self.db_pool, func)
+
+    @staticmethod
+    def _missing_audio(parser, question_data: Dict[str, Any], question_num: int, since: float) -> List[str]:
+        """非空文本中音频不存在或不是在 since 之后生成的段落"""
+        return [path.name for _, text, path in parser.question_audio_jobs(question_data, question_num)
+                if parser.prepare_tts_text(text) and (not path.exists() or path.stat().st_mtime < since - 1)]
+
+    async def _heartbeat(self, job_id: str):
+        import asyncio
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            if not await self._store('heartbeat', job_id, self.worker_id):
+                print(f"⚠️  任务 {job_id} 的租约已过期，继续处理（完成操作是幂等的）")
+                return
+
+    async def process(self, job: Dict[str, Any]):
+        import asyncio
+
+        payload = job['payload']
+        heartbeat = asyncio.create_task(self._heartbeat(job['id']))
+        try:
+            parser, question_data = self._question(payload)
+            started = time.perf_counter()
+            wall_started = time.time()
+            stats_before = len(parser.synthesis_stats)
+            await parser.create_question_directory(question_data, payload['num'])
+            # generate_audio 会吞掉异常，这里检查每段非空文本的音频是否都在本次重新生成
+            missing = await self.engine.offload.io(self._missing_audio, parser, question_data, payload['num'],
+                                                   wall_started)
+            if missing:
+                raise RuntimeError(f"音频未生成: {', '.join(missing)}")
+            result = {'worker': self.worker_id, 'seconds': round(time.perf_counter() - started, 3),
+                      'requests': len(parser.synthesis_stats) - stats_before}
+            if await self._store('complete', job['id'], self.worker_id, result):
+                self.stats['done'] += 1
+            else:
+                self.stats['duplicate'] += 1
+                print(f"ℹ️  任务 {job['id']} 已被其他 worker 完成")
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"✗ 任务 {job['id']} 失败（第 {job['attempt']} 次）: {e}")
+            await self._store('fail', job['id'], self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def run(self) -> Dict[str, int]:
+        import asyncio
+
+        print(f"👷 worker {self.worker_id} 启动，同时处理 {self.parallel} 个任务")
+
+        async def consume():
+            while True:
+                job = await self._store('lease', self.worker_id)
+                if job is None:
+                    counts = await self._store('counts')
+                    if counts['pending'] == 0 and counts['leased'] == 0:
+                        return
+                    # 其他 worker 还持有租约：等租约完成或过期
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.process(job)
+
+        await asyncio.gather(*(consume() for _ in range(max(1, self.parallel))))
+        print(f"🏁 worker {self.worker_id} 结束: 完成 {self.stats['done']}, "
+              f"重复 {self.stats['duplicate']}, 失败 {self.stats['failed']}")
+        return self.stats
+
+
+def print_counts(store: SqliteJobStore):
+    counts = store.counts()
+    total = sum(counts.values())
+    print(f"📊 {store.path}: 共 {total} 个任务, 待处理 {counts['pending']}, 处理中 {counts['leased']}, "
+          f"已完成 {counts['done']}, 失败 {counts['failed']}")
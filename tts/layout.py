@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+问题目录布局
+  flat     所有问题目录直接放在输出目录下：<输出目录>/q0001_1a2b3c4d（原布局）
+  sharded  按 id 前缀分片：<输出目录>/1a/q0001_1a2b3c4d，10 万个问题时每个分片约 400 个目录（两位十六进制）
+
+  目录名仍为 q{编号}_{id前8位}，编号至少 4 位、超过 9999 时自然变宽（q10000_...）；
+  所有查找、排序都按 q\\d+ 解析出的数值进行，不依赖编号位数。
+  分片目录名只由 id 前缀决定，同一问题编号变化时仍在同一分片中。
+  iter_question_dirs 同时识别两种布局，按分片并行列目录；migrate 把已有的输出目录一次性转换为另一种布局。
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LAYOUTS = ('flat', 'sharded')
+DEFAULT_SHARD_WIDTH = 2
+QUESTION_DIR = re.compile(r'^q(\d{4,})_([^/]+)$')
+QUESTION_FILE = re.compile(r'^q(\d{4,})_')
+HEX = re.compile(r'^[0-9a-f]+$')
+MANIFEST_NAME = "watch_manifest.json"  # 与 tts.watch 一致：迁移时同步更新其中记录的目录
+
+
+def shard_of(id_prefix: str, width: int = DEFAULT_SHARD_WIDTH) -> str:
+    """分片目录名：十六进制 id（UUID）直接取前 width 位，其他 id 取其哈希的前 width 位"""
+    prefix = id_prefix.lower()
+    if not HEX.match(prefix[:width]) or len(prefix) < width:
+        prefix = hashlib.sha1(id_prefix.encode('utf-8')).hexdigest()
+    return prefix[:width]
+
+
+def question_path(output_dir: Path, dir_name: str, layout: str = 'flat', width: int = DEFAULT_SHARD_WIDTH) -> Path:
+    """问题目录的完整路径"""
+    if layout == 'sharded':
+        match = QUESTION_DIR.match(dir_name)
+        return output_dir / shard_of(match.group(2) if match else dir_name, width) / dir_name
+    return output_dir / dir_name
+
+
+def question_number(path: Path) -> int:
+    match = QUESTION_DIR.match(path.name)
+    return int(match.group(1)) if match else 0
+
+
+def _is_shard(path: Path) -> bool:
+    return path.is_dir() and HEX.match(path.name) is not None and len(path.name) <= 8
+
+
+def iter_question_dirs(root: Path, workers: int = 8) -> List[Path]:
+    """
+    root 下所有问题目录（flat 和 sharded 两种布局都能识别，可以混合），按编号排序
+    各分片目录由线程池并行列出
+    """
+    root = Path(root)
+    if not root.exists():
+        return []
+    direct = []
+    shards = []
+    for item in root.iterdir():
+        if QUESTION_DIR.match(item.name) and item.is_dir():
+            direct.append(item)
+        elif _is_shard(item):
+            shards.append(item)
+
+    def scan(shard: Path) -> List[Path]:
+        return [item for item in shard.iterdir() if QUESTION_DIR.match(item.name) and item.is_dir()]
+
+    if shards:
+        from concurrent.futures import ThreadPoolExecutor  # 只有 sharded 布局才需要线程池，不拖慢启动
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as pool:
+            for found in pool.map(scan, shards):
+                direct.extend(found)
+    return sorted(direct, key=lambda p: (question_number(p), p.name))
+
+
+def iter_files(root: Path, pattern: str, workers: int = 8) -> List[Path]:
+    """汇总目录（audios / meta）中的文件：根目录和各分片目录中匹配 pattern 的文件，按问题编号排序"""
+    root = Path(root)
+    if not root.exists():
+        return []
+    shards = [item for item in root.iterdir() if _is_shard(item)]
+    files = list(root.glob(pattern))
+    if shards:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as pool:
+            for found in pool.map(lambda shard: list(shard.glob(pattern)), shards):
+                files.extend(found)
+    return sorted(files, key=file_order)
+
+
+def file_order(path: Path) -> Tuple[int, str]:
+    """按文件名中的问题编号（数值）排序，q10000 排在 q9999 之后"""
+    match = QUESTION_FILE.match(path.name)
+    return (int(match.group(1)) if match else 0, path.name)
+
+
+def plan_migration(root: Path, layout: str, width: int = DEFAULT_SHARD_WIDTH) -> List[Tuple[Path, Path]]:
+    """需要移动的 (原路径, 新路径)"""
+    moves = []
+    for question_dir in iter_question_dirs(root):
+        target = question_path(root, question_dir.name, layout, width)
+        if target != question_dir:
+            moves.append((question_dir, target))
+    return moves
+
+
+def migrate(root: str, layout: str, width: int = DEFAULT_SHARD_WIDTH, dry_run: bool = False) -> int:
+    """
+    把输出目录转换为 layout 布局（同一文件系统内重命名，不复制文件），返回移动的目录数
+    监视清单中记录的目录一并更新；转换为 flat 后删除空的分片目录
+    """
+    root_path = Path(root)
+    moves = plan_migration(root_path, layout, width)
+    conflicts = [target for _, target in moves if target.exists()]
+    if conflicts:
+        print(f"✗ 目标目录已存在，未做任何移动: {conflicts[0]}" + (f" 等 {len(conflicts)} 个" if len(conflicts) > 1 else ""))
+        return 0
+    print(f"🗂️  {root}: {len(moves)} 个问题目录需要移动到 {layout} 布局" + ("（仅预览）" if dry_run else ""))
+    if dry_run:
+        for source, target in moves[:10]:
+            print(f"   {source.relative_to(root_path)} -> {target.relative_to(root_path)}")
+        return len(moves)
+
+    renamed: Dict[str, str] = {}
+    for source, target in moves:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        source.rename(target)
+        renamed[source.relative_to(root_path).as_posix()] = target.relative_to(root_path).as_posix()
+
+    for shard in [item for item in root_path.iterdir() if _is_shard(item)]:
+        if not any(shard.iterdir()):
+            shard.rmdir()
+    _update_manifest(root_path / MANIFEST_NAME, renamed)
+    print(f"✓ 已移动 {len(moves)} 个问题目录")
+    return len(moves)
+
+
+def _update_manifest(path: Path, renamed: Dict[str, str]):
+    if not renamed or not path.exists():
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for entry in manifest.get('questions', {}).values():
+        entry['dir'] = renamed.get(entry.get('dir'), entry.get('dir'))
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+
+
+def relative_dir(output_dir: Path, question_dir: Path) -> str:
+    """问题目录相对于输出目录的路径（监视清单中保存的形式）"""
+    return question_dir.relative_to(output_dir).as_posix()
+
+
+def validate_layout(layout: Optional[str]) -> str:
+    layout = layout or 'flat'
+    if layout not in LAYOUTS:
+        raise ValueError(f"未知的目录布局: {layout}（可选: {', '.join(LAYOUTS)}）")
+    return layout
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+发音词表：术语、符号和缩写 -> 朗读形式
+  所有词条编译成一个正则表达式（术语和符号各自组织成前缀树，如 before(?:Create|Mount|...)），
+  对文本只扫描一遍完成全部替换；匹配耗时取决于文本长度和前缀树的分支数，与词条数量基本无关，
+  React / JS / CSS 等题库可以加入数千个术语。
+  在同一遍扫描中还处理两条内置的停顿规则：空白分隔的三个连续单词之间加停顿，驼峰命名的大小写交界处加停顿。
+
+词表文件（JSON，配置 lexicon.files 中列出，后面的文件覆盖前面的同名词条）：
+  {"locale": "zh",                          # 适用的语言（按语音名称前缀匹配，如 zh-CN-YunyangNeural），省略表示所有语言
+   "terms": {"useState": "use State"},      # 术语：前后不是英文字母或数字时才匹配，区分大小写
+   "symbols": {"=>": "，箭头函数，"},         # 符号：出现即替换，多个符号重叠时取最长的（=== 优先于 =）
+   "acronyms": {"CSS": "C S S"}}            # 缩写：同术语；也可以写成列表 ["DOM", "API"]，按字母逐个朗读
+  朗读形式原样输出，不再参与后续替换。
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_LOCALE = 'zh'
+DEFAULT_LEXICON_CONFIG: Dict[str, Any] = {
+    'builtin': True,  # 是否使用内置词表（BUILTIN_LEXICONS）
+    'files': [],  # 额外的词表文件
+    'pauses': True  # 是否在连续单词之间、驼峰交界处添加停顿
+}
+# 内置词表；朗读形式与之前逐条替换的结果一致（生命周期名在驼峰处和词尾停顿）
+BUILTIN_LEXICONS: Dict[str, Dict[str, Dict[str, str]]] = {
+    'zh': {
+        'terms': {
+            'beforeCreate': 'before，Create，', 'created': 'created，',
+            'beforeMount': 'before，Mount，', 'mounted': 'mounted，',
+            'beforeUpdate': 'before，Update，', 'updated': 'updated，',
+            'beforeDestroy': 'before，Destroy，', 'destroyed': 'destroyed，',
+            'beforeUnmount': 'before，Unmount，', 'unmounted': 'unmounted，',
+            'activated': 'activated，', 'deactivated': 'deactivated，',
+        },
+        'symbols': {
+            '→': '，然后', '←': '，返回', '↑': '，向上', '↓': '，向下',
+            '(': '，开括号，', ')': '，闭括号，', '[': '，开方括号，', ']': '，闭方括号，',
+            '{': '，开花括号，', '}': '，闭花括号，',
+            '=': '，等于，', '+': '，加，', '*': '，乘，', '/': '，除，', '.': '，点，',
+        },
+        'acronyms': {},
+    }
+}
+PAUSE = '，'
+CAMEL = r'(?<=[a-z])(?=[A-Z])'
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """把词条组织成前缀树形式的正则（不含捕获组）；同一前缀下较长的词条优先匹配"""
+    root: Dict[str, Any] = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        ends = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char != '']
+        if not branches:
+            return ''
+        singles = [char for char, child in sorted(node.items()) if char != '' and list(child) == ['']]
+        if len(singles) == len(branches) and len(singles) > 1:
+            body = '[' + ''.join(re.escape(char) for char in singles) + ']'
+        elif len(branches) == 1:
+            body = branches[0]
+            if ends:
+                body = f'(?:{body})'
+        else:
+            body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if ends else body
+
+    return build(root)
+
+
+class Lexicon:
+    def __init__(self, terms: Dict[str, str], symbols: Dict[str, str], pauses: bool = True):
+        """
+        编译词表
+
+        Args:
+            terms: 术语和缩写 -> 朗读形式（前后不是英文字母或数字时匹配）
+            symbols: 符号 -> 朗读形式（出现即替换）
+            pauses: 是否同时处理两条停顿规则
+        """
+        self.terms = terms
+        self.symbols = symbols
+        term_trie = trie_pattern(terms) if terms else None
+        term = [rf'(?P<term>(?<![A-Za-z0-9])(?:{term_trie})(?![A-Za-z0-9]))'] if term_trie else []
+        symbol = [f'(?P<symbol>{trie_pattern(symbols)})'] if symbols else []
+        # 三个以空白分隔的单词之间加停顿；前两个单词本身是术语时不算（术语的朗读形式自带停顿）
+        plain_word = rf'(?!(?:{term_trie})\s)\w+' if term_trie else r'\w+'
+        words = [rf'(?P<words>(?<!\w){plain_word}\s+{plain_word}\s+\w+)'] if pauses else []
+        camel = [f'(?P<camel>{CAMEL})'] if pauses else []
+        # 没有任何规则时用一个不会匹配的模式
+        self.pattern = re.compile('|'.join(term + symbol + words + camel) or '(?!)')
+        # 单词内部只处理术语和驼峰
+        self.word_pattern = re.compile('|'.join(term + camel) or '(?!)')
+
+    def _replace(self, match: re.Match) -> str:
+        kind = match.lastgroup
+        if kind == 'term':
+            return self.terms[match.group()]
+        if kind == 'symbol':
+            return self.symbols[match.group()]
+        if kind == 'camel':
+            return PAUSE
+        return PAUSE.join(self.word_pattern.sub(self._replace, word) for word in match.group().split())
+
+    def apply(self, text: str) -> str:
+        """一遍扫描完成所有替换"""
+        return self.pattern.sub(self._replace, text)
+
+    def __len__(self) -> int:
+        return len(self.terms) + len(self.symbols)
+
+
+def locale_of(voice: Optional[str]) -> str:
+    """语音名称中的语言部分：zh-CN-YunyangNeural -> zh-CN"""
+    if not voice:
+        return DEFAULT_LOCALE
+    return '-'.join(voice.split('-')[:2])
+
+
+def _entries(data: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    terms = dict(data.get('terms') or {})
+    acronyms = data.get('acronyms') or {}
+    if isinstance(acronyms, list):
+        acronyms = {word: ' '.join(word) for word in acronyms}
+    terms.update(acronyms)
+    return terms, dict(data.get('symbols') or {})
+
+
+@lru_cache(maxsize=16)
+def _compile(locale: str, builtin: bool, files: Tuple[str, ...], pauses: bool) -> Lexicon:
+    terms: Dict[str, str] = {}
+    symbols: Dict[str, str] = {}
+    sources: List[Dict[str, Any]] = []
+    if builtin:
+        sources += [dict(lexicon, locale=name) for name, lexicon in BUILTIN_LEXICONS.items()]
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            sources.append(json.load(f))
+    for data in sources:
+        if locale.lower().startswith(str(data.get('locale') or '').lower()):
+            file_terms, file_symbols = _entries(data)
+            terms.update(file_terms)
+            symbols.update(file_symbols)
+    return Lexicon(terms, symbols, pauses)
+
+
+def load_lexicon(config: Optional[Dict[str, Any]] = None) -> Lexicon:
+    """按配置（lexicon 字段和语音）加载词表；相同配置只编译一次"""
+    config = config or {}
+    options = {**DEFAULT_LEXICON_CONFIG, **(config.get('lexicon') or {})}
+    locale = locale_of(config.get('voice')) if config.get('voice') else DEFAULT_LOCALE
+    return _compile(locale, bool(options['builtin']), tuple(options['files']), bool(options['pauses']))
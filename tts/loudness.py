@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+音频后处理：裁剪首尾静音、响度统一
+  每个音频只用 ffmpeg 解码一次，得到 NumPy PCM 数组，之后的计算全部是向量运算：
+    - 按 10 ms 帧计算 RMS（dBFS），首尾低于阈值的帧视为静音，保留一小段余量后裁掉
+    - 按 ITU-R BS.1770 计算积分响度（LUFS）：K 加权在频域一次完成，400 ms 块能量由累积和得到，
+      再经过 -70 LUFS 绝对门限和 -10 LU 相对门限
+    - 把响度调到目标值（默认 -16 LUFS），增益受峰值上限限制，避免削波
+  处理结果（原响度、调整后响度、增益、裁剪前后时长）写入问题目录的 meta.json；
+  没有 meta.json 的音频（sections / headings 输出）记录在目录下的 loudness.json。
+  多个音频用进程池并行处理；裁剪和增益都很小时不重新编码，重复运行不会反复损失音质。
+需要 numpy 和系统中的 ffmpeg。
+"""
+
+import json
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .mp3 import BITRATE, SAMPLE_RATE
+
+DEFAULT_POSTPROCESS: Dict[str, Any] = {
+    'enabled': False,
+    'silence_threshold': -50.0,  # 帧 RMS 低于该值（dBFS）视为静音
+    'padding_ms': 120,  # 裁剪后首尾保留的静音，避免切掉起音和尾音
+    'frame_ms': 10,  # 计算 RMS 的帧长
+    'normalize': True,  # 是否调整增益
+    'target_lufs': -16.0,  # 目标积分响度（语音类内容常用 -16 LUFS）
+    'max_peak': -1.0,  # 调整后的采样峰值上限（dBFS）
+    'min_change_ms': 30,  # 裁剪少于该时长且增益变化小于 min_gain_db 时不重新编码
+    'min_gain_db': 0.5
+}
+RECORD_FILE_NAME = "loudness.json"
+HLS_DIR_SUFFIX = "_hls"  # HLS 分段目录（见 tts.hls），其中的分段不是独立的音频
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+
+def decode_pcm(path: Path, sample_rate: int = SAMPLE_RATE):
+    """用 ffmpeg 把音频解码为单声道 float32 数组（取值范围 -1 ~ 1）"""
+    import numpy as np
+
+    result = subprocess.run(['ffmpeg', '-v', 'error', '-i', str(path), '-f', 's16le', '-ac', '1',
+                             '-ar', str(sample_rate), '-'], capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def encode_mp3(samples, path: Path, sample_rate: int = SAMPLE_RATE, bitrate: int = BITRATE):
+    """编码为与合成结果相同格式的 MP3（24 kHz / 48 kbps / 单声道，帧工具仍然适用），先写临时文件再替换"""
+    import numpy as np
+
+    pcm = (np.clip(samples, -1.0, 32767 / 32768) * 32768).astype('<i2').tobytes()
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), '-i', '-',
+                        '-b:a', f'{bitrate // 1000}k', '-f', 'mp3', str(tmp_path)], input=pcm, check=True)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def frame_levels(samples, frame: int):
+    """每帧的 RMS 电平（dBFS），最后不足一帧的部分补零"""
+    import numpy as np
+
+    count = -(-len(samples) // frame)
+    frames = np.zeros(count * frame, dtype=np.float64)
+    frames[:len(samples)] = samples
+    rms = np.sqrt(np.mean(frames.reshape(count, frame) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_bounds(levels, threshold: float, frame: int, padding: int, length: int) -> Optional[tuple]:
+    """首尾静音裁剪后的采样范围 (start, end)；整段都是静音时返回 None"""
+    import numpy as np
+
+    voiced = np.flatnonzero(levels > threshold)
+    if voiced.size == 0:
+        return None
+    start = max(0, int(voiced[0]) * frame - padding)
+    end = min(length, (int(voiced[-1]) + 1) * frame + padding)
+    return start, end
+
+
+def _biquad_response(b, a, z):
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+
+def k_weighting(size: int, sample_rate: int):
+    """BS.1770 K 加权滤波器（高架 + 高通）在 rfft 频点上的幅度响应"""
+    import numpy as np
+
+    z = np.exp(-2j * np.pi * np.fft.rfftfreq(size))  # 各频点的 z^-1（rfftfreq 默认以采样率为单位）
+
+    # 第一级：高架滤波器（约 +4 dB），第二级：38 Hz 高通；
+    # 系数按采样率由模拟原型经双线性变换得到，48 kHz 时与 BS.1770 给出的系数一致
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    shelf = _biquad_response((vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k),
+                             (1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k), z)
+
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    highpass = _biquad_response((1, -2, 1), (1, 2 * (k * k - 1) / (1 + k / q + k * k),
+                                             (1 - k / q + k * k) / (1 + k / q + k * k)), z)
+    return np.abs(shelf * highpass)
+
+
+def integrated_loudness(samples, sample_rate: int = SAMPLE_RATE) -> Optional[float]:
+    """
+    积分响度（LUFS，单声道）；全部低于绝对门限（静音）时返回 None
+    K 加权只影响能量，按幅度响应在频域滤波即可，不需要逐采样的 IIR 循环
+    """
+    import numpy as np
+
+    if len(samples) == 0:
+        return None
+    size = 1 << (len(samples) - 1).bit_length()  # 补零到 2 的幂：FFT 更快，循环卷积的回绕也落在补零区
+    weighted = np.fft.irfft(np.fft.rfft(samples, size) * k_weighting(size, sample_rate), size)[:len(samples)]
+
+    block = int(0.4 * sample_rate)
+    step = int(0.1 * sample_rate)
+    if len(weighted) <= block:
+        powers = np.array([np.mean(weighted ** 2)])
+    else:
+        # 400 ms 块、75% 重叠：每块的均方由累积和相减得到
+        energy = np.concatenate(([0.0], np.cumsum(weighted.astype(np.float64) ** 2)))
+        starts = np.arange(0, len(weighted) - block + 1, step)
+        powers = (energy[starts + block] - energy[starts]) / block
+
+    def to_lufs(power):
+        return -0.691 + 10 * np.log10(np.maximum(power, 1e-20))
+
+    gated = powers[to_lufs(powers) > ABSOLUTE_GATE]
+    if gated.size == 0:
+        return None
+    gated = gated[to_lufs(gated) > to_lufs(np.mean(gated)) + RELATIVE_GATE]
+    return float(to_lufs(np.mean(gated)))
+
+
+def process_clip(path: str, options: Dict[str, Any], analyze_only: bool = False) -> Dict[str, Any]:
+    """
+    处理单个音频（进程池任务）
+
+    Returns:
+        {'path', 'loudness_lufs', 'output_lufs', 'gain_db', 'duration', 'trimmed_duration', 'rewritten'}；
+        analyze_only 时 output_lufs / gain_db / trimmed_duration 为处理后的预计值；出错时为 {'path', 'error'}
+    """
+    import numpy as np
+
+    path = Path(path)
+    try:
+        samples = decode_pcm(path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        return {'path': str(path), 'error': str(e)}
+
+    rate = SAMPLE_RATE
+    frame = int(rate * options['frame_ms'] / 1000)
+    padding = int(rate * options['padding_ms'] / 1000)
+    loudness = integrated_loudness(samples, rate)
+    duration = round(len(samples) / rate, 3)
+    result = {'path': str(path), 'loudness_lufs': None if loudness is None else round(loudness, 2),
+              'output_lufs': None, 'gain_db': 0.0, 'duration': duration, 'trimmed_duration': duration,
+              'rewritten': False}
+    bounds = trim_bounds(frame_levels(samples, frame), options['silence_threshold'], frame, padding, len(samples))
+    if bounds is None or loudness is None:
+        result['silent'] = True  # 静音（例如 offline 后端的输出）不做处理
+        return result
+
+    start, end = bounds
+    trimmed = samples[start:end]
+    gain_db = 0.0
+    if options['normalize']:
+        gain_db = options['target_lufs'] - loudness
+        peak = float(np.max(np.abs(trimmed)))
+        if peak > 0:
+            gain_db = min(gain_db, options['max_peak'] - 20 * float(np.log10(peak)))
+    removed_ms = (len(samples) - len(trimmed)) * 1000 / rate
+    if removed_ms < options['min_change_ms'] and abs(gain_db) < options['min_gain_db']:
+        result['output_lufs'] = result['loudness_lufs']
+        return result
+
+    result.update(gain_db=round(gain_db, 2), output_lufs=round(loudness + gain_db, 2),
+                  trimmed_duration=round(len(trimmed) / rate, 3))
+    if analyze_only:
+        return result  # 只报告处理后的预计结果
+    try:
+        encode_mp3(trimmed * np.float32(10 ** (gain_db / 20)), path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        return {'path': str(path), 'error': str(e)}
+    result['rewritten'] = True
+    return result
+
+
+def record_file(directory: Path, fallback: str = RECORD_FILE_NAME) -> Path:
+    """音频处理结果的记录文件：问题目录中的 meta.json，其他目录中的 fallback"""
+    metas = list(directory.glob('*_meta.json'))
+    return metas[0] if len(metas) == 1 else directory / fallback
+
+
+def load_record(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_record(path: Path, record: Dict[str, Any]):
+    """先写临时文件再替换，合成过程中读取 meta.json 的程序不会读到一半的内容"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def entry_key(record: Dict[str, Any], name: str) -> str:
+    """meta.json 中按 files 里的键（audio_simple 等）记录，其他记录按文件名"""
+    return next((key for key, value in record.get('files', {}).items() if value == name), name)
+
+
+def pending_clips(clips: List[Path]) -> List[Path]:
+    """还没有处理过的音频：记录中没有该文件，或文件大小与记录不同（重新合成过）"""
+    records: Dict[Path, Dict[str, Any]] = {}
+    pending = []
+    for clip in clips:
+        if clip.parent not in records:
+            records[clip.parent] = load_record(record_file(clip.parent))
+        record = records[clip.parent]
+        entry = record.get('audio', {}).get(entry_key(record, clip.name))
+        if not entry or entry.get('size') != clip.stat().st_size:
+            pending.append(clip)
+    return pending
+
+
+def find_clips(paths: List[str]) -> List[Path]:
+    """目录下（递归，不含 HLS 分段）的所有 MP3，或直接给出的 MP3 文件"""
+    clips = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            clips.extend(sorted(p for p in path.rglob('*.mp3')
+                                if not p.name.startswith('.') and not p.parent.name.endswith(HLS_DIR_SUFFIX)))
+        elif path.suffix.lower() == '.mp3':
+            clips.append(path)
+    return clips
+
+
+def _record(results: List[Dict[str, Any]], analyze_only: bool = False):
+    """
+    把处理结果写入各问题目录的 meta.json（audio 字段），没有 meta.json 的写入所在目录的 loudness.json
+    analyze_only 的结果不记录文件大小（pending_clips 据此判断是否处理过），之后的后处理仍会处理这些音频；
+    已经处理过、之后没有重新合成的音频保留原来记录的大小
+    """
+    by_dir: Dict[Path, List[Dict[str, Any]]] = {}
+    for result in results:
+        if 'error' not in result:
+            by_dir.setdefault(Path(result['path']).parent, []).append(result)
+
+    for directory, entries in by_dir.items():
+        path = record_file(directory)
+        record = load_record(path)
+        audio = record.setdefault('audio', {})
+        for entry in entries:
+            clip = Path(entry['path'])
+            key = entry_key(record, clip.name)
+            size = clip.stat().st_size
+            values = {k: v for k, v in entry.items() if k != 'path'}
+            if not analyze_only or audio.get(key, {}).get('size') == size:
+                values['size'] = size
+            audio[key] = values
+        save_record(path, record)
+
+
+def postprocess_paths(paths: List[str], options: Optional[Dict[str, Any]] = None, workers: Optional[int] = None,
+                      analyze_only: bool = False, force: bool = False) -> List[Dict[str, Any]]:
+    """
+    后处理目录（或文件）中的所有音频
+
+    Args:
+        options: 配置中的 postprocess 字段，缺省项使用 DEFAULT_POSTPROCESS
+        workers: 进程数，默认为 CPU 核数
+        analyze_only: 只测量并记录响度，不修改音频
+        force: 已处理过（记录中的文件大小相同）的音频也重新处理
+    """
+    options = {**DEFAULT_POSTPROCESS, **(options or {})}
+    found = find_clips(paths)
+    clips = [str(clip) for clip in (found if force else pending_clips(found))]
+    if not clips:
+        print(f"📁 没有需要处理的 MP3 文件（找到 {len(found)} 个，均已处理）")
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(clips))
+    print(f"🎚️  后处理 {len(clips)} 个音频（{workers} 个进程）...")
+    if workers == 1:
+        results = [process_clip(clip, options, analyze_only) for clip in clips]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(process_clip, clips, repeat(options), repeat(analyze_only),
+                                    chunksize=max(1, len(clips) // (workers * 4))))
+    _record(results, analyze_only)
+    print_summary(results)
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]]):
+    errors = [r for r in results if 'error' in r]
+    for result in errors:
+        print(f"✗ {result['path']}: {result['error']}")
+    done = [r for r in results if 'error' not in r]
+    before = sum(r['duration'] for r in done)
+    after = sum(r['trimmed_duration'] for r in done)
+    measured = [r['loudness_lufs'] for r in done if r['loudness_lufs'] is not None]
+    rewritten = sum(1 for r in done if r['rewritten'])
+    print(f"✓ {len(done)} 个音频: 重新编码 {rewritten} 个, 静音 {sum(1 for r in done if r.get('silent'))} 个")
+    if measured:
+        print(f"   原响度 {min(measured):.1f} ~ {max(measured):.1f} LUFS")
+    if before:
+        print(f"   总时长 {before:.1f}s -> {after:.1f}s（裁掉 {before - after:.1f}s，{(before - after) / before:.1%}）")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Markdown -> 语音文本提取器
+单次扫描：按行识别块级结构（标题、代码块、列表、引用、表格、分割线、段落），
+块内文本再做一次行内词法扫描（行内代码、链接、图片、强调），直接产出纯文本，
+不经过 markdown -> HTML -> 正则剥标签的往返。
+"""
+
+import re
+from html import unescape
+from typing import Iterator, List, Tuple
+
+# 块级语法
+FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([^`]*)$')
+HEADING_PATTERN = re.compile(r'^ {0,3}(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$')
+HR_PATTERN = re.compile(r'^ {0,3}([-*_])(?:\s*\1){2,}\s*$')
+SETEXT_PATTERN = re.compile(r'^ {0,3}(=|-)\1*\s*$')
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)([-*+]|\d{1,9}[.)])\s+(.*)$')
+QUOTE_PATTERN = re.compile(r'^ {0,3}>\s?(.*)$')
+BLOCK_START_CHARS = set('#>|`~-*+_=0123456789')
+TABLE_DIVIDER_PATTERN = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+
+# 行内语法
+CODE_SPAN_PATTERN = re.compile(r'(`+)(.+?)(?<!`)\1(?!`)', re.DOTALL)
+LINK_TAIL_PATTERN = re.compile(r'\((?:[^()\s]|\([^()]*\))*(?:\s+"[^"]*")?\)|\[[^\]]*\]')
+AUTOLINK_PATTERN = re.compile(r'<(?:https?://|mailto:)[^>\s]+>|</?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>]*)?/?>')
+HTML_TAG_NAME_PATTERN = re.compile(r'<([A-Za-z][A-Za-z0-9-]*)(?=[\s/>])')
+INLINE_SPECIAL_PATTERN = re.compile(r'[\\`\[!<*_~]')
+ESCAPABLE = set('\\`*_{}[]()#+-.!|<>~')
+# 只负责排版的 HTML 标签不朗读；其他开始标签（如 Vue 组件 <my-folder>）读出标签名
+LAYOUT_TAGS = {
+    'a', 'b', 'br', 'code', 'del', 'div', 'em', 'font', 'hr', 'i', 'img', 'kbd', 'mark',
+    'p', 'pre', 's', 'small', 'span', 'strong', 'sub', 'sup', 'u'
+}
+
+
+def iter_blocks(markdown_text: str) -> Iterator[Tuple[str, int, str, str]]:
+    """
+    按行扫描 Markdown，产出块级词法单元 (类型, 层级, 附加信息, 原始行内文本)
+
+    类型: heading / paragraph / list_item / code / table_row / hr
+    层级: 标题级别或列表缩进宽度，其余为 0
+    附加信息: 代码块语言或列表符号，其余为空字符串
+    """
+    lines = markdown_text.splitlines()
+    paragraph: List[str] = []
+    item = None  # 当前列表项 [缩进, 列表符号, 行列表]
+    i = 0
+
+    def flush():
+        nonlocal item
+        blocks = []
+        if paragraph:
+            blocks.append(('paragraph', 0, '', '\n'.join(paragraph)))
+            paragraph.clear()
+        if item is not None:
+            blocks.append(('list_item', item[0], item[1], '\n'.join(item[2])))
+            item = None
+        return blocks
+
+    while i < len(lines):
+        line = lines[i]
+        quote = QUOTE_PATTERN.match(line)
+        if quote:
+            line = quote.group(1)  # 引用按普通内容处理，只去掉 > 标记
+
+        fence = FENCE_PATTERN.match(line)
+        if fence:
+            yield from flush()
+            marker = fence.group(1)
+            code_lines = []
+            i += 1
+            while i < len(lines):
+                closing = lines[i].strip()
+                if len(closing) >= len(marker) and not closing.strip(marker[0]):
+                    break
+                code_lines.append(lines[i])
+                i += 1
+            yield ('code', 0, fence.group(2).strip(), '\n'.join(code_lines))
+            i += 1
+            continue
+
+        stripped = line.lstrip()
+        if not stripped:
+            yield from flush()
+            i += 1
+            continue
+
+        if stripped[0] not in BLOCK_START_CHARS:
+            # 快速路径：不可能是块级语法的行直接归入段落或列表项
+            (item[2] if item is not None else paragraph).append(line.strip())
+            i += 1
+            continue
+
+        setext = SETEXT_PATTERN.match(line)
+        if setext and paragraph and item is None:
+            # 段落下方的 === / --- 把段落变成标题
+            yield ('heading', 1 if setext.group(1) == '=' else 2, '', '\n'.join(paragraph))
+            paragraph.clear()
+            i += 1
+            continue
+
+        if HR_PATTERN.match(line):
+            yield from flush()
+            yield ('hr', 0, '', '')
+            i += 1
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            yield from flush()
+            yield ('heading', len(heading.group(1)), '', heading.group(2) or '')
+            i += 1
+            continue
+
+        if stripped.startswith('|'):
+            yield from flush()
+            if not TABLE_DIVIDER_PATTERN.match(line):
+                yield ('table_row', 0, '', line.strip())
+            i += 1
+            continue
+
+        list_item = LIST_ITEM_PATTERN.match(line)
+        if list_item:
+            yield from flush()
+            item = [len(list_item.group(1)), list_item.group(2), [list_item.group(3)]]
+            i += 1
+            continue
+
+        if item is not None:
+            item[2].append(line.strip())  # 列表项的续行
+        else:
+            paragraph.append(line.strip())
+        i += 1
+
+    yield from flush()
+
+
+def iter_inline(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    行内词法扫描，产出 (类型, 文本)
+
+    类型: text / code / link_text / image / html
+    强调标记（* _ ~）按 CommonMark 的左右侧规则配对后直接丢弃，未配对的按原样保留
+    """
+    if not INLINE_SPECIAL_PATTERN.search(text):
+        yield ('text', text)
+        return
+
+    pieces: List[List] = []  # [类型, 文本, 可开启, 可关闭]
+    i = 0
+    length = len(text)
+    buffer = []
+
+    def push_text():
+        if buffer:
+            pieces.append(['text', ''.join(buffer), False, False])
+            buffer.clear()
+
+    while i < length:
+        char = text[i]
+        if char == '\\' and i + 1 < length and text[i + 1] in ESCAPABLE:
+            buffer.append(text[i + 1])
+            i += 2
+            continue
+
+        if char == '`':
+            span = CODE_SPAN_PATTERN.match(text, i)
+            if span:
+                push_text()
+                pieces.append(['code', span.group(2).strip(), False, False])
+                i = span.end()
+                continue
+            run = len(text) - len(text[i:].lstrip('`'))
+            buffer.append(text[i:i + run])
+            i += run
+            continue
+
+        if char == '[' or (char == '!' and text.startswith('[', i + 1)):
+            is_image = char == '!'
+            start = i + 2 if is_image else i + 1
+            end = _find_closing_bracket(text, start)
+            if end != -1:
+                tail = LINK_TAIL_PATTERN.match(text, end + 1)
+                if tail:
+                    push_text()
+                    label = text[start:end]
+                    if is_image:
+                        pieces.append(['image', label, False, False])
+                    else:
+                        pieces.append(['link_text', _plain_inline(label), False, False])
+                    i = tail.end()
+                    continue
+
+        if char == '<':
+            tag = AUTOLINK_PATTERN.match(text, i)
+            if tag:
+                push_text()
+                name = HTML_TAG_NAME_PATTERN.match(tag.group(0))
+                if name and name.group(1).lower() not in LAYOUT_TAGS:
+                    pieces.append(['text', name.group(1), False, False])
+                else:
+                    pieces.append(['html', tag.group(0), False, False])
+                i = tag.end()
+                continue
+
+        if char in '*_~':
+            push_text()
+            run_end = i
+            while run_end < length and text[run_end] == char:
+                run_end += 1
+            before = text[i - 1] if i > 0 else ' '
+            after = text[run_end] if run_end < length else ' '
+            left_flanking = not after.isspace() and (not _is_punct(after) or before.isspace() or _is_punct(before))
+            right_flanking = not before.isspace() and (not _is_punct(before) or after.isspace() or _is_punct(after))
+            if char == '_':
+                # 下划线不能在单词内部开启或关闭强调（snake_case 保持原样）
+                can_open = left_flanking and (not right_flanking or _is_punct(before))
+                can_close = right_flanking and (not left_flanking or _is_punct(after))
+            elif char == '~':
+                can_open = left_flanking and run_end - i >= 2
+                can_close = right_flanking and run_end - i >= 2
+            else:
+                can_open, can_close = left_flanking, right_flanking
+            pieces.append(['delim', text[i:run_end], can_open, can_close])
+            i = run_end
+            continue
+
+        # 普通文本：直接跳到下一个可能的语法字符
+        special = INLINE_SPECIAL_PATTERN.search(text, i + 1)
+        next_i = special.start() if special else length
+        buffer.append(text[i:next_i])
+        i = next_i
+
+    push_text()
+    _match_delimiters(pieces)
+    for kind, value, _, _ in pieces:
+        if kind == 'delim':
+            if value:
+                yield ('text', value)
+        else:
+            yield (kind, value)
+
+
+def _find_closing_bracket(text: str, start: int) -> int:
+    """查找与 start 之前的 [ 配对的 ]，支持嵌套和转义"""
+    depth = 0
+    i = start
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+            continue
+        if text[i] == '[':
+            depth += 1
+        elif text[i] == ']':
+            if depth == 0:
+                return i
+            depth -= 1
+        i += 1
+    return -1
+
+
+def _is_punct(char: str) -> bool:
+    return not char.isalnum() and not char.isspace()
+
+
+def _match_delimiters(pieces: List[List]):
+    """把能配对的强调标记置空（直接丢弃），未配对的保留为普通文本"""
+    openers: List[int] = []
+    for index, piece in enumerate(pieces):
+        if piece[0] != 'delim':
+            continue
+        if piece[3]:
+            for pos in range(len(openers) - 1, -1, -1):
+                opener = pieces[openers[pos]]
+                if opener[1] and opener[1][0] == piece[1][0]:
+                    used = min(len(opener[1]), len(piece[1]))
+                    opener[1] = opener[1][used:]
+                    piece[1] = piece[1][used:]
+                    # 夹在中间、未配对的开启标记失效
+                    del openers[pos + (1 if opener[1] else 0):]
+                    break
+        if piece[2] and piece[1]:
+            openers.append(index)
+
+
+def _plain_inline(text: str) -> str:
+    """把一段行内 Markdown 转成纯文本（用于链接文字）"""
+    return ''.join(value for kind, value in iter_inline(text) if kind in ('text', 'code', 'link_text'))
+
+
+def _render_inline(text: str, keep_code: bool) -> str:
+    parts = []
+    for kind, value in iter_inline(text):
+        if kind == 'text':
+            parts.append(unescape(value))
+        elif kind == 'link_text':
+            parts.append(unescape(value))
+        elif kind == 'code':
+            parts.append(f'`{value}`' if keep_code else value)
+        # image / html: 不朗读
+    return ''.join(parts)
+
+
+def markdown_to_text(markdown_text: str, keep_code: bool = False,
+                     keep_list_markers: bool = False, block_sep: str = '\n') -> str:
+    """
+    把 Markdown 转成适合朗读的纯文本
+
+    Args:
+        markdown_text: Markdown 原文
+        keep_code: True 时保留代码块（```围栏）和行内代码的反引号，交给后续的语音预处理决定如何处理；
+                   False 时删除代码块，行内代码只保留其中的文字
+        keep_list_markers: 是否保留列表符号（统一为 "- " 或 "1. "）
+        block_sep: 块与块之间的分隔符；同一列表内的相邻列表项总是用换行分隔
+    """
+    output: List[str] = []
+    previous = None
+    for kind, level, info, raw in iter_blocks(markdown_text):
+        if kind == 'hr':
+            previous = kind
+            continue
+        if kind == 'code':
+            if not keep_code:
+                continue
+            text = f'```{info}\n{raw}\n```'
+        elif kind == 'table_row':
+            cells = [c.strip() for c in raw.strip('|').split('|')]
+            text = '，'.join(_render_inline(c, keep_code) for c in cells if c)
+        else:
+            text = _render_inline(raw, keep_code).strip()
+            if kind == 'list_item' and keep_list_markers and text:
+                marker = '- ' if info in '-*+' else info + ' '
+                text = ' ' * level + marker + text
+        if not text:
+            continue
+        if output:
+            output.append('\n' if kind == previous and kind in ('list_item', 'table_row') else block_sep)
+        output.append(text)
+        previous = kind
+    return ''.join(output)
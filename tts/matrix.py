@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+渲染矩阵：同一题库一次生成多种语音 / 语速 / 音调的版本
+  每个输入文件只解析一次，每段文本只预处理一次（同一发音词表的变体共用结果），
+  所有 (语音, 语速, 音调) × 段落 的合成任务进入同一个队列，受同一个引擎的并发上限和限速约束。
+  每个变体输出到 <输出目录>/<变体名> 下的独立目录树（目录布局与单一版本相同），
+  各变体的 meta.json 中以 variants 字段并列记录所有变体的语音参数和文件位置：
+    "variants": {"zh-CN-Yunyang_rate+0_pitch+0Hz": {"voice", "rate", "pitch", "dir", "files"}, ...}
+  dir 是该变体的问题目录相对于 <输出目录> 的路径，应用可以据此在不同版本之间切换。
+
+配置（matrix 字段，命令行 --voices / --rates / --pitches 覆盖）：
+  {"voices": ["zh-CN-YunyangNeural", "zh-CN-XiaoxiaoNeural"], "rates": ["+0%", "+20%"], "pitches": []}
+  为空的一项取引擎的 voice / rate / pitch；三项都为空时不启用矩阵。
+"""
+
+import itertools
+import re
+from typing import Any, Dict, List, Optional
+
+from .questions import MarkdownQuestionParser
+
+DEFAULT_MATRIX: Dict[str, List[str]] = {'voices': [], 'rates': [], 'pitches': []}
+
+
+def matrix_enabled(options: Optional[Dict[str, Any]]) -> bool:
+    return any((options or {}).get(key) for key in DEFAULT_MATRIX)
+
+
+def variant_name(voice: str, rate: str, pitch: str) -> str:
+    """变体目录名：zh-CN-YunyangNeural, +20%, +0Hz -> zh-CN-Yunyang_rate+20_pitch+0Hz"""
+    name = f"{voice.replace('Neural', '')}_rate{rate}_pitch{pitch}"
+    return re.sub(r'[^\w+-]', '', name)
+
+
+def expand_variants(options: Optional[Dict[str, Any]], base: Dict[str, Any]) -> List[Dict[str, str]]:
+    """矩阵的所有组合（语音优先，其次语速、音调），重复的组合只保留一个"""
+    options = {**DEFAULT_MATRIX, **(options or {})}
+    voices = options['voices'] or [base['voice']]
+    rates = options['rates'] or [base.get('rate', '+0%')]
+    pitches = options['pitches'] or [base.get('pitch', '+0Hz')]
+    variants: Dict[str, Dict[str, str]] = {}
+    for voice, rate, pitch in itertools.product(voices, rates, pitches):
+        name = variant_name(voice, rate, pitch)
+        variants.setdefault(name, {'name': name, 'voice': voice, 'rate': rate, 'pitch': pitch})
+    return list(variants.values())
+
+
+class MatrixRenderer:
+    # parsers: 每个输入文件一个解析器（_make_parsers 的返回值），变体的输出目录在其 output_dir 之下
+    # engine: 共用的合成引擎；为 None 时只能生成计划（dry-run）
+    # variants: expand_variants 的返回值
+    def __init__(self, parsers: List[MarkdownQuestionParser], engine, variants: List[Dict[str, str]]):
+        self.parsers = parsers
+        self.engine = engine
+        self.variants = variants
+        self.variant_parsers: Dict[int, List[MarkdownQuestionParser]] = {}  # id(原解析器) -> 各变体的解析器
+        self.questions: Dict[int, List[tuple]] = {}  # id(原解析器) -> load_questions 的结果
+        self.origins: Dict[int, MarkdownQuestionParser] = {}  # id(变体解析器) -> 原解析器
+        self.jobs: List[Dict[str, Any]] = []
+        self.empty_jobs = 0
+
+    def _variant_parser(self, parser: MarkdownQuestionParser, variant: Dict[str, str],
+                        memos: Dict[int, Dict[str, str]]) -> MarkdownQuestionParser:
+        engine = self.engine.variant(variant['voice'], variant['rate'], variant['pitch']) if self.engine else None
+        clone = MarkdownQuestionParser(parser.input_file, str(parser.output_dir / variant['name']),
+                                       verbose=False, engine=engine, combined=parser.combined,
+                                       policy=parser.policy, priorities=parser.priorities,
+                                       layout=parser.layout, shard_width=parser.shard_width)
+        # 发音词表相同（同一语言）的变体共用预处理结果
+        clone._tts_texts = memos.setdefault(id(clone.lexicon), {})
+        return clone
+
+    def build(self):
+        """解析所有输入文件（每个文件一次），按 问题 -> 变体 的顺序生成合成任务"""
+        memos: Dict[int, Dict[str, str]] = {}
+        for parser in self.parsers:
+            questions = parser.load_questions()
+            clones = [self._variant_parser(parser, variant, memos) for variant in self.variants]
+            self.questions[id(parser)] = questions
+            self.variant_parsers[id(parser)] = clones
+            self.origins.update((id(clone), parser) for clone in clones)
+            for question in questions:
+                for clone, variant in zip(clones, self.variants):
+                    for job in clone.build_jobs([question]):
+                        if not job['chars']:
+                            self.empty_jobs += 1
+                        job.update(parser=clone, variant=variant['name'], index=len(self.jobs))
+                        self.jobs.append(job)
+        return self
+
+    def variants_record(self, parser: MarkdownQuestionParser, question_data: Dict[str, Any],
+                        question_num: int) -> Dict[str, Dict[str, Any]]:
+        """meta.json 中的 variants 字段：所有变体并列"""
+        record = {}
+        for clone, variant in zip(self.variant_parsers[id(parser)], self.variants):
+            names = clone.question_file_names(question_data, question_num)
+            record[variant['name']] = {
+                'voice': variant['voice'], 'rate': variant['rate'], 'pitch': variant['pitch'],
+                'dir': names['dir'].relative_to(parser.output_dir).as_posix(),
+                'files': {key: names[key] for key in ('audio_simple', 'audio_question', 'audio_analysis', 'meta')}
+            }
+        return record
+
+    @property
+    def output_dirs(self) -> List[str]:
+        return [str(clone.output_dir) for clones in self.variant_parsers.values() for clone in clones]
+
+    def print_report(self):
+        question_count = sum(len(questions) for questions in self.questions.values())
+        chars = sum(job['chars'] for job in self.jobs)
+        texts = sum(len(memo) for memo in {id(c._tts_texts): c._tts_texts
+                                           for clones in self.variant_parsers.values() for c in clones}.values())
+        print(f"\n{'='*50}")
+        print("🎛️  渲染矩阵:")
+        print(f"   输入文件: {len(self.parsers)} 个, 问题: {question_count} 个, 变体: {len(self.variants)} 个")
+        for variant in self.variants:
+            print(f"   - {variant['name']}: {variant['voice']} 语速 {variant['rate']} 音调 {variant['pitch']}")
+        print(f"   合成任务: {len(self.jobs)} 个 (空文本 {self.empty_jobs} 个), 朗读字符: {chars}")
+        print(f"   文本预处理: {texts} 段（各变体共用）")
+        print(f"{'='*50}")
+
+    async def run(self) -> List[tuple]:
+        """所有变体的任务按调度策略排进同一个队列；每个问题的一个变体完成后写入其 meta.json"""
+        import asyncio
+        from .scheduler import run_jobs, schedule
+
+        remaining: Dict[tuple, int] = {}
+        directories: Dict[tuple, Any] = {}  # (id(解析器), 编号) -> 问题目录
+        for job in self.jobs:
+            key = (id(job['parser']), job['num'])
+            if key not in directories:
+                directories[key] = job['parser'].question_file_names(job['data'], job['num'])['dir']
+            remaining[key] = remaining.get(key, 0) + 1
+        # 各变体的问题目录在引擎的 I/O 线程中创建，不阻塞事件循环
+        await asyncio.gather(*(self.engine.offload.io(directory.mkdir, parents=True, exist_ok=True)
+                               for directory in directories.values()))
+
+        async def worker(job: Dict[str, Any]):
+            parser = job['parser']
+            if job['key'] == 'combined':
+                await parser.create_question_audio(job['data'], job['num'])
+            else:
+                await parser.generate_audio(job['text'], job['path'])
+            key = (id(parser), job['num'])
+            remaining[key] -= 1
+            if remaining[key] == 0:
+                extra = {'variants': self.variants_record(self.origins[id(parser)], job['data'], job['num'])}
+                await self.engine.offload.io(parser.write_meta_file, job['data'], job['num'], extra)
+                print(f"✓ Created question directory: {parser.question_file_names(job['data'], job['num'])['dir']}")
+
+        policy = self.parsers[0].policy if self.parsers else 'fifo'
+        priorities = self.parsers[0].priorities if self.parsers else None
+        if policy != 'fifo':
+            print(f"Scheduling {len(self.jobs)} jobs with policy: {policy}")
+        finished = await run_jobs(schedule(self.jobs, policy, priorities), worker, self.engine.max_parallel)
+        done = {(job['variant'], id(job['parser']), job['num']) for job, _ in finished}
+        print(f"\n✓ Successfully rendered {len(done)} question variants ({len(self.variants)} variants)")
+        print(self.engine.loop_lag.summary())
+        if self.engine.host_bucket:
+            print(self.engine.host_bucket.summary())
+        return finished
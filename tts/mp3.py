@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+MP3 帧工具
+edge-tts 默认输出 audio-24khz-48kbitrate-mono-mp3（MPEG-2 Layer III），每帧 576 个采样 = 24 毫秒。
+同格式的帧可以直接拼接和截取，因此静音可以按帧生成、长音频可以在帧边界上切分，不需要解码和重新编码。
+"""
+
+import bisect
+from typing import List, Tuple
+
+SAMPLE_RATE = 24000
+BITRATE = 48000
+SAMPLES_PER_FRAME = 576
+FRAME_SECONDS = SAMPLES_PER_FRAME / SAMPLE_RATE
+FRAME_BYTES = 144  # 72 * BITRATE / SAMPLE_RATE，不含填充位
+
+# MPEG-2 Layer III、无 CRC、48 kbps、24 kHz、单声道
+SILENT_FRAME_HEADER = b'\xff\xf3\x64\xc0'
+# 边信息和主数据全为 0：所有频谱系数为 0，解码结果为静音
+SILENT_FRAME = SILENT_FRAME_HEADER + bytes(FRAME_BYTES - len(SILENT_FRAME_HEADER))
+
+
+def silent_frames(duration_seconds: float) -> bytes:
+    """生成指定时长的静音 MP3 数据（向上取整到整帧）"""
+    if duration_seconds <= 0:
+        return b''
+    count = int(-(-duration_seconds // FRAME_SECONDS))
+    return SILENT_FRAME * count
+
+
+# Layer III 比特率表（kbps），索引为帧头中的 4 位比特率编号
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+# 采样率表，按 MPEG 版本编号（0: 2.5, 2: 2, 3: 1）
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def parse_frame_header(data: bytes, pos: int):
+    """
+    解析 pos 处的 Layer III 帧头
+
+    Returns:
+        (帧字节数, 帧采样数, 采样率)，不是有效帧头时返回 None
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = _BITRATES_V1[bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    bitrate = _BITRATES_V2[bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def _skip_id3(data: bytes) -> int:
+    """跳过文件开头的 ID3v2 标签"""
+    if data[:3] != b'ID3' or len(data) < 10:
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size
+
+
+def frame_index(data: bytes) -> List[Tuple[int, float]]:
+    """
+    扫描整段 MP3 数据，返回每一帧的 (字节偏移, 起始时间秒)
+    遇到无法识别的字节时向后逐字节重新同步
+    """
+    frames = []
+    pos = _skip_id3(data)
+    elapsed = 0.0
+    while pos < len(data):
+        header = parse_frame_header(data, pos)
+        if header is None:
+            pos += 1
+            continue
+        size, samples, sample_rate = header
+        if pos + size > len(data):
+            break  # 末尾不完整的帧
+        frames.append((pos, elapsed))
+        elapsed += samples / sample_rate
+        pos += size
+    return frames
+
+
+def split_at(data: bytes, cut_seconds: List[float]) -> List[bytes]:
+    """
+    在帧边界上把 MP3 数据切成 len(cut_seconds) + 1 段，每个切点取最接近的帧起点
+    同一码流的帧直接截取即可播放，不需要重新编码
+    """
+    frames = frame_index(data)
+    if not frames:
+        return [data] + [b''] * len(cut_seconds)
+
+    starts = [offset for offset, _ in frames]
+    times = [seconds for _, seconds in frames]
+    boundaries = [starts[0]]
+    for cut in cut_seconds:
+        index = bisect.bisect_left(times, cut)
+        if index > 0 and (index == len(times) or cut - times[index - 1] < times[index] - cut):
+            index -= 1
+        boundaries.append(max(starts[index] if index < len(starts) else len(data), boundaries[-1]))
+    boundaries.append(len(data))
+    return [data[boundaries[i]:boundaries[i + 1]] for i in range(len(boundaries) - 1)]
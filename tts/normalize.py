@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+问题库 Markdown 规范化（流式，内存占用与文件大小无关）
+  - 补上缺少的 "## " 前缀：**✅ 精简答案：** / **📘 详细解析：**
+  - 分配确定性的问题 id（uuid5）：
+      已是 UUID 的 id 保持不变；
+      其他 id（例如数字）由 "范围:原 id" 生成，原 id 不变则新 id 不变；
+      没有 id 的问题由 "范围:#第几个问题" 生成，写入文件后就固定下来。
+    重复运行结果不变，问题目录名 q{编号}_{id前缀} 和合成缓存都不会失效。
+  - 先写同目录的临时文件再改名，中途失败不会破坏原文件（输出可以就是输入文件）
+"""
+
+import os
+import re
+import shutil
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+# 所有问题 id 的 uuid5 命名空间（固定值，修改会改变所有生成的 id）
+QUESTION_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'text-to-speech:question-id')
+
+HEADING_FIXES = [
+    (re.compile(r'^(\*\*✅ 精简答案：\*\*)'), 'simple'),
+    (re.compile(r'^(\*\*📘 详细解析：\*\*)'), 'analysis'),
+]
+FRONTMATTER_KEY = re.compile(r'^\s*(id|type|difficulty|tags):')
+ID_LINE = re.compile(r'^(\s*id:\s*)(.*?)(\s*)$')
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+FRONTMATTER_LOOKAHEAD = 5  # 与 split_question_blocks 一致：--- 之后 4 行内出现字段才算 frontmatter
+MAX_FRONTMATTER_LINES = 50  # frontmatter 最多缓冲的行数
+
+
+def question_uuid(scope: str, key: str) -> str:
+    return str(uuid.uuid5(QUESTION_NAMESPACE, f"{scope}:{key}"))
+
+
+class QuestionNormalizer:
+    def __init__(self, scope: str):
+        """
+        Args:
+            scope: 生成 id 的范围（默认是输入文件名），不同题库中相同的数字 id 不会得到相同的 UUID
+        """
+        self.scope = scope
+        self.stats = {'simple': 0, 'analysis': 0, 'converted': 0, 'added': 0, 'kept': 0}
+        self.seen: set = set()
+        self.block_index = 0
+
+    def _assign_id(self, old_id: str) -> str:
+        """按原 id 生成新 id"""
+        if UUID_PATTERN.match(old_id):
+            self.stats['kept'] += 1
+            return old_id
+        key = old_id if old_id else f"#{self.block_index}"
+        if key in self.seen:
+            key = f"{key}#{self.block_index}"  # 重复的原 id 再加上位置，避免生成相同的 UUID
+        self.seen.add(key)
+        self.stats['converted' if old_id else 'added'] += 1
+        new_id = question_uuid(self.scope, key)
+        print(f"替换id: {old_id or '(无)'} -> {new_id}")
+        return new_id
+
+    def frontmatter(self, block: list) -> list:
+        """处理一个 frontmatter 块（首尾都是 ---），替换或插入 id 行"""
+        self.block_index += 1
+        lines = list(block)
+        for i, line in enumerate(lines):
+            match = ID_LINE.match(line)
+            if match:
+                old_id = match.group(2).strip('"\'')
+                lines[i] = f"{match.group(1)}{self._assign_id(old_id)}{match.group(3)}"
+                return lines
+        # 没有 id 字段：插在第一个字段之前
+        ending = '\r\n' if block[0].endswith('\r\n') else '\n'
+        insert_at = next(i for i, line in enumerate(lines) if FRONTMATTER_KEY.match(line))
+        lines.insert(insert_at, f"id: {self._assign_id('')}{ending}")
+        return lines
+
+    def fix_line(self, line: str) -> str:
+        for pattern, key in HEADING_FIXES:
+            if pattern.match(line):
+                self.stats[key] += 1
+                return pattern.sub(r'## \1', line)
+        return line
+
+    def process(self, lines: Iterable[str]) -> Iterator[str]:
+        """逐行处理；只有疑似 frontmatter 的几十行会被缓冲"""
+        source = iter(lines)
+        replay: deque = deque()
+
+        def next_line() -> Optional[str]:
+            return replay.popleft() if replay else next(source, None)
+
+        while True:
+            line = next_line()
+            if line is None:
+                return
+            if line.strip() != '---':
+                yield self.fix_line(line)
+                continue
+
+            block = [line]
+            is_frontmatter = False
+            closed = False
+            while len(block) <= MAX_FRONTMATTER_LINES:
+                following = next_line()
+                if following is None:
+                    break
+                block.append(following)
+                if following.strip() == '---':
+                    closed = True
+                    break
+                if FRONTMATTER_KEY.match(following):
+                    is_frontmatter = True
+                elif not is_frontmatter and len(block) > FRONTMATTER_LOOKAHEAD:
+                    break
+
+            if is_frontmatter and closed:
+                yield from self.frontmatter(block)
+            else:
+                # 不是 frontmatter（例如普通分割线）：原样输出这一行，其余行重新处理
+                yield line
+                replay.extendleft(reversed(block[1:]))
+
+
+def normalize_file(input_file: str, output_file: Optional[str] = None, scope: Optional[str] = None) -> Dict[str, int]:
+    """
+    规范化问题库文件
+
+    Args:
+        input_file: 输入文件
+        output_file: 输出文件，None 时覆盖输入文件
+        scope: 生成 id 的范围，默认使用输入文件名（不含扩展名）
+    Returns:
+        修改统计
+    """
+    input_path = Path(input_file)
+    output_path = Path(output_file) if output_file else input_path
+    normalizer = QuestionNormalizer(scope or input_path.stem)
+
+    print(f"Reading file: {input_path}")
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    try:
+        # newline='' 保留原来的换行符
+        with open(input_path, 'r', encoding='utf-8', newline='') as source, \
+                open(tmp_path, 'w', encoding='utf-8', newline='') as target:
+            for line in normalizer.process(source):
+                target.write(line)
+        shutil.copymode(output_path if output_path.exists() else input_path, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    stats = normalizer.stats
+    print(f"✓ Fixed {stats['simple']} instances of missing ## before **✅ 精简答案：**")
+    print(f"✓ Fixed {stats['analysis']} instances of missing ## before **📘 详细解析：**")
+    print(f"✓ IDs: {stats['converted']} converted, {stats['added']} added, {stats['kept']} kept")
+    print(f"Written to: {output_path}")
+    return stats
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+把阻塞操作移出事件循环
+  Offloader         文件写入放到专用的 I/O 线程（单线程，按提交顺序执行，同一文件的写入不会交错），
+                    音频解码/编码（pydub + ffmpeg）放到单独的音频线程池；
+                    同时排队的任务数有上限，超过时调用方等待（背压），内存不会无限增长
+  BackgroundWriter  日志等追加写入：写入线程 + 有界队列，调用方只把一行放进队列
+  LoopLagMonitor    定期测量事件循环的调度延迟，卡顿（例如同步 I/O）在统计中一目了然
+"""
+
+import asyncio
+import atexit
+import functools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .aimd import percentile
+
+
+class Offloader:
+    def __init__(self, audio_workers: int = 2, max_pending: int = 64):
+        """
+        Args:
+            audio_workers: 音频处理线程数（pydub 的解码/编码由 ffmpeg 子进程完成，线程足够）
+            max_pending: 同时提交（含排队）的任务数上限
+        """
+        self.io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts-io')
+        self.audio_pool = ThreadPoolExecutor(max_workers=audio_workers, thread_name_prefix='tts-audio')
+        self.pending = asyncio.Semaphore(max_pending)
+
+    async def _run(self, pool: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        async with self.pending:
+            return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+    async def io(self, func: Callable, *args, **kwargs) -> Any:
+        """在 I/O 线程中执行 func（mkdir、写 JSON、复制文件等）"""
+        return await self._run(self.io_pool, func, *args, **kwargs)
+
+    async def audio(self, func: Callable, *args, **kwargs) -> Any:
+        """在音频线程池中执行 func（解码、拼接、编码）"""
+        return await self._run(self.audio_pool, func, *args, **kwargs)
+
+
+class BackgroundWriter:
+    """追加写入文件的后台线程；队列满时 write 阻塞，进程退出前写完队列中剩余的内容"""
+
+    def __init__(self, path: Path, max_lines: int = 1000):
+        self.path = Path(path)
+        self.lines: queue.Queue = queue.Queue(maxsize=max_lines)
+        self.thread = threading.Thread(target=self._drain, name='tts-log', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def _drain(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                line = self.lines.get()
+                if line is None:
+                    return
+                f.write(line)
+                if self.lines.empty():
+                    f.flush()
+
+    def write(self, line: str):
+        self.lines.put(line)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.lines.put(None)
+            self.thread.join()
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.1):
+        """
+        事件循环延迟：每 interval 秒醒来一次，实际醒来时间比预期晚多少即为延迟
+
+        Args:
+            stall_threshold: 延迟超过该值（秒）记为一次卡顿
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.samples = deque(maxlen=10000)
+        self.stalls = 0
+        self.max_lag = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def ensure_started(self):
+        """在当前事件循环中启动测量（已在运行时不重复启动）"""
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self._measure())
+
+    async def _measure(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.stall_threshold:
+                self.stalls += 1
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "事件循环延迟: 无数据"
+        return (f"事件循环延迟: p50 {percentile(self.samples, 0.5) * 1000:.1f} ms, "
+                f"p99 {percentile(self.samples, 0.99) * 1000:.1f} ms, 最大 {self.max_lag * 1000:.1f} ms, "
+                f"超过 {self.stall_threshold * 1000:.0f} ms 的卡顿 {self.stalls} 次")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+去重合成计划
+多个问题（可跨文件）中归一化后TTS文本完全相同的音频只合成一次
+"""
+
+import shutil          # 文件复制模块，用于分发去重后的音频
+from pathlib import Path
+from typing import Dict, List
+
+from .questions import MarkdownQuestionParser
+
+# 去重合成计划：多个问题（可跨文件）中TTS文本完全相同的音频只合成一次
+# 文本先经过 prepare_tts_text（即 preprocess_text_for_speech + 字符清理）归一化，
+# 归一化结果相同则音频相同，合成后复制到所有目标路径
+class DedupSynthesisPlanner:
+    # parsers: 每个输入文件对应一个解析器（各自有独立的输出目录）
+    def __init__(self, parsers: List[MarkdownQuestionParser]):
+        self.parsers = parsers
+        self.questions = []  # (解析器, 问题数据, 问题编号)
+        self.groups: Dict[str, List[Path]] = {}  # TTS文本 -> 所有目标音频路径（保持首次出现顺序）
+        self.sources: Dict[str, str] = {}  # TTS文本 -> 首次出现时的原始文本
+        self.total_jobs = 0  # 非空音频任务总数（不去重时的TTS调用次数）
+        self.empty_jobs = 0  # 文本为空、不需要合成的任务数
+    
+    def build(self):
+        """解析所有输入文件并按归一化后的TTS文本分组"""
+        for parser in self.parsers:
+            for question_data, question_num in parser.load_questions():
+                self.questions.append((parser, question_data, question_num))
+                for _, text, output_path in parser.question_audio_jobs(question_data, question_num):
+                    tts_text = parser.prepare_tts_text(text)
+                    if not tts_text:
+                        self.empty_jobs += 1
+                        continue
+                    self.total_jobs += 1
+                    self.groups.setdefault(tts_text, []).append(output_path)
+                    self.sources.setdefault(tts_text, text)
+        return self
+    
+    @property
+    def unique_jobs(self) -> int:
+        return len(self.groups)
+    
+    def print_report(self, top: int = 5):
+        """打印去重报告：节省了多少次TTS调用"""
+        saved_calls = self.total_jobs - self.unique_jobs
+        saved_chars = sum(len(text) * (len(paths) - 1) for text, paths in self.groups.items())
+        ratio = saved_calls / self.total_jobs * 100 if self.total_jobs else 0.0
+        
+        print(f"\n{'='*50}")
+        print("📊 去重合成计划:")
+        print(f"   输入文件: {len(self.parsers)} 个, 问题: {len(self.questions)} 个")
+        print(f"   音频任务: {self.total_jobs} 个 (空文本跳过 {self.empty_jobs} 个)")
+        print(f"   唯一文本: {self.unique_jobs} 个 -> 实际TTS调用 {self.unique_jobs} 次")
+        print(f"   节省调用: {saved_calls} 次 ({ratio:.1f}%), 节省字符: {saved_chars}")
+        
+        duplicated = sorted(
+            ((text, paths) for text, paths in self.groups.items() if len(paths) > 1),
+            key=lambda item: len(item[1]), reverse=True
+        )
+        if duplicated:
+            print(f"\n   重复最多的文本 (前{top}个):")
+            for text, paths in duplicated[:top]:
+                print(f"   - ×{len(paths)} {text[:40]}...")
+        print(f"{'='*50}")
+    
+    async def run(self):
+        """每个唯一文本合成一次，再复制到其余目标路径，最后写入所有meta.json"""
+        import asyncio
+        from .scheduler import run_jobs
+
+        synth_parser = self.parsers[0]
+        engine = synth_parser.engine
+        # 目录创建、复制和 meta.json 写入都在引擎的 I/O 线程中执行，不阻塞事件循环
+        directories = {parser.question_file_names(question_data, question_num)['dir']
+                       for parser, question_data, question_num in self.questions}
+        await asyncio.gather(*(engine.offload.io(directory.mkdir, parents=True, exist_ok=True)
+                               for directory in directories))
+
+        jobs = [{'index': index, 'text': tts_text, 'paths': paths}
+                for index, (tts_text, paths) in enumerate(self.groups.items(), 1)]
+
+        async def worker(job):
+            paths = job['paths']
+            print(f"\n[{job['index']}/{self.unique_jobs}] 合成 1 次, 输出 {len(paths)} 个文件")
+            first_path = paths[0]
+            await synth_parser.generate_audio(self.sources[job['text']], first_path)
+            if not await engine.offload.io(first_path.exists):
+                print(f"✗ 合成失败，跳过复制: {first_path}")
+                return
+            for path in paths[1:]:
+                await engine.offload.io(shutil.copyfile, first_path, path)
+                print(f"✓ Copied audio: {path.name}")
+
+        # 唯一文本按首次出现的顺序进入队列，并发数受引擎的 max_parallel（--concurrency / AIMD）约束
+        await run_jobs(jobs, worker, engine.max_parallel)
+
+        await asyncio.gather(*(engine.offload.io(parser.write_meta_file, question_data, question_num)
+                               for parser, question_data, question_num in self.questions))
+
+        print(f"\n✓ Successfully processed {len(self.questions)} questions")
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+问题库解析与合成
+解析带 YAML frontmatter 的问答 Markdown，生成每个问题的三段音频和 meta.json。
+edge_tts 只在真正合成或列出语音时才导入，纯解析不加载任何重型依赖。
+"""
+
+# 导入必要的模块
+import re              # 正则表达式模块，用于文本处理
+import json            # JSON处理模块，用于读写JSON文件
+from pathlib import Path  # 路径处理模块，用于跨平台文件路径操作
+from typing import Dict, List, Any, Optional  # 类型提示模块
+
+from .markdown_text import markdown_to_text  # 单次扫描的Markdown纯文本提取器
+
+# 定义MarkdownQuestionParser类，用于解析Markdown文件并生成语音
+class MarkdownQuestionParser:
+    # 构造函数，初始化解析器
+    # input_file: 输入的Markdown文件路径
+    # output_dir: 输出目录，默认为"questions"
+    # verbose: 是否打印逐块的解析调试信息
+    # engine: 合成引擎，默认按 tts.json 中 questions 模式的配置创建；多个解析器可以共用同一个引擎
+    # combined: 每个问题只发一次合成请求，再把音频切分成三个文件
+    # policy / priorities: 合成任务的调度策略和优先级规则（见 tts.scheduler）
+    # layout / shard_width: 问题目录布局（flat / sharded，见 tts.layout），默认取引擎配置，没有引擎时为 flat
+    # skip_lines: 要排除的问题块的起始行号（合成前校验发现错误的块，见 tts.validate.invalid_blocks）
+    def __init__(self, input_file: str, output_dir: str = "questions", verbose: bool = True,
+                 engine=None, combined: bool = False, policy: str = 'fifo', priorities: List[tuple] = None,
+                 layout: Optional[str] = None, shard_width: Optional[int] = None,
+                 skip_lines: Optional[set] = None):
+        self.input_file = input_file  # 存储输入文件路径
+        self.output_dir = Path(output_dir)  # 将输出目录转换为Path对象
+        self.verbose = verbose
+        self.combined = combined
+        self.policy = policy
+        self.priorities = priorities
+        self.layout = layout
+        self.shard_width = shard_width
+        self.skip_lines = set(skip_lines or ())
+        self._engine = engine
+        self._lexicon = None
+        self._tts_texts: Dict[str, str] = {}  # 原始文本 -> 朗读文本；同一发音词表的解析器可以共用（见 tts.matrix）
+        self.synthesis_stats: List[Dict[str, Any]] = []  # 每次成功合成的记录（字符数、耗时、音频字节数）
+    
+    # 合成引擎：第一次合成时才创建（引擎依赖 asyncio，纯解析不需要加载）
+    @property
+    def engine(self):
+        if self._engine is None:
+            from .config import load_config, mode_config
+            from .engine import SpeechEngine
+            self._engine = SpeechEngine(mode_config(load_config(), 'questions'))
+        return self._engine
+        
+    # 发音词表：按引擎配置（lexicon 字段和语音）加载，没有引擎时使用内置词表；不会为此创建引擎
+    @property
+    def lexicon(self):
+        if self._lexicon is None:
+            from .lexicon import load_lexicon
+            self._lexicon = load_lexicon(self._engine.config if self._engine is not None else None)
+        return self._lexicon
+        
+    # 清理Markdown文本，移除所有格式标记，返回纯文本
+    # text: 输入的Markdown文本
+    # 返回: 清理后的纯文本
+    def clean_markdown_text(self, text: str) -> str:
+        """移除Markdown格式并返回纯文本"""
+        # 单次扫描移除Markdown格式：标题、强调、链接（保留文字）、图片（完全删除）
+        # 代码块和行内代码原样保留，由 preprocess_text_for_speech 决定是否朗读
+        text = markdown_to_text(text, keep_code=True, keep_list_markers=True, block_sep='\n\n')
+        
+        # 移除表情符号（基本表情符号模式）
+        text = re.sub(r'[\U0001F600-\U0001F64F]', '', text)  # 移除表情符号（笑脸等）
+        text = re.sub(r'[\U0001F300-\U0001F5FF]', '', text)  # 移除符号和象形图
+        text = re.sub(r'[\U0001F680-\U0001F6FF]', '', text)  # 移除交通和地图图标
+        text = re.sub(r'[\U0001F1E0-\U0001F1FF]', '', text)  # 移除国旗图标
+        
+        # 移除特殊的Markdown符号
+        text = re.sub(r'[✅📘]', '', text)  # 移除对勾和书本图标
+        
+        # 清理多余的空白行
+        text = re.sub(r'\n\s*\n', '\n\n', text)  # 合并多个空行为一个空行
+        text = text.strip()  # 移除文本两端的空白字符
+        
+        return text
+    
+    # 解析YAML前置元数据（frontmatter）
+    # content: 包含前置元数据的文本内容
+    # 返回: 包含元数据字典和剩余内容的元组
+    def parse_frontmatter(self, content: str) -> tuple[Dict[str, Any], str]:
+        """解析YAML前置元数据并返回元数据和剩余内容"""
+        # 改进的匹配YAML前置元数据的正则表达式模式
+        # 匹配以---开头（行首），中间是YAML内容，以---结尾（可选地在行尾）
+        frontmatter_pattern = r'^---\s*\n(.*?)\n---\s*(?:\n|$)'
+        # 使用正则表达式查找前置元数据
+        match = re.match(frontmatter_pattern, content, re.DOTALL)
+        
+        if match:
+            # 提取前置元数据的文本内容
+            frontmatter_text = match.group(1)
+            # 提取去除前置元数据后的剩余内容
+            remaining_content = content[match.end():]
+            # 添加调试日志，显示提取的前置元数据内容
+            if self.verbose:
+                print(f"\nExtracted frontmatter text (first 100 chars): {frontmatter_text[:100]}...")
+            
+            # 手动解析类YAML格式的前置元数据
+            metadata = {}  # 创建空字典存储元数据
+            # 逐行解析前置元数据
+            for line in frontmatter_text.split('\n'):
+                line = line.strip()  # 去除每行两端的空白
+                # 检查行是否包含冒号（YAML键值对的分隔符）
+                if ':' in line and not line.startswith('#'):  # 忽略注释行
+                    # 分割键和值，只分割第一个冒号
+                    key, value = line.split(':', 1)
+                    key = key.strip()  # 去除键两端的空白
+                    value = value.strip()  # 去除值两端的空白
+                    
+                    # 处理数组类型的值（以[开头并以]结尾）
+                    if value.startswith('[') and value.endswith(']'):
+                        # 提取数组内容（去除括号）
+                        array_content = value[1:-1]
+                        # 按逗号分割并去除每个元素的空白，创建列表
+                        metadata[key] = [item.strip() for item in array_content.split(',') if item.strip()]
+                    else:
+                        # 去除引号（如果有的话）
+                        if value.startswith('"') and value.endswith('"'):
+                            value = value[1:-1]
+                        elif value.startswith("'") and value.endswith("'"):
+                            value = value[1:-1]
+                        metadata[key] = value
+            
+            if self.verbose:
+                print(f"Parsed metadata keys: {list(metadata.keys())}")
+            return metadata, remaining_content
+        else:
+            if self.verbose:
+                print("No frontmatter pattern matched")
+                print(f"Content starts with: {content[:100]}...")
+        
+        return {}, content
+    
+    # 解析单个问题块
+    # block: 包含单个问题的文本块
+    # 返回: 包含问题元数据、题目、答案和解析的字典，如果解析失败则返回None
+    def parse_question_block(self, block: str) -> Dict[str, Any]:
+        """解析单个问题块"""
+        # 解析问题块中的前置元数据
+        metadata, content = self.parse_frontmatter(block)
+        # 添加调试日志，显示解析出的元数据
+        if self.verbose:
+            print(f"Parsed metadata: {metadata}")
+        
+        # 查找题目部分
+        # 使用正则表达式匹配以"## **题目：**"开头，到"## **✅ 精简答案：**"结束的内容
+        question_match = re.search(r'## \*\*题目：\*\* (.+?)(?=\n## \*\*✅ 精简答案：\*\*)', content, re.DOTALL)
+        # 如果没有找到题目部分，返回None表示解析失败
+        if not question_match:
+            return None
+        
+        # 提取题目文本并去除两端空白
+        question_text = question_match.group(1).strip()
+        
+        # 查找精简答案部分
+        # 使用正则表达式匹配以"## **✅ 精简答案：**"开头，到"**📘 详细解析：**"结束的内容
+        # 考虑到"**📘 详细解析：**"前面可能有换行符也可能没有，使用更灵活的模式
+        simple_answer_match = re.search(r'## \*\*✅ 精简答案：\*\*\s*(.+?)(?=\n?\*\*📘 详细解析：\*\*)', content, re.DOTALL)
+        # 如果没有找到精简答案部分，返回None表示解析失败
+        if not simple_answer_match:
+            return None
+        
+        # 提取精简答案文本并去除两端空白
+        simple_answer = simple_answer_match.group(1).strip()
+        
+        # 查找详细解析部分
+        # 使用正则表达式匹配以"**📘 详细解析：**"开头的内容
+        # 考虑到详细解析可能是文件的最后部分，或者后面跟着---分隔符或其他标题
+        analysis_match = re.search(r'\*\*📘 详细解析：\*\*\s*(.+?)(?=\n\s*---\s*\n|\n\s*##|\s*$)', content, re.DOTALL)
+        # 初始化详细解析为空字符串
+        detailed_analysis = ""
+        # 如果找到详细解析部分，则提取并去除两端空白
+        if analysis_match:
+            detailed_analysis = analysis_match.group(1).strip()
+        
+        # 返回包含所有解析内容的字典
+        # 注意：所有文本内容都通过clean_markdown_text方法清理了Markdown格式
+        return {
+            'metadata': metadata,  # 元数据信息
+            'question': self.clean_markdown_text(question_text),  # 清理后的题目文本
+            'simple_answer': self.clean_markdown_text(simple_answer),  # 清理后的精简答案文本
+            'detailed_analysis': self.clean_markdown_text(detailed_analysis)  # 清理后的详细解析文本
+        }
+    
+    # 预处理文本以提高语音合成的可读性，添加适当的停顿
+    # text: 需要预处理的文本
+    # 返回: 预处理后的文本，适合语音合成
+    def preprocess_text_for_speech(self, text: str) -> str:
+        """预处理文本以提高语音可读性，添加适当的停顿"""
+        # 移除Markdown代码块（```xxx```格式）
+        text = re.sub(r'\`\`\`[^`]*\`\`\`', '', text, flags=re.DOTALL)
+        
+        # 移除行内代码（`code`格式）
+        text = re.sub(r'`([^`]+)`', '', text)
+        
+        # 移除Markdown列表符号（-, *, +）
+        text = re.sub(r'^\s*[-*+]\s+', '', text, flags=re.MULTILINE)
+        
+        # 移除编号列表符号（1. 2. 等）
+        text = re.sub(r'^\s*\d+\.\s+', '', text, flags=re.MULTILINE)
+        
+        # 移除剩余的Markdown符号（# * _ ~ `）
+        text = re.sub(r'[#*_~`]', '', text)
+        
+        # 术语、符号（箭头、括号、运算符、点）和缩写替换为朗读形式，并在连续单词之间、驼峰交界处添加停顿：
+        # 词表编译成一个正则，一遍扫描完成（见 tts.lexicon）
+        text = self.lexicon.apply(text)
+        
+        # Clean up multiple consecutive commas
+        text = re.sub(r'，+', '，', text)
+        
+        # Ensure proper spacing around Chinese punctuation
+        text = re.sub(r'，\s*，', '，', text)
+        text = re.sub(r'，\s*$', '。', text)  # End with period instead of comma
+        
+        return text.strip()
+    
+    # 生成最终发送给TTS的文本（预处理 + 字符清理）
+    # text: 清理过Markdown格式的文本
+    # 返回: 实际用于语音合成的文本，相同返回值意味着相同的音频
+    def prepare_tts_text(self, text: str) -> str:
+        """返回实际发送给TTS服务的文本"""
+        # 同一段文本（调度时估算字数、合成时各调用一次）只预处理一次
+        cached = self._tts_texts.get(text)
+        if cached is not None:
+            return cached
+        
+        # 预处理文本以提高语音可读性
+        processed_text = self.preprocess_text_for_speech(text)
+        
+        # 为TTS做额外的文本清理
+        # 保留中文、英文、数字、空格和基本中文标点符号
+        clean_text = re.sub(r'[^\w\s\u4e00-\u9fff，。！？；：]', ' ', processed_text)
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()  # 规范化空白字符
+        self._tts_texts[text] = clean_text
+        return clean_text
+    
+    # 异步方法：通过共享的合成引擎生成音频文件
+    # text: 要转换为语音的文本内容
+    # output_path: 生成的音频文件保存路径
+    async def generate_audio(self, text: str, output_path: Path):
+        """使用合成引擎从文本生成音频文件"""
+        try:
+            clean_text = self.prepare_tts_text(text)
+            
+            # 如果文本为空，则跳过处理
+            if not clean_text:
+                print(f"Skipping empty text for {output_path}")
+                return
+            
+            # 语音查找、并发上限和缓存都由引擎负责
+            record = await self.engine.synthesize(clean_text, output_path)
+            print(f"✓ Generated audio: {output_path.name}")
+            
+            # 记录本次请求的吞吐数据，供 --plan 估算使用
+            self.synthesis_stats.append(record)
+        except Exception as e:
+            print(f"✗ Error generating audio for {output_path}: {e}")
+    
+    # 异步方法：一个问题的所有音频只发一次合成请求，再在段落之间切分
+    # jobs: question_audio_jobs 返回的任务列表
+    # 返回: 是否成功；失败时由调用方退回逐段合成
+    async def generate_combined_audio(self, jobs: List[tuple]) -> bool:
+        """合并合成一个问题的所有音频"""
+        # 按朗读顺序拼接：问题、精简答案、详细解析；空文本跳过
+        order = {'audio_question': 0, 'audio_simple': 1, 'audio_analysis': 2}
+        texts, paths = [], []
+        for key, text, output_path in sorted(jobs, key=lambda job: order.get(job[0], len(order))):
+            clean_text = self.prepare_tts_text(text)
+            if not clean_text:
+                print(f"Skipping empty text for {output_path}")
+                continue
+            texts.append(clean_text)
+            paths.append(output_path)
+        if not texts:
+            return True
+        
+        try:
+            record = await self.engine.synthesize_sections(texts, paths)
+            for output_path in paths:
+                print(f"✓ Generated audio: {output_path.name}")
+            self.synthesis_stats.append(record)
+            return True
+        except Exception as e:
+            print(f"⚠️  合并合成失败，改为逐段合成: {e}")
+            return False
+    
+    # 计算单个问题的目录名和文件名
+    # question_data: 包含问题信息的字典
+    # question_num: 问题编号
+    # 返回: 包含目录路径以及各音频/元数据文件名的字典
+    def question_file_names(self, question_data: Dict[str, Any], question_num: int) -> Dict[str, Any]:
+        """返回问题目录及其文件命名"""
+        # 获取问题ID，如果没有ID则使用问题编号
+        question_id = question_data['metadata'].get('id', f'q{question_num:04d}')
+        # 截取ID的前8位字符，避免文件名过长
+        id_prefix = str(question_id)[:8] if question_id else f'q{question_num:04d}'
+        # 使用新的命名格式 q{编号}_{ID前缀}
+        base_name = f"q{question_num:04d}_{id_prefix}"
+        
+        return {
+            'dir': self.question_dir(base_name),  # 问题目录（sharded 布局时在分片子目录中）
+            'audio_simple': f'{base_name}_audio_simple.mp3',  # 简单答案音频文件
+            'audio_question': f'{base_name}_audio_question.mp3',  # 问题音频文件
+            'audio_analysis': f'{base_name}_audio_analysis.mp3',  # 详细解析音频文件
+            'meta': f'{base_name}_meta.json'  # 元数据文件本身的文件名
+        }
+    
+    # 问题目录的路径：flat 布局直接在输出目录下，sharded 布局在按 id 前缀划分的分片子目录中
+    def question_dir(self, base_name: str) -> Path:
+        from .layout import DEFAULT_SHARD_WIDTH, question_path
+        config = self._engine.config if self._engine is not None else {}
+        layout = self.layout or config.get('layout') or 'flat'
+        width = self.shard_width or config.get('shard_width') or DEFAULT_SHARD_WIDTH
+        return question_path(self.output_dir, base_name, layout, width)
+
+    # 列出单个问题需要合成的音频：(文件名键, 文本, 输出路径)
+    def question_audio_jobs(self, question_data: Dict[str, Any], question_num: int) -> List[tuple]:
+        """返回问题的三段音频任务"""
+        names = self.question_file_names(question_data, question_num)
+        return [
+            ('audio_simple', question_data['simple_answer'], names['dir'] / names['audio_simple']),
+            ('audio_question', question_data['question'], names['dir'] / names['audio_question']),
+            ('audio_analysis', question_data['detailed_analysis'], names['dir'] / names['audio_analysis']),
+        ]
+    
+    # 写入问题的meta.json文件
+    # extra: 追加到 meta.json 的字段（例如渲染矩阵的 variants）
+    def write_meta_file(self, question_data: Dict[str, Any], question_num: int, extra: Optional[Dict[str, Any]] = None):
+        """创建meta.json文件，包含问题的所有元数据和内容字符串"""
+        names = self.question_file_names(question_data, question_num)
+        meta_data = {
+            'id': question_data['metadata'].get('id', None),  # 问题ID，优先使用原始文件中的UUID，不使用question_num作为默认值
+            'type': question_data['metadata'].get('type', 'unknown'),  # 问题类型，默认为unknown
+            'difficulty': question_data['metadata'].get('difficulty', 'medium'),  # 难度级别，默认为medium
+            'tags': question_data['metadata'].get('tags', []),  # 标签列表，默认为空列表
+            'question_length': len(question_data['question']),  # 问题文本长度
+            'simple_answer_length': len(question_data['simple_answer']),  # 简单答案文本长度
+            'detailed_analysis_length': len(question_data['detailed_analysis']),  # 详细解析文本长度
+            'created_at': None,  # 创建时间，可以添加时间戳
+            # 直接添加内容字符串，以文件名作为key
+            'question_markdown': question_data['question'],  # 问题文本内容
+            'answer_simple_markdown': question_data['simple_answer'],  # 简单答案文本内容
+            'answer_analysis_markdown': question_data['detailed_analysis'],  # 详细解析文本内容
+            'files': {key: names[key] for key in ('audio_simple', 'audio_question', 'audio_analysis', 'meta')}
+        }
+        meta_data.update(extra or {})
+        
+        # 写入meta.json文件，使用UTF-8编码，保留中文字符不进行ASCII转义，缩进2个空格
+        with open(names['dir'] / names['meta'], 'w', encoding='utf-8') as f:
+            json.dump(meta_data, f, ensure_ascii=False, indent=2)
+    
+    # 异步方法：生成单个问题的所有音频（合并模式失败时退回逐段合成）
+    async def create_question_audio(self, question_data: Dict[str, Any], question_num: int):
+        """生成问题的三段音频"""
+        jobs = self.question_audio_jobs(question_data, question_num)
+        if not self.combined or not await self.generate_combined_audio(jobs):
+            for _, text, output_path in jobs:
+                await self.generate_audio(text, output_path)
+    
+    # 异步方法：为单个问题创建目录结构和相关文件
+    # question_data: 包含问题信息的字典
+    # question_num: 问题编号
+    async def create_question_directory(self, question_data: Dict[str, Any], question_num: int):
+        """为单个问题创建目录结构和相关文件"""
+        question_dir = self.question_file_names(question_data, question_num)['dir']
+        # 创建目录，如果父目录不存在则自动创建，如果目录已存在则不报错（文件操作在引擎的 I/O 线程中执行，不阻塞事件循环）
+        await self.engine.offload.io(question_dir.mkdir, parents=True, exist_ok=True)
+        
+        # 生成音频文件（简单答案、问题、详细解析）
+        await self.create_question_audio(question_data, question_num)
+        
+        await self.engine.offload.io(self.write_meta_file, question_data, question_num)
+        
+        # 打印创建成功的信息
+        print(f"✓ Created question directory: {question_dir}")
+    
+    # 将Markdown内容分割成问题块 - 每个问题块都以YAML前置元数据开头
+    # content: 整个Markdown文件的内容
+    # 返回: 问题块文本列表
+    def split_question_blocks(self, content: str) -> List[str]:
+        """按frontmatter位置把文件内容分割成问题块"""
+        return [block for _, block in self.locate_question_blocks(content)]
+    
+    # 问题编号：问题块在文件中的位置（从1开始）。解析失败或被校验跳过的块也占用自己的编号，
+    # 后面的问题不会因此重新编号；load_questions、监视模式和批量模式都按这个编号命名问题目录
+    def numbered_question_blocks(self, content: str) -> List[tuple]:
+        """返回 (问题编号, 起始行号, 问题块) 列表"""
+        return [(num, line, block) for num, (line, block) in enumerate(self.locate_question_blocks(content), 1)]
+    
+    # 与 split_question_blocks 相同，但同时返回每个问题块在文件中的起始行号（从1开始），供校验报告使用
+    # require_title: 为 False 时也返回不含"题目"的块（校验时用来报告缺少题目的问题块）
+    def locate_question_blocks(self, content: str, require_title: bool = True) -> List[tuple]:
+        """返回 (起始行号, 问题块) 列表"""
+        # 寻找所有frontmatter块的位置（以---开始的行）
+        frontmatter_starts = []
+        lines = content.split('\n')
+        
+        for i, line in enumerate(lines):
+            if line.strip() == '---':
+                # 检查这是否是frontmatter的开始
+                # 对于第一行或者在接下来的几行中包含id:/type:等字段的情况
+                if i == 0:
+                    frontmatter_starts.append(i)
+                else:
+                    # 检查后面的几行是否包含 YAML 字段
+                    found_yaml_field = False
+                    for check_line in range(i + 1, min(i + 5, len(lines))):
+                        if any(keyword in lines[check_line] for keyword in ['id:', 'type:', 'difficulty:', 'tags:']):
+                            found_yaml_field = True
+                            break
+                    if found_yaml_field:
+                        frontmatter_starts.append(i)
+        
+        question_blocks = []  # 用于存储处理后的问题块
+        
+        if self.verbose:
+            print(f"Found {len(frontmatter_starts)} frontmatter start positions: {frontmatter_starts[:5]}")
+        
+        # 根据frontmatter位置分割内容
+        for i, start_line in enumerate(frontmatter_starts):
+            # 确定当前块的结束位置
+            if i + 1 < len(frontmatter_starts):
+                end_line = frontmatter_starts[i + 1]
+            else:
+                end_line = len(lines)
+            
+            # 提取当前问题块的所有行
+            block_lines = lines[start_line:end_line]
+            block_content = '\n'.join(block_lines).strip()
+            
+            if block_content and ('题目' in block_content or not require_title):
+                question_blocks.append((start_line + 1, block_content))
+                if self.verbose:
+                    print(f"Added question block {len(question_blocks)} (first 50 chars): {block_content[:50]}...")
+        
+        if self.verbose:
+            print(f"Total question blocks found: {len(question_blocks)}")
+        
+        # 过滤掉空块和不包含'题目'的块（可能不是有效的问题块）
+        question_blocks = [(line, block) for line, block in question_blocks
+                           if block.strip() and ('题目' in block or not require_title)]
+        if self.verbose:
+            print(f"Filtered question blocks count: {len(question_blocks)}")
+        
+        return question_blocks
+    
+    # 读取输入文件并解析出所有有效问题
+    # 返回: (问题数据, 问题编号) 列表，编号见 numbered_question_blocks
+    def load_questions(self) -> List[tuple]:
+        """读取markdown文件并返回解析成功的问题"""
+        print(f"Reading markdown file: {self.input_file}")
+        
+        # 读取输入的markdown文件
+        with open(self.input_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        question_blocks = self.numbered_question_blocks(content)
+        # 打印找到的问题块数量
+        print(f"Found {len(question_blocks)} question blocks")
+        
+        questions = []
+        for question_num, line, block in question_blocks:
+            if line in self.skip_lines:
+                print(f"⚠️  跳过第 {line} 行的问题块 {question_num}（校验未通过）")
+                continue
+            try:
+                # 解析问题块
+                question_data = self.parse_question_block(block)
+                if question_data:
+                    questions.append((question_data, question_num))
+                else:
+                    print(f"Skipping invalid block {question_num}")
+            except Exception as e:
+                # 捕获并打印处理过程中的错误
+                print(f"✗ Error processing block {question_num}: {e}")
+        return questions
+    
+    # 把问题拆成合成任务：逐段模式每段一个任务，合并模式每个问题一个任务
+    # questions: load_questions 的返回值
+    # 返回: 任务字典列表（num/data/key/text/path/chars/index），chars 是实际朗读的字符数，供调度使用
+    def build_jobs(self, questions: List[tuple]) -> List[Dict[str, Any]]:
+        """返回所有问题的合成任务（文件顺序）"""
+        jobs = []
+        for question_data, question_num in questions:
+            audio_jobs = self.question_audio_jobs(question_data, question_num)
+            if self.combined:
+                chars = sum(len(self.prepare_tts_text(text)) for _, text, _ in audio_jobs)
+                jobs.append({'num': question_num, 'data': question_data, 'key': 'combined',
+                             'text': None, 'path': None, 'chars': chars, 'index': len(jobs)})
+                continue
+            for key, text, output_path in audio_jobs:
+                jobs.append({'num': question_num, 'data': question_data, 'key': key, 'text': text,
+                             'path': output_path, 'chars': len(self.prepare_tts_text(text)), 'index': len(jobs)})
+        return jobs
+    
+    # 异步方法：按调度策略执行合成任务，每个问题的任务全部完成后写入meta.json
+    # 返回: [(任务, 完成时间秒)]，按完成顺序排列
+    async def synthesize_jobs(self, jobs: List[Dict[str, Any]]) -> List[tuple]:
+        """按 self.policy 调度并执行合成任务"""
+        import asyncio
+        from .scheduler import run_jobs, schedule
+        
+        remaining: Dict[int, int] = {}
+        directories: Dict[int, Path] = {}
+        for job in jobs:
+            directories.setdefault(job['num'], self.question_file_names(job['data'], job['num'])['dir'])
+            remaining[job['num']] = remaining.get(job['num'], 0) + 1
+        # 问题目录在引擎的 I/O 线程中创建，不阻塞事件循环
+        await asyncio.gather(*(self.engine.offload.io(directory.mkdir, parents=True, exist_ok=True)
+                               for directory in directories.values()))
+        
+        async def worker(job: Dict[str, Any]):
+            if job['key'] == 'combined':
+                await self.create_question_audio(job['data'], job['num'])
+            else:
+                await self.generate_audio(job['text'], job['path'])
+            remaining[job['num']] -= 1
+            if remaining[job['num']] == 0:
+                await self.engine.offload.io(self.write_meta_file, job['data'], job['num'])
+                print(f"✓ Created question directory: {self.question_file_names(job['data'], job['num'])['dir']}")
+        
+        ordered = schedule(jobs, self.policy, self.priorities)
+        return await run_jobs(ordered, worker, self.engine.max_parallel)
+    
+    # 异步方法：主要处理方法，用于解析markdown文件并生成问题目录
+    async def parse_and_generate(self):
+        """解析markdown文件并生成问题目录的主要方法"""
+        questions = self.load_questions()
+        
+        # 创建输出目录（如果不存在）
+        self.output_dir.mkdir(exist_ok=True)
+        
+        # 所有音频任务按调度策略排队，引擎允许并发时同时执行多个，实际请求数由引擎控制
+        jobs = self.build_jobs(questions)
+        if self.policy != 'fifo':
+            print(f"Scheduling {len(jobs)} jobs with policy: {self.policy}")
+        finished = await self.synthesize_jobs(jobs)
+        question_count = len({job['num'] for job, _ in finished})  # 成功处理的问题数量
+        
+        # 打印处理结果统计信息
+        print(f"\n✓ Successfully processed {question_count} questions")
+        print(f"Output directory: {self.output_dir.absolute()}")
+        print(self.engine.loop_lag.summary())
+        if self.engine.host_bucket:
+            print(self.engine.host_bucket.summary())
+    
+    # 异步方法：列出所有可用的中文语音选项
+    async def list_available_voices(self):
+        """列出所有可用的中文语音"""
+        try:
+            # 获取所有可用语音（edge 后端在这里才导入 edge_tts）
+            all_voices = await self.engine.backend.list_voices()
+            
+            # 过滤出中文语音（语言区域以zh开头）
+            chinese_voices = [v for v in all_voices if v["Locale"].startswith("zh")]
+            
+            # 打印可用的中文语音列表
+            print("\n=== Available Chinese Voices ===")
+            for voice in chinese_voices:
+                print(f"Name: {voice['Name']}")  # 语音名称（用于API调用）
+                print(f"  Locale: {voice['Locale']}")  # 语言区域
+                print(f"  Gender: {voice['Gender']}")  # 性别
+                print(f"  Display Name: {voice['FriendlyName']}")  # 显示名称（友好名称）
+                print()
+            
+            print(f"Total Chinese voices found: {len(chinese_voices)}")
+            return chinese_voices  # 返回找到的中文语音列表
+        except Exception as e:
+            print(f"✗ Error listing voices: {e}")  # 打印错误信息
+            return []  # 发生错误时返回空列表
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+合成任务调度
+  fifo      按文件顺序
+  lpt       最长任务优先（按朗读字符数降序），让长的详细解析尽早开始，缩短整体完成时间
+  priority  按 --priority 指定的字段排序：段落类型（section）、难度（difficulty）、标签（tag:名称,...）；
+            同一优先级内按最长任务优先
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+POLICIES = ('fifo', 'lpt', 'priority')
+
+# 各字段的默认优先顺序（越靠前越先合成）
+DEFAULT_PRIORITY_ORDERS = {
+    'section': ['audio_question', 'audio_simple', 'audio_analysis'],
+    'difficulty': ['easy', 'medium', 'hard']
+}
+# --priority section:question,simple 中可以省略 audio_ 前缀
+SECTION_ALIASES = {'question': 'audio_question', 'simple': 'audio_simple', 'analysis': 'audio_analysis'}
+
+
+def parse_priorities(specs: List[str]) -> List[Tuple[str, List[str]]]:
+    """
+    解析优先级规则，例如 ["section", "difficulty:hard,medium", "tag:响应式,组件"]
+
+    Returns:
+        [(字段, 优先值列表)]，靠前的规则先比较
+    """
+    rules = []
+    for spec in specs or []:
+        field, _, values = spec.partition(':')
+        field = field.strip()
+        if field not in ('section', 'difficulty', 'tag'):
+            raise ValueError(f"未知的优先级字段: {field}（可用 section / difficulty / tag）")
+        order = [value.strip() for value in values.split(',') if value.strip()] if values \
+            else DEFAULT_PRIORITY_ORDERS.get(field, [])
+        if not order:
+            raise ValueError("tag 优先级需要指定标签，例如 tag:响应式,组件")
+        if field == 'section':
+            order = [SECTION_ALIASES.get(value, value) for value in order]
+        rules.append((field, order))
+    return rules
+
+
+def _rank(job: Dict[str, Any], field: str, order: List[str]) -> int:
+    """任务在某条规则下的名次，不在列表中的排在最后"""
+    metadata = job['data']['metadata']
+    if field == 'section':
+        values = [job['key']]
+    elif field == 'difficulty':
+        values = [metadata.get('difficulty', 'medium')]
+    else:
+        values = metadata.get('tags', [])
+    ranks = [order.index(value) for value in values if value in order]
+    return min(ranks) if ranks else len(order)
+
+
+def schedule(jobs: List[Dict[str, Any]], policy: str = 'fifo',
+             priorities: List[Tuple[str, List[str]]] = None) -> List[Dict[str, Any]]:
+    """按策略返回任务的执行顺序（不修改原列表）"""
+    if policy == 'fifo':
+        return list(jobs)
+    if policy == 'lpt':
+        return sorted(jobs, key=lambda job: (-job['chars'], job['index']))
+    if policy == 'priority':
+        rules = priorities or parse_priorities(['section'])
+        return sorted(jobs, key=lambda job: (tuple(_rank(job, field, order) for field, order in rules),
+                                             -job['chars'], job['index']))
+    raise ValueError(f"未知的调度策略: {policy}（可用 {' / '.join(POLICIES)}）")
+
+
+async def run_jobs(jobs: List[Dict[str, Any]], worker: Callable[[Dict[str, Any]], Awaitable[Any]],
+                   parallel: int) -> List[Tuple[Dict[str, Any], float]]:
+    """
+    按给定顺序执行任务，同时最多 parallel 个；先排在前面的任务先拿到执行名额
+
+    Returns:
+        [(任务, 从开始到完成的秒数)]，按完成顺序排列
+    """
+    import asyncio  # 调度规则的解析不需要事件循环，只在执行时导入
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    finished = []
+    started = time.perf_counter()
+
+    async def consume():
+        while not queue.empty():
+            job = queue.get_nowait()
+            await worker(job)
+            finished.append((job, time.perf_counter() - started))
+
+    await asyncio.gather(*(consume() for _ in range(max(1, min(parallel, len(jobs))))))
+    return finished
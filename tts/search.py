@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+问题目录的倒排索引
+  应用按标签、难度筛选问题时不必再逐个读取 meta.json：合成完成后在输出目录写一个 catalog_index.json，
+  其中是按标签 / 难度 / 类型划分的问题 id 列表（已排序），以及问题文本的全文索引
+  （英文和数字按单词，中文按相邻两字切分，不需要分词词典）。
+  查询时取各条件对应的列表求交集，只访问命中的列表，不扫描题库。
+
+索引格式：
+  {"version": 1,
+   "postings": {"tag": {标签: [问题 id...]}, "difficulty": {...}, "type": {...}, "text": {词: [问题 id...]}},
+   "docs": {问题 id: {"dir", "num", "title", "type", "difficulty", "tags", "terms", "mtime", "size"}}}
+  docs 中保存每个问题 meta.json 的修改时间和大小：再次更新时只重新读取有变化的 meta.json，
+  并按保存的 terms 从倒排列表中移除旧的词条；已删除的问题目录会从索引中移除。
+"""
+
+import json
+import os
+import re
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .layout import iter_question_dirs, question_number
+
+INDEX_FILE_NAME = "catalog_index.json"
+INDEX_VERSION = 1
+FIELDS = ('tag', 'difficulty', 'type')
+DEFAULT_INDEX: Dict[str, Any] = {'enabled': False}
+TOKEN_PATTERN = re.compile('[a-z0-9_]+|[\\u3400-\\u4dbf\\u4e00-\\u9fff]+')
+CJK_PATTERN = re.compile('[\\u3400-\\u4dbf\\u4e00-\\u9fff]')
+
+
+def tokenize(text: str) -> List[str]:
+    """全文索引的词条（去重、保持出现顺序）：英文单词小写，中文连续片段切成相邻两字，单个汉字的片段保留单字"""
+    terms: Dict[str, None] = {}
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if CJK_PATTERN.match(run) and len(run) > 1:
+            for i in range(len(run) - 1):
+                terms[run[i:i + 2]] = None
+        else:
+            terms[run] = None
+    return list(terms)
+
+
+def intersect(lists: List[List[str]]) -> List[str]:
+    """多个已排序列表的交集：从最短的列表出发，在其余列表中二分查找"""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        if not result:
+            break
+        kept = []
+        start = 0
+        for item in result:
+            start = bisect_left(other, item, start)
+            if start == len(other):
+                break
+            if other[start] == item:
+                kept.append(item)
+        result = kept
+    return list(result)
+
+
+def union(lists: Iterable[List[str]]) -> List[str]:
+    return sorted(set().union(*lists))
+
+
+class CatalogIndex:
+    def __init__(self, output_dir: str):
+        """输出目录的索引；索引文件不存在或版本不同时从空索引开始"""
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / INDEX_FILE_NAME
+        self.postings: Dict[str, Dict[str, List[str]]] = {field: {} for field in FIELDS + ('text',)}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.postings.update(data['postings'])
+                self.docs = data['docs']
+
+    def _terms(self, doc: Dict[str, Any]) -> Dict[str, List[str]]:
+        return {'tag': doc['tags'], 'difficulty': [doc['difficulty']], 'type': [doc['type']], 'text': doc['terms']}
+
+    def _add(self, question_id: str, doc: Dict[str, Any]):
+        for field, terms in self._terms(doc).items():
+            for term in terms:
+                insort(self.postings[field].setdefault(term, []), question_id)
+        self.docs[question_id] = doc
+
+    def _remove(self, question_id: str):
+        doc = self.docs.pop(question_id)
+        for field, terms in self._terms(doc).items():
+            for term in terms:
+                posting = self.postings[field].get(term, [])
+                position = bisect_left(posting, question_id)
+                if position < len(posting) and posting[position] == question_id:
+                    del posting[position]
+                if not posting:
+                    self.postings[field].pop(term, None)
+
+    def update(self) -> Dict[str, int]:
+        """按输出目录中的 meta.json 更新索引（只读取有变化的），返回新增 / 更新 / 删除 / 未变化的数量"""
+        from .markdown_text import markdown_to_text
+
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        seen = set()
+        by_dir = {doc['dir']: question_id for question_id, doc in self.docs.items()}
+        for question_dir in iter_question_dirs(self.output_dir):
+            metas = list(question_dir.glob('*_meta.json'))
+            if len(metas) != 1:
+                continue
+            relative = question_dir.relative_to(self.output_dir).as_posix()
+            stat = metas[0].stat()
+            known = by_dir.get(relative)
+            if known is not None and self.docs[known]['mtime'] == stat.st_mtime_ns \
+                    and self.docs[known]['size'] == stat.st_size:
+                seen.add(known)
+                stats['unchanged'] += 1
+                continue
+
+            with open(metas[0], 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            question_id = str(meta.get('id') or question_dir.name)
+            title = markdown_to_text(meta.get('question_markdown', ''), block_sep=' ').strip()
+            doc = {'dir': relative, 'num': question_number(question_dir), 'title': title[:80],
+                   'type': str(meta.get('type', 'unknown')), 'difficulty': str(meta.get('difficulty', 'medium')),
+                   'tags': sorted({str(tag).lower() for tag in meta.get('tags') or []}),
+                   'terms': tokenize(title), 'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+            if question_id in self.docs:
+                self._remove(question_id)
+                stats['updated'] += 1
+            else:
+                stats['added'] += 1
+            self._add(question_id, doc)
+            seen.add(question_id)
+
+        for question_id in [qid for qid in self.docs if qid not in seen]:
+            self._remove(question_id)
+            stats['removed'] += 1
+        return stats
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'postings': self.postings, 'docs': self.docs},
+                      f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def _text_postings(self, term: str) -> List[str]:
+        """单个汉字的查询词：包含该字的所有两字词条的并集"""
+        text = self.postings['text']
+        if CJK_PATTERN.match(term) and len(term) == 1:
+            return union(posting for key, posting in text.items() if term in key)
+        return text.get(term, [])
+
+    def query(self, tags: Optional[List[str]] = None, difficulty: Optional[List[str]] = None,
+              types: Optional[List[str]] = None, text: Optional[str] = None) -> List[str]:
+        """
+        按条件查询问题 id（已排序）
+        多个标签之间为“且”；多个难度 / 类型之间为“或”；text 中的所有词条都要出现在问题文本中。
+        没有任何条件时返回所有问题
+        """
+        lists = [self.postings['tag'].get(tag.lower(), []) for tag in tags or []]
+        if difficulty:
+            lists.append(union(self.postings['difficulty'].get(value, []) for value in difficulty))
+        if types:
+            lists.append(union(self.postings['type'].get(value, []) for value in types))
+        if text:
+            terms = tokenize(text)
+            if not terms:
+                return []
+            lists.extend(self._text_postings(term) for term in terms)
+        if not lists:
+            return sorted(self.docs)
+        return intersect(lists)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+
+def update_index(paths: List[str]) -> List[CatalogIndex]:
+    """更新（没有时创建）各输出目录的索引"""
+    indexes = []
+    for path in paths:
+        if not Path(path).is_dir():
+            continue
+        index = CatalogIndex(path)
+        stats = index.update()
+        index.save()
+        indexes.append(index)
+        print(f"🔎 {index.path}: {len(index)} 个问题，{len(index.postings['tag'])} 个标签，"
+              f"{len(index.postings['text'])} 个词条（新增 {stats['added']}，更新 {stats['updated']}，"
+              f"删除 {stats['removed']}，未变化 {stats['unchanged']}）")
+    return indexes
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+长文档模式
+  sections   按分割线（--- / *** / ___）拆分，每章一个音频
+  headings   按标题拆分，每节一个音频（过短的小节并入上级或相邻的同级小节，章节内的标题位置写入 outline.json）
+  whole-doc  整篇文档合成一个音频
+三种模式共用 SpeechEngine，第 2 章起在文件开头加入 section_break_ms 的静音。
+按章节拆分的两种模式按引擎的并发上限同时合成多个章节，失败的章节单独重试。
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .engine import SpeechEngine
+from .markdown_text import markdown_to_text
+
+# 匹配三种 Markdown 分割线：---, ***, ___
+SEPARATOR_PATTERN = re.compile(r"^\s*(\*{3,}|\-{3,}|\_{3,})\s*$")
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$')
+# 按标题拆分时合并过短的小节、切分过长的小节（见 coalesce_outline）
+DEFAULT_OUTLINE: Dict[str, int] = {'min_chars': 200, 'max_chars': 5000}
+OUTLINE_FILE_NAME = "outline.json"
+
+
+# ======================
+# Markdown -> 纯文本
+# ======================
+def clean_section_text(content: str) -> str:
+    # 单次扫描直接提取纯文本（去掉代码块，不经过 HTML），块级元素之间保留换行，减少一口气读完的问题
+    text = markdown_to_text(content)
+
+    # 规范空白：将连续空白压缩，同时保留换行的分段感
+    text = re.sub(r"\n\s*\n+", "\n", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return text.strip()
+
+
+def clean_document_text(content: str) -> str:
+    # 整篇朗读：移除代码块和所有标记，压缩为一段
+    text = markdown_to_text(content, block_sep=' ')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+# ======================
+# 工具：安全生成文件名
+# ======================
+def sanitize_filename(name: str) -> str:
+    name = re.sub(r"[\\/:*?\"<>|\x00-\x1F]", "_", name)
+    return name[:120].strip() or "section"
+
+
+# ======================
+# 拆分
+# ======================
+def split_by_separators(content: str) -> List[Tuple[str, str]]:
+    """按分割线拆分，返回 [(标题, 内容)]，标题取内容前10个字符"""
+    sections = []
+    current_section = []
+
+    for line in content.splitlines():
+        if SEPARATOR_PATTERN.match(line):
+            # 遇到分割线，保存当前段落，开始新段落；连续分割线忽略
+            if current_section:
+                sections.append("\n".join(current_section))
+                current_section = []
+        else:
+            current_section.append(line)
+
+    # 别忘了最后一个段落
+    if current_section:
+        sections.append("\n".join(current_section))
+
+    # 清理空段落
+    sections = [s.strip() for s in sections if s.strip()]
+
+    titled = []
+    for idx, body in enumerate(sections, start=1):
+        preview = re.sub(r"\s+", " ", body)[:10]  # 压缩空白后取前10个字符
+        titled.append((f"第{idx:02d}章_{preview}", body))
+    return titled
+
+
+def build_outline(content: str, levels: Tuple[int, int] = (1, 6),
+                  default_title: str = "正文") -> List[Dict[str, Any]]:
+    """
+    按标题建立大纲，返回文档顺序的节点 [{'title', 'level', 'body', 'parent'}]
+    parent 是上级节点在列表中的序号（-1 表示没有上级），第一个标题之前的内容 level 为 0；
+    正文为空的标题也保留，作为章节标记
+
+    Args:
+        levels: 参与拆分的标题级别范围 (最小, 最大)，其余级别的标题留在正文里
+        default_title: 第一个标题之前的内容使用的标题
+    """
+    nodes = []
+    stack: List[int] = []  # 当前路径上各级标题的节点序号
+    current = {'title': default_title, 'level': 0, 'parent': -1}
+    current_content = []
+
+    def close():
+        current['body'] = '\n'.join(current_content).strip()
+        if current['level'] or current['body']:
+            nodes.append(current)
+
+    fence = False
+    for line in content.splitlines():
+        if line.lstrip().startswith(('```', '~~~')):
+            fence = not fence
+        heading = None if fence else HEADING_PATTERN.match(line.strip())  # 代码块中的 # 注释不是标题
+        if heading and levels[0] <= len(heading.group(1)) <= levels[1]:
+            close()
+            level = len(heading.group(1))
+            while stack and nodes[stack[-1]]['level'] >= level:
+                stack.pop()
+            current = {'title': heading.group(2).strip(), 'level': level, 'parent': stack[-1] if stack else -1}
+            stack.append(len(nodes))
+            current_content = []
+        else:
+            current_content.append(line)
+    close()
+    return nodes
+
+
+def split_by_headings(content: str, levels: Tuple[int, int] = (1, 6),
+                      default_title: str = "正文") -> List[Tuple[str, str]]:
+    """按标题拆分，返回 [(标题, 内容)]，每个正文不为空的标题一节（参数同 build_outline）"""
+    return [(node['title'], node['body']) for node in build_outline(content, levels, default_title) if node['body']]
+
+
+def _split_blocks(body: str, max_chars: int) -> List[str]:
+    """把过长的正文在空行处（代码块之外）切开，每段朗读文本尽量不超过 max_chars；单个段落超长时按行切开"""
+    blocks, current, fence = [], [], False
+    for line in body.splitlines():
+        if line.lstrip().startswith(('```', '~~~')):
+            fence = not fence
+        if not line.strip() and not fence and current:
+            blocks.append('\n'.join(current))
+            current = []
+        elif line.strip() or current:
+            current.append(line)
+    if current:
+        blocks.append('\n'.join(current))
+
+    # 没有空行的超长段落（例如很长的列表）按行切开
+    pieces = []
+    for block in blocks:
+        if len(clean_section_text(block)) > max_chars and not block.lstrip().startswith(('```', '~~~')):
+            pieces.extend(line for line in block.splitlines() if line.strip())
+        else:
+            pieces.append(block)
+
+    chunks, chunk, size = [], [], 0
+    for block in pieces:
+        block_size = len(clean_section_text(block))
+        if chunk and size + block_size > max_chars:
+            chunks.append('\n\n'.join(chunk))
+            chunk, size = [], 0
+        chunk.append(block)
+        size += block_size + 1
+    if chunk:
+        chunks.append('\n\n'.join(chunk))
+    return chunks
+
+
+def coalesce_outline(nodes: List[Dict[str, Any]], min_chars: int = 200,
+                     max_chars: int = 5000) -> List[Dict[str, Any]]:
+    """
+    合并过短的小节、切分过长的小节，返回要合成的章节 [{'title', 'body', 'chars', 'markers'}]
+      - 朗读文本少于 min_chars 的小节并入上级标题或相邻的同级标题所在的章节（不会并入其他上级标题之下），
+        同级标题按连同下级小节的总字数判断，合并后不超过 max_chars；并入的小节标题作为单独一段朗读
+      - 超过 max_chars 的小节在段落之间切成多个章节，标题加上（1/3）等序号
+      - markers 记录章节内每个标题在朗读文本中的字符位置 [{'title', 'level', 'offset'}]
+    min_chars 为 0 时不合并，max_chars 为 0 时不切分
+    """
+    sizes = [len(clean_section_text(node['body'])) for node in nodes]
+    # 每个标题连同所有下级小节的字数：判断同级标题能否合并时按整棵子树计算
+    subtree = list(sizes)
+    for i in range(len(nodes) - 1, -1, -1):
+        if nodes[i]['parent'] >= 0:
+            subtree[nodes[i]['parent']] += subtree[i]
+
+    units = []  # (标题, 级别, 正文, 朗读字数, 子树字数, 是否标题的开始)
+    for node, size, total in zip(nodes, sizes, subtree):
+        if max_chars and size > max_chars:
+            chunks = _split_blocks(node['body'], max_chars)
+            for i, chunk in enumerate(chunks, start=1):
+                title = f"{node['title']}（{i}/{len(chunks)}）" if len(chunks) > 1 else node['title']
+                chunk_size = len(clean_section_text(chunk))
+                units.append((title, node['level'], chunk, chunk_size, chunk_size, i == 1))
+        else:
+            units.append((node['title'], node['level'], node['body'], size, total, True))
+
+    def fits(group: Dict[str, Any], extra: int) -> bool:
+        return not max_chars or group['chars'] + extra <= max_chars
+
+    groups: List[Dict[str, Any]] = []
+    for title, level, body, size, total, starts in units:
+        group = groups[-1] if groups else None
+        extra = (len(title) + 2 if starts else 1) + size
+        # 下级小节看自身字数（并入上级），同级标题看整棵子树（整章都很短时才并入前一章）
+        small = size < min_chars if group and level > group['level'] else total < min_chars
+        if group and min_chars and level >= group['level'] and (group['chars'] < min_chars or small) \
+                and fits(group, extra):
+            group['units'].append((title, level, body, starts))
+            group['chars'] += extra
+        else:
+            groups.append({'title': title, 'level': level, 'units': [(title, level, body, starts)], 'chars': size})
+
+    # 仍然过短的章节（例如上级标题之前的最后一个小节）并入前一个章节：前一个章节的标题级别不低于本章时才合并
+    merged: List[Dict[str, Any]] = []
+    for group in groups:
+        previous = merged[-1] if merged else None
+        if previous and min_chars and group['chars'] < min_chars and previous['level'] <= group['level'] \
+                and fits(previous, len(group['title']) + group['chars'] + 2):
+            previous['units'].extend(group['units'])
+            previous['chars'] += len(group['title']) + group['chars'] + 2
+        else:
+            merged.append(group)
+
+    sections = []
+    for group in merged:
+        parts, markers, offset = [], [], 0
+        for i, (title, level, body, starts) in enumerate(group['units']):
+            part = body if i == 0 or not starts else f"{title}\n\n{body}"
+            if starts:
+                markers.append({'title': title, 'level': level, 'offset': offset})
+            text = clean_section_text(part)
+            if text:
+                parts.append(part)
+                offset += len(text) + 1
+        sections.append({'title': group['title'], 'body': '\n\n'.join(parts), 'chars': max(0, offset - 1),
+                         'markers': markers})
+    return sections
+
+
+def parse_levels(value: str) -> Tuple[int, int]:
+    """把 "2" 或 "1-6" 解析为标题级别范围"""
+    parts = value.split('-')
+    low, high = int(parts[0]), int(parts[-1])
+    if not 1 <= low <= high <= 6:
+        raise ValueError(f"标题级别范围无效: {value}")
+    return low, high
+
+
+# ======================
+# 合成
+# ======================
+async def _speak_with_retries(engine: SpeechEngine, job: Dict[str, Any], retries: int, retry_delay: float):
+    """合成一章，失败后按指数退避重试 retries 次；结果记录在 job 中"""
+    for attempt in range(1, retries + 2):
+        job['attempts'] = attempt
+        started = time.perf_counter()
+        try:
+            await engine.synthesize(job['text'], job['path'], leading_silence_ms=job['silence'])
+        except Exception as e:
+            job['error'] = f"{type(e).__name__}: {e}"
+            if attempt > retries:
+                print(f"❌ [{job['idx']:02d}] 生成失败（已尝试 {attempt} 次）: {job['error']}")
+                return
+            delay = retry_delay * 2 ** (attempt - 1)
+            print(f"⚠️  [{job['idx']:02d}] 第 {attempt} 次失败，{delay:.1f} 秒后重试: {job['error']}")
+            await asyncio.sleep(delay)
+        else:
+            job['error'] = None
+            job['seconds'] = time.perf_counter() - started
+            print(f"✅ [{job['idx']:02d}] 已生成: {job['path']}")
+            return
+
+
+def print_section_summary(jobs: List[Dict[str, Any]], elapsed: float):
+    """按章节顺序输出结果"""
+    failed = [job for job in jobs if job.get('error')]
+    print(f"\n{'='*50}")
+    print(f"📋 章节汇总（{len(jobs) - len(failed)}/{len(jobs)} 成功，总耗时 {elapsed:.1f} 秒）:")
+    for job in sorted(jobs, key=lambda job: job['idx']):
+        retried = f"，尝试 {job['attempts']} 次" if job.get('attempts', 1) > 1 else ""
+        if job.get('error'):
+            print(f"   ❌ [{job['idx']:02d}] {os.path.basename(job['path'])}: {job['error']}{retried}")
+        else:
+            print(f"   ✅ [{job['idx']:02d}] {os.path.basename(job['path'])}（{job['seconds']:.1f} 秒{retried}）")
+    print(f"{'='*50}")
+
+
+async def speak_sections(engine: SpeechEngine, sections: List[Tuple[str, str]], output_dir: str,
+                         file_pattern: str) -> Tuple[int, int]:
+    """
+    合成所有章节，返回 (成功生成的文件数, 失败的章节数)
+    文件名在开始前就按章节序号确定，各章互不依赖：同时合成的章节数由引擎的并发上限决定，
+    最长的章节先开始（LPT），失败的章节按 section_retries 重试，最后按章节顺序输出汇总
+
+    Args:
+        file_pattern: 文件名格式，可用 {idx} 和 {title}
+    """
+    from .scheduler import run_jobs, schedule
+
+    section_break_ms = engine.config.get('section_break_ms', 1000)
+    retries = max(0, int(engine.config.get('section_retries', 2)))
+    retry_delay = float(engine.config.get('section_retry_delay', 2.0))
+    jobs = []
+    for idx, (title, body) in enumerate(sections, start=1):
+        text = clean_section_text(body)
+        if not text:
+            print(f"🟡 跳过空章节: {title}")
+            continue
+
+        file_name = file_pattern.format(idx=idx, title=sanitize_filename(title))
+        jobs.append({'idx': idx, 'index': len(jobs), 'text': text, 'chars': len(text),
+                     'path': os.path.join(output_dir, f"{file_name}.mp3"),
+                     # 第 2 章及以后在文件开头加入静音
+                     'silence': section_break_ms if idx > 1 else 0})
+
+    started = time.perf_counter()
+    await run_jobs(schedule(jobs, 'lpt'), lambda job: _speak_with_retries(engine, job, retries, retry_delay),
+                   engine.max_parallel)
+    print_section_summary(jobs, time.perf_counter() - started)
+    failed = sum(1 for job in jobs if job.get('error'))
+    return len(jobs) - failed, failed
+
+
+def write_outline(output_dir: str, md_file: str, sections: List[Dict[str, Any]], file_pattern: str,
+                  section_break_ms: int):
+    """
+    把各章节内的标题位置写入 outline.json：offset 为朗读文本中的字符位置，
+    start 为按字数比例估算的音频时间（秒，含开头的静音）
+    """
+    from .mp3 import FRAME_SECONDS, frame_index
+
+    entries = []
+    for idx, section in enumerate(sections, start=1):
+        file_name = f"{file_pattern.format(idx=idx, title=sanitize_filename(section['title']))}.mp3"
+        path = os.path.join(output_dir, file_name)
+        if not os.path.exists(path):
+            continue  # 空章节或合成失败
+        with open(path, 'rb') as f:
+            duration = len(frame_index(f.read())) * FRAME_SECONDS
+        silence = section_break_ms / 1000 if idx > 1 else 0.0
+        speech = max(0.0, duration - silence)
+        markers = [{**marker, 'start': round(silence + speech * marker['offset'] / max(1, section['chars']), 2)}
+                   for marker in section['markers']]
+        entries.append({'file': file_name, 'title': section['title'], 'chars': section['chars'],
+                        'duration': round(duration, 2), 'markers': markers})
+
+    outline_path = os.path.join(output_dir, OUTLINE_FILE_NAME)
+    with open(outline_path, 'w', encoding='utf-8') as f:
+        json.dump({'source': os.path.basename(md_file), 'sections': entries}, f, ensure_ascii=False, indent=2)
+    print(f"🗂️  章节标记已写入: {outline_path}")
+
+
+async def run_split(engine: SpeechEngine, md_file: str, output_dir: str, sections: List[Tuple[str, str]],
+                    file_pattern: str, outline: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """
+    合成所有章节
+    outline: coalesce_outline 的结果（与 sections 一一对应），给出时合成后写入 outline.json
+    """
+    if not sections:
+        print("❌ 未找到任何有效内容，请检查 Markdown 文件是否为空或缺少分割线/标题。")
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"📖 正在处理: {md_file}")
+    print(f"📁 输出音频将保存在: {output_dir}/")
+    print(f"🔍 共找到 {len(sections)} 个章节")
+
+    _, failed = await speak_sections(engine, sections, output_dir, file_pattern)
+    if outline is not None:
+        write_outline(output_dir, md_file, outline, file_pattern, engine.config.get('section_break_ms', 1000))
+    if failed:
+        print(f"⚠️  {failed} 个章节生成失败，其余音频在: {output_dir}/")
+        return False
+    print(f"🎉 所有音频已生成完毕！请查看目录: {output_dir}/")
+    return True
+
+
+async def run_whole_doc(engine: SpeechEngine, md_file: str, output_file: str) -> bool:
+    print(f"🔍 正在读取文件: {md_file}")
+    with open(md_file, 'r', encoding='utf-8') as f:
+        text = clean_document_text(f.read())
+
+    if not text:
+        print("❌ 处理后文本为空，可能是只有代码块或格式问题。")
+        return False
+
+    print(f"📝 提取有效文本（前200字）：{text[:200]}...")
+    print(f"🎤 正在使用声音 '{engine.voice}' 生成语音...")
+    print(f"💾 音频将保存为: {output_file}")
+    try:
+        await engine.synthesize(text, output_file)
+        print(f"✅ 成功！音频已保存：{output_file}")
+        return True
+    except Exception as e:
+        print(f"❌ 生成音频失败：{e}")
+        return False
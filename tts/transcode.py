@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+转码：把合成的 MP3 另存为体积更小的格式（Opus / AAC）
+  edge-tts 服务只返回 24 kHz / 48 kbps 的 MP3（edge-tts 7 没有开放输出格式参数），
+  MP3 仍然是合成、切分、缓存和去重使用的原始文件；转码结果放在同一目录（同名，扩展名不同），
+  供移动端等对流量敏感的场景使用。语音在 Opus 24 kbps 下仍然清晰，约为原始 MP3 的一半。
+  每个转码任务是一个 ffmpeg 进程，由进程池并行调度，不占用合成的事件循环；
+  编码器、码率和文件大小写入 meta.json 的 files.formats（其他目录写入 formats.json）。
+需要系统中的 ffmpeg（含 libopus）。
+"""
+
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .loudness import entry_key, find_clips, load_record, record_file, save_record
+from .mp3 import BITRATE
+
+# 编码器参数；-application voip 让 Opus 针对语音优化
+CODECS: Dict[str, Dict[str, Any]] = {
+    'opus': {'encoder': 'libopus', 'extension': '.opus', 'bitrate': '24k', 'args': ['-application', 'voip']},
+    'aac': {'encoder': 'aac', 'extension': '.m4a', 'bitrate': '32k', 'args': ['-movflags', '+faststart']},
+}
+DEFAULT_TRANSCODE: Dict[str, Any] = {
+    'enabled': False,
+    'formats': ['opus'],  # 要生成的格式（CODECS 中的键）
+    'bitrates': {}  # 按格式覆盖码率，例如 {"opus": "16k"}；缺省使用 CODECS 中的码率
+}
+RECORD_FILE_NAME = "formats.json"
+
+
+def output_path(clip: Path, codec: str) -> Path:
+    return clip.with_suffix(CODECS[codec]['extension'])
+
+
+def transcode_clip(clip: str, codec: str, bitrate: str, force: bool = False) -> Dict[str, Any]:
+    """
+    转码单个音频（进程池任务）；目标文件比源文件新时跳过
+
+    Returns:
+        {'source', 'file', 'codec', 'bitrate', 'size', 'seconds', 'skipped'}，出错时含 'error'
+    """
+    source = Path(clip)
+    target = output_path(source, codec)
+    result = {'source': str(source), 'file': target.name, 'codec': codec, 'bitrate': bitrate,
+              'seconds': 0.0, 'skipped': False}
+    if not force and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        result.update(size=target.stat().st_size, skipped=True)
+        return result
+
+    spec = CODECS[codec]
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    started = time.perf_counter()
+    try:
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', str(source), '-c:a', spec['encoder'], '-b:a', bitrate,
+                        *spec['args'], '-f', 'ogg' if codec == 'opus' else 'mp4', str(tmp_path)],
+                       capture_output=True, check=True)
+        os.replace(tmp_path, target)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, 'stderr', None)
+        result['error'] = stderr.decode('utf-8', 'replace').strip() if stderr else str(e)
+        return result
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    result.update(size=target.stat().st_size, seconds=time.perf_counter() - started)
+    return result
+
+
+def _record(results: List[Dict[str, Any]]):
+    """把各格式的编码器、码率和大小写入 meta.json 的 files.formats（连同原始 MP3）"""
+    by_dir: Dict[Path, List[Dict[str, Any]]] = {}
+    for result in results:
+        if 'error' not in result:
+            by_dir.setdefault(Path(result['source']).parent, []).append(result)
+
+    for directory, entries in by_dir.items():
+        path = record_file(directory, RECORD_FILE_NAME)
+        record = load_record(path)
+        files = record.setdefault('files', {})
+        formats = files.setdefault('formats', {})
+        for entry in entries:
+            source = Path(entry['source'])
+            variants = formats.setdefault(entry_key(record, source.name), {})
+            variants['mp3'] = {'file': source.name, 'codec': 'mp3', 'bitrate': f'{BITRATE // 1000}k',
+                               'size': source.stat().st_size}
+            variants[entry['codec']] = {'file': entry['file'], 'codec': entry['codec'],
+                                        'bitrate': entry['bitrate'], 'size': entry['size']}
+        save_record(path, record)
+
+
+def transcode_paths(paths: List[str], options: Optional[Dict[str, Any]] = None, workers: Optional[int] = None,
+                    force: bool = False) -> List[Dict[str, Any]]:
+    """
+    转码目录（或文件）中的所有 MP3
+
+    Args:
+        options: 配置中的 transcode 字段，缺省项使用 DEFAULT_TRANSCODE
+        workers: 进程数，默认为 CPU 核数
+        force: 已有最新的转码结果时也重新转码
+    """
+    options = {**DEFAULT_TRANSCODE, **(options or {})}
+    unknown = [codec for codec in options['formats'] if codec not in CODECS]
+    if unknown:
+        raise ValueError(f"不支持的格式: {', '.join(unknown)}（可选: {', '.join(CODECS)}）")
+
+    clips = [str(clip) for clip in find_clips(paths)]
+    tasks = [(clip, codec, options['bitrates'].get(codec, CODECS[codec]['bitrate']))
+             for clip in clips for codec in options['formats']]
+    if not tasks:
+        print("📁 没有找到需要转码的 MP3 文件")
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    print(f"🔄 转码 {len(clips)} 个音频 -> {', '.join(options['formats'])}（{workers} 个进程）...")
+    started = time.perf_counter()
+    clip_args, codecs, bitrates = zip(*tasks)
+    if workers == 1:
+        results = [transcode_clip(*task, force=force) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(transcode_clip, clip_args, codecs, bitrates, repeat(force),
+                                    chunksize=max(1, len(tasks) // (workers * 4))))
+    _record(results)
+    print_summary(results, time.perf_counter() - started)
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]], seconds: float):
+    for result in results:
+        if 'error' in result:
+            print(f"✗ {result['source']} -> {result['codec']}: {result['error']}")
+    done = [r for r in results if 'error' not in r]
+    skipped = sum(1 for r in done if r['skipped'])
+    print(f"✓ 转码 {len(done) - skipped} 个，跳过 {skipped} 个（已是最新），用时 {seconds:.1f} s")
+    source_bytes = sum(Path(source).stat().st_size for source in {r['source'] for r in done})
+    for codec in dict.fromkeys(r['codec'] for r in done):
+        size = sum(r['size'] for r in done if r['codec'] == codec)
+        if source_bytes:
+            print(f"   {codec}: {size / 1024:.0f} KB（MP3 {source_bytes / 1024:.0f} KB 的 {size / source_bytes:.0%}）")
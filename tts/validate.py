@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+合成前的校验
+  在开始合成之前解析所有输入文件的每个问题块，几秒内报告：
+    - 结构错误（缺少题目/精简答案标题、标题格式不对、frontmatter 无法解析），附行号
+    - 朗读文本为空的段落、缺少 id 的问题
+    - 重复的 id（警告：两个问题照常合成，各自按自己的编号输出）
+  问题块数量较多时用进程池并行解析；解析规则与合成时完全相同（MarkdownQuestionParser）。
+"""
+
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+PARALLEL_THRESHOLD = 500  # 问题块少于该数量时直接在当前进程解析，省去进程池启动开销
+
+TITLE_HEADING = re.compile(r'^## \*\*题目：\*\* ')
+SIMPLE_HEADING = re.compile(r'^## \*\*✅ 精简答案：\*\*')
+ANALYSIS_HEADING = re.compile(r'^(## )?\*\*📘 详细解析：\*\*')
+LOOSE_TITLE = re.compile(r'^\s*(#+\s*)?\*\*题目[：:]\*\*')
+LOOSE_SIMPLE = re.compile(r'^\s*(#+\s*)?\*\*✅?\s*精简答案[：:]\*\*')
+SECTIONS = [('question', '题目'), ('simple_answer', '精简答案'), ('detailed_analysis', '详细解析')]
+
+
+def _find(lines: List[str], pattern) -> Optional[int]:
+    for index, line in enumerate(lines):
+        if pattern.match(line):
+            return index
+    return None
+
+
+def diagnose_block(parser, block: str, first_line: int) -> Dict[str, Any]:
+    """
+    检查单个问题块
+
+    Returns:
+        {'line', 'id', 'ok', 'errors': [(行号, 说明)], 'warnings': [(行号, 说明)]}
+    """
+    errors: List[Tuple[int, str]] = []
+    warnings: List[Tuple[int, str]] = []
+    lines = block.split('\n')
+
+    metadata, _ = parser.parse_frontmatter(block)
+    if not metadata:
+        errors.append((first_line, "frontmatter 无法解析（需要以 --- 开始和结束）"))
+    elif not metadata.get('id'):
+        warnings.append((first_line, "缺少 id（可运行 python3 -m tts normalize 分配）"))
+
+    title = _find(lines, TITLE_HEADING)
+    simple = _find(lines, SIMPLE_HEADING)
+    if title is None:
+        loose = _find(lines, LOOSE_TITLE)
+        if loose is None:
+            errors.append((first_line, "缺少 '## **题目：** ' 标题"))
+        else:
+            errors.append((first_line + loose, f"题目标题格式不对，应为 '## **题目：** 题目内容': {lines[loose][:40]!r}"))
+    if simple is None:
+        loose = _find(lines, LOOSE_SIMPLE)
+        if loose is None:
+            errors.append((first_line, "缺少 '## **✅ 精简答案：**' 标题"))
+        elif not lines[loose].startswith('## '):
+            errors.append((first_line + loose, "精简答案标题缺少 '## ' 前缀（可运行 python3 -m tts normalize 修复）"))
+        else:
+            errors.append((first_line + loose, f"精简答案标题格式不对: {lines[loose][:40]!r}"))
+    analysis = _find(lines, ANALYSIS_HEADING)
+    if analysis is None:
+        warnings.append((first_line, "缺少 '**📘 详细解析：**'，详细解析音频将为空"))
+    if title is not None and simple is not None and simple < title:
+        errors.append((first_line + simple, "精简答案出现在题目之前"))
+
+    question_data = parser.parse_question_block(block)
+    if question_data is None and not errors:
+        errors.append((first_line + (title or 0), "题目与精简答案之间的格式无法解析（题目内容须与标题同行，精简答案标题须另起一行）"))
+
+    if question_data:
+        heading_lines = {'question': title, 'simple_answer': simple, 'detailed_analysis': analysis}
+        for key, label in SECTIONS:
+            if not parser.prepare_tts_text(question_data[key]) and (key != 'detailed_analysis' or analysis is not None):
+                warnings.append((first_line + (heading_lines[key] or 0), f"{label}的朗读文本为空，不会生成音频"))
+
+    return {'line': first_line, 'id': metadata.get('id'), 'ok': question_data is not None and not errors,
+            'errors': errors, 'warnings': warnings}
+
+
+def _validate_chunk(items: List[Tuple[str, int, int, str]]) -> List[Dict[str, Any]]:
+    """进程池任务：检查一批问题块；items 为 [(文件, 块序号, 起始行号, 问题块)]"""
+    from .questions import MarkdownQuestionParser
+
+    parser = MarkdownQuestionParser("", "", verbose=False)
+    results = []
+    for input_file, index, first_line, block in items:
+        result = diagnose_block(parser, block, first_line)
+        result.update(file=input_file, index=index)
+        results.append(result)
+    return results
+
+
+def validate_files(input_files: List[str], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    校验所有输入文件
+
+    Args:
+        workers: 进程数，默认为 CPU 核数；1 表示不使用进程池
+    Returns:
+        {'results': 每个问题块的检查结果, 'blocks', 'files', 'seconds', 'workers'}
+    """
+    from .questions import MarkdownQuestionParser
+
+    started = time.perf_counter()
+    splitter = MarkdownQuestionParser("", "", verbose=False)
+    items = []
+    for input_file in input_files:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for index, (first_line, block) in enumerate(splitter.locate_question_blocks(content, require_title=False), 1):
+            items.append((input_file, index, first_line, block))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        workers = 1
+        results = _validate_chunk(items)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # 每个进程分到多批，负载更均匀；每批足够大，进程间传输的开销可以忽略
+        chunk_size = max(50, len(items) // (workers * 4))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [result for chunk in pool.map(_validate_chunk, chunks) for result in chunk]
+
+    # 重复 id 只作为警告：合成时两个问题都会输出（编号不同），--validate skip 不会因此丢掉问题
+    first_seen: Dict[str, Dict[str, Any]] = {}
+    seen_in_file = defaultdict(dict)
+    for result in results:
+        question_id = result['id']
+        if not question_id:
+            continue
+        previous = seen_in_file[result['file']].get(question_id)
+        if previous:
+            result['warnings'].append((result['line'], f"id {question_id} 与第 {previous['line']} 行的问题重复"))
+        elif question_id in first_seen:
+            other = first_seen[question_id]
+            result['warnings'].append((result['line'], f"id {question_id} 也出现在 {other['file']}:{other['line']}"))
+        seen_in_file[result['file']].setdefault(question_id, result)
+        first_seen.setdefault(question_id, result)
+
+    return {'results': results, 'blocks': len(items), 'files': len(input_files),
+            'seconds': time.perf_counter() - started, 'workers': workers}
+
+
+def invalid_blocks(report: Dict[str, Any]) -> Dict[str, set]:
+    """有错误的问题块：{输入文件: {起始行号}}，供 --validate skip 在合成时排除这些块"""
+    invalid: Dict[str, set] = defaultdict(set)
+    for result in report['results']:
+        if result['errors']:
+            invalid[result['file']].add(result['line'])
+    return dict(invalid)
+
+
+def print_report(report: Dict[str, Any], show_warnings: bool = True) -> int:
+    """打印校验报告，返回有错误的问题块数量"""
+    invalid = 0
+    warning_count = 0
+    for result in report['results']:
+        if result['errors']:
+            invalid += 1
+        for line, message in result['errors']:
+            print(f"✗ {result['file']}:{line} [问题块 {result['index']}] {message}")
+        warning_count += len(result['warnings'])
+        if show_warnings:
+            for line, message in result['warnings']:
+                print(f"⚠️  {result['file']}:{line} [问题块 {result['index']}] {message}")
+
+    print(f"🔎 校验 {report['files']} 个文件、{report['blocks']} 个问题块，用时 {report['seconds']:.2f} s"
+          f"（{report['workers']} 个进程）: {invalid} 个问题块有错误，{warning_count} 个警告")
+    return invalid
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+监视模式：源文件保存后只重新合成改动过的段落
+  每个输出目录维护一份 watch_manifest.json：问题 id -> 编号、每段朗读文本的哈希、meta 内容哈希。
+  每次保存后重新解析文件，与清单比较：
+    - 新增/改动的段落重新合成
+    - 问题编号变化（前面插入或删除了问题）只重命名目录和文件
+    - 只有元数据改动时只重写 meta.json
+    - 已删除问题的输出目录被移除（frontmatter 仍在、只是暂时无法解析的问题不算删除）
+  Linux 上通过 inotify（ctypes）监视文件所在目录，其他系统或 inotify 不可用时按修改时间轮询。
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+MANIFEST_NAME = "watch_manifest.json"
+DEBOUNCE_SECONDS = 0.3  # 编辑器保存时常常连续触发多个事件，合并后再处理
+POLL_INTERVAL = 1.0
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def _hash(value: Any) -> str:
+    data = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+class QuestionManifest:
+    def __init__(self, parser):
+        """
+        输出目录的同步清单
+
+        Args:
+            parser: 该输入文件对应的 MarkdownQuestionParser
+        """
+        self.parser = parser
+        self.path = parser.output_dir / MANIFEST_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('questions', {})
+            except Exception as e:
+                print(f"⚠️  读取监视清单失败，将重新建立: {e}")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'questions': self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def voice_signature(self) -> str:
+        """语音参数也参与哈希：换了语音/语速/音调时所有段落都需要重新合成"""
+        config = self.parser.engine.config
+        return _hash([config.get('voice'), config.get('rate'), config.get('pitch')])
+
+    def snapshot(self, question_data: Dict[str, Any], question_num: int) -> Dict[str, Any]:
+        """问题当前状态：编号、每段朗读文本的哈希、meta 内容的哈希"""
+        signature = self.voice_signature()
+        sections = {}
+        for key, text, _ in self.parser.question_audio_jobs(question_data, question_num):
+            tts_text = self.parser.prepare_tts_text(text)
+            sections[key] = _hash([signature, tts_text]) if tts_text else None
+        meta = {k: v for k, v in question_data['metadata'].items()}
+        meta.update(question=question_data['question'], simple=question_data['simple_answer'],
+                    analysis=question_data['detailed_analysis'])
+        return {'num': question_num, 'sections': sections, 'meta': _hash(meta)}
+
+    @staticmethod
+    def question_key(question_data: Dict[str, Any], question_num: int) -> str:
+        """清单的键：frontmatter 中的 id，没有 id 时退回编号"""
+        return str(question_data['metadata'].get('id') or f'q{question_num:04d}')
+
+
+class IncrementalSynchronizer:
+    def __init__(self, parser, adopt_existing: bool = True):
+        """
+        增量同步一个输入文件的输出目录
+
+        Args:
+            parser: MarkdownQuestionParser（verbose 建议关闭）
+            adopt_existing: 没有清单时，已存在的音频视为最新（避免首次监视就重新合成全部问题）
+        """
+        self.parser = parser
+        self.manifest = QuestionManifest(parser)
+        self.adopt_existing = adopt_existing and not self.manifest.entries
+
+    def _files(self, entry_num: int, question_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.parser.question_file_names(question_data, entry_num)
+
+    def _move(self, source: Path, question_data: Dict[str, Any], old_num: int, new_num: int):
+        """问题编号变化：把目录移到新名称并重命名其中的文件，不重新合成"""
+        old = self._files(old_num, question_data)
+        new = self._files(new_num, question_data)
+        if new['dir'].exists():
+            shutil.rmtree(new['dir'])
+        new['dir'].parent.mkdir(parents=True, exist_ok=True)
+        source.rename(new['dir'])
+        for key in ('audio_simple', 'audio_question', 'audio_analysis', 'meta'):
+            if (new['dir'] / old[key]).exists():
+                (new['dir'] / old[key]).rename(new['dir'] / new[key])
+        print(f"↪️  {old['dir'].name} -> {new['dir'].name}")
+
+    def _remove(self, entry: Dict[str, Any]):
+        """删除已不存在的问题的输出目录（只删除输出目录内、由本工具命名的目录）"""
+        from .layout import QUESTION_DIR
+        question_dir = self.parser.output_dir / entry['dir']
+        if (QUESTION_DIR.match(question_dir.name) and '..' not in Path(entry['dir']).parts
+                and not Path(entry['dir']).is_absolute() and question_dir.exists()):
+            shutil.rmtree(question_dir)
+            print(f"🗑️  已删除: {question_dir.name}")
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _stage(old_dir: Path) -> Optional[Path]:
+        """把编号变化的目录先移到临时名称，返回临时路径（目录不存在时返回 None）"""
+        if not old_dir.exists():
+            return None
+        staging = old_dir.with_name(f".moving_{old_dir.name}")
+        old_dir.rename(staging)
+        return staging
+
+    def _inspect(self, files: Dict[str, Any], snapshot: Dict[str, Any],
+                 previous: Optional[Dict[str, Any]]) -> tuple:
+        """
+        比较问题的当前快照和清单中的记录（文件操作，在 I/O 线程中执行）
+
+        Returns:
+            (清单中的段落哈希, 需要重新合成的段落, meta 是否变化, 这些段落合成前的修改时间)
+        """
+        files['dir'].mkdir(parents=True, exist_ok=True)
+        if previous is None and self.adopt_existing:
+            # 首次监视：已有的音频视为最新
+            previous = {'sections': {k: v for k, v in snapshot['sections'].items()
+                                     if v is None or (files['dir'] / files[k]).exists()},
+                        'meta': snapshot['meta'] if (files['dir'] / files['meta']).exists() else None}
+        previous_sections = (previous or {}).get('sections', {})
+
+        changed = [k for k, digest in snapshot['sections'].items() if previous_sections.get(k) != digest]
+        for k in changed:
+            if snapshot['sections'][k] is None and (files['dir'] / files[k]).exists():
+                (files['dir'] / files[k]).unlink()  # 这一段变成空文本，删除旧音频
+        changed = [k for k in changed if snapshot['sections'][k] is not None]
+        meta_changed = (previous or {}).get('meta') != snapshot['meta']
+        return previous_sections, changed, meta_changed, {k: self._mtime(files['dir'] / files[k]) for k in changed}
+
+    def _read_source(self) -> str:
+        with open(self.parser.input_file, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    async def sync(self) -> Dict[str, int]:
+        """解析一次源文件并同步输出，返回各类变更的数量；文件操作都在引擎的 I/O 线程中执行"""
+        io = self.parser.engine.offload.io
+        content = await io(self._read_source)
+        await io(self.parser.output_dir.mkdir, parents=True, exist_ok=True)
+
+        # 编号与 load_questions 相同（numbered_question_blocks：问题块在文件中的位置），
+        # 保存到一半、暂时无法解析的块仍占用自己的编号，后面的问题不会因此被重新编号；
+        # 这类块已有的输出和清单条目原样保留，直到它能再次解析
+        numbered = self.parser.numbered_question_blocks(content)
+        current: Dict[str, tuple] = {}
+        broken: Dict[str, tuple] = {}  # 清单键 -> (只含元数据的问题数据, 编号)
+        for question_num, line, block in numbered:
+            try:
+                question_data = self.parser.parse_question_block(block)
+            except Exception as e:
+                print(f"✗ 第 {line} 行的问题块解析出错: {e}")
+                question_data = None
+            target = current
+            if not question_data:
+                question_data = {'metadata': self.parser.parse_frontmatter(block)[0]}
+                target = broken
+            key = self.manifest.question_key(question_data, question_num)
+            if key in current or key in broken:
+                print(f"⚠️  重复的问题 id {key}，只处理第一个")
+                continue
+            if target is broken:
+                print(f"⚠️  第 {line} 行的问题块暂时无法解析，保留其已有输出")
+            target[key] = (question_data, question_num)
+
+        # 还没有"题目"的 frontmatter 块（例如正在编辑）不参与编号，但也不算删除
+        numbered_lines = {line for _, line, _ in numbered}
+        untitled = set()
+        for line, block in self.parser.locate_question_blocks(content, require_title=False):
+            question_id = self.parser.parse_frontmatter(block)[0].get('id') if line not in numbered_lines else None
+            if question_id:
+                untitled.add(str(question_id))
+
+        stats = {'synthesized': 0, 'renamed': 0, 'meta': 0, 'removed': 0, 'unchanged': 0}
+        for key in list(self.manifest.entries):
+            if key not in current and key not in broken and key not in untitled:
+                await io(self._remove, self.manifest.entries.pop(key))
+                stats['removed'] += 1
+
+        # 编号变化的目录先全部移到临时名称再移到新名称，避免相互覆盖（例如两个问题交换位置）
+        staged = []
+        for key, (question_data, question_num) in {**current, **broken}.items():
+            entry = self.manifest.entries.get(key)
+            if entry and entry['num'] != question_num:
+                staging = await io(self._stage, self.parser.output_dir / entry['dir'])
+                if staging is not None:
+                    staged.append((staging, question_data, entry['num'], question_num))
+                entry['meta'] = None  # meta 中记录了文件名，需要重写
+                if key in broken:
+                    # 无法解析的块不重新生成快照，这里直接记下新位置
+                    entry['num'] = question_num
+                    entry['dir'] = self._files(question_num, question_data)['dir'].relative_to(
+                        self.parser.output_dir).as_posix()
+        for staging, question_data, old_num, new_num in staged:
+            await io(self._move, staging, question_data, old_num, new_num)
+            stats['renamed'] += 1
+
+        jobs = []
+        meta_only = []
+        pending: Dict[str, Dict[str, Any]] = {}  # 清单键 -> {段落键: 合成前的修改时间}
+        for key, (question_data, question_num) in current.items():
+            snapshot = self.manifest.snapshot(question_data, question_num)
+            files = self._files(question_num, question_data)
+            previous_sections, changed, meta_changed, mtimes = await io(
+                self._inspect, files, snapshot, self.manifest.entries.get(key))
+
+            if changed:
+                jobs.extend(self._jobs_for(question_data, question_num, changed))
+                pending[key] = mtimes
+                stats['synthesized'] += 1
+            elif meta_changed:
+                meta_only.append((question_data, question_num))
+                stats['meta'] += 1
+            else:
+                stats['unchanged'] += 1
+            snapshot['dir'] = files['dir'].relative_to(self.parser.output_dir).as_posix()  # sharded 布局时含分片目录
+            snapshot['previous_sections'] = previous_sections
+            self.manifest.entries[key] = snapshot
+
+        for question_data, question_num in meta_only:
+            await io(self.parser.write_meta_file, question_data, question_num)
+        if jobs:
+            for index, job in enumerate(jobs):
+                job['index'] = index
+            await self.parser.synthesize_jobs(jobs)
+
+        # 合成失败的段落（音频没有更新）保留旧哈希，下次保存时重试
+        for key, entry in self.manifest.entries.items():
+            if key not in current:
+                continue  # 暂时无法解析的块
+            previous_sections = entry.pop('previous_sections', {})
+            question_data, question_num = current[key]
+            files = self._files(question_num, question_data)
+            for k, before in pending.get(key, {}).items():
+                after = await io(self._mtime, files['dir'] / files[k])
+                if after is None or after == before:
+                    entry['sections'][k] = previous_sections.get(k)
+
+        self.adopt_existing = False
+        await io(self.manifest.save)
+        return stats
+
+    def _jobs_for(self, question_data: Dict[str, Any], question_num: int, changed: List[str]) -> List[Dict[str, Any]]:
+        """只为改动过的段落生成任务；合并模式下整道题一次请求"""
+        jobs = self.parser.build_jobs([(question_data, question_num)])
+        if self.parser.combined:
+            return jobs
+        return [job for job in jobs if job['key'] in changed]
+
+
+class PollingWatcher:
+    """按修改时间和大小轮询"""
+
+    def __init__(self, paths: List[Path], interval: float = POLL_INTERVAL):
+        self.paths = paths
+        self.interval = interval
+        self.signatures = {path: self._signature(path) for path in paths}
+
+    @staticmethod
+    def _signature(path: Path):
+        try:
+            stat = path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    async def wait(self) -> Set[Path]:
+        while True:
+            await asyncio.sleep(self.interval)
+            changed = set()
+            for path in self.paths:
+                signature = self._signature(path)
+                if signature != self.signatures[path]:
+                    self.signatures[path] = signature
+                    if signature is not None:
+                        changed.add(path)
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    通过 inotify 监视文件所在目录（编辑器常用 "写临时文件再改名" 的方式保存，
+    直接监视文件本身会在改名后失效）
+    """
+
+    def __init__(self, paths: List[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.paths = {path.resolve() for path in paths}
+        self.directories: Dict[int, Path] = {}
+        for directory in {path.parent for path in self.paths}:
+            wd = libc.inotify_add_watch(self.fd, str(directory).encode(), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch 失败: {directory}")
+            self.directories[wd] = directory
+        self.ready = asyncio.Event()
+        self.pending: Set[Path] = set()
+        asyncio.get_running_loop().add_reader(self.fd, self._read_events)
+
+    def _read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_len].rstrip(b'\0')
+            offset += EVENT_HEADER.size + name_len
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if path in self.paths:
+                self.pending.add(path)
+                self.ready.set()
+
+    async def wait(self) -> Set[Path]:
+        await self.ready.wait()
+        # 防抖：等事件停下来再处理
+        await asyncio.sleep(DEBOUNCE_SECONDS)
+        changed, self.pending = self.pending, set()
+        self.ready.clear()
+        return changed
+
+    def close(self):
+        asyncio.get_running_loop().remove_reader(self.fd)
+        os.close(self.fd)
+
+
+def make_watcher(paths: List[Path]):
+    """Linux 上优先使用 inotify，失败时退回轮询"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify 不可用，改为每 {POLL_INTERVAL:.0f} 秒轮询: {e}")
+    return PollingWatcher(paths)
+
+
+def _print_stats(name: str, stats: Dict[str, int]):
+    print(f"🔄 {name}: 重新合成 {stats['synthesized']} 题, 重命名 {stats['renamed']}, "
+          f"仅更新meta {stats['meta']}, 删除 {stats['removed']}, 未变 {stats['unchanged']}")
+
+
+async def watch(parsers: list, polling: bool = False):
+    """先同步一次，然后每次源文件保存后增量同步，直到 Ctrl+C"""
+    synchronizers = {Path(parser.input_file).resolve(): IncrementalSynchronizer(parser) for parser in parsers}
+    for path, synchronizer in synchronizers.items():
+        _print_stats(path.name, await synchronizer.sync())
+
+    watcher = PollingWatcher(list(synchronizers)) if polling else make_watcher(list(synchronizers))
+    print(f"👀 正在监视 {len(synchronizers)} 个文件（{type(watcher).__name__}），按 Ctrl+C 退出")
+    try:
+        while True:
+            for path in await watcher.wait():
+                try:
+                    _print_stats(path.name, await synchronizers[path].sync())
+                except Exception as e:
+                    # 文件保存到一半等情况：记录错误，等待下一次保存
+                    print(f"✗ 同步 {path.name} 失败: {e}")
+    finally:
+        watcher.close()